@@ -55,12 +55,59 @@ func (s *SmartContract) RecordEvent(ctx contractapi.TransactionContextInterface,
 		return fmt.Errorf("failed to unmarshal event: %v", err)
 	}
 
+	// Get client identity
+	clientID, err := ctx.GetClientIdentity().GetID()
+	if err != nil {
+		return fmt.Errorf("failed to get client identity: %v", err)
+	}
+
 	// Generate event ID if not provided. Use the transaction ID so it's deterministic across endorsers.
 	if event.EventID == "" {
 		txid := ctx.GetStub().GetTxID()
 		event.EventID = fmt.Sprintf("EVT-%s-%s", event.SwitchID, txid)
 	}
 
+	return s.putEvent(ctx, &event, clientID)
+}
+
+// RecordEvents records a batch of security events in a single transaction.
+// eventsJSON is a JSON array of events; the generated event IDs are returned in input order.
+func (s *SmartContract) RecordEvents(ctx contractapi.TransactionContextInterface, eventsJSON string) ([]string, error) {
+	var events []SecurityEvent
+	err := json.Unmarshal([]byte(eventsJSON), &events)
+	if err != nil {
+		return nil, fmt.Errorf("failed to unmarshal events: %v", err)
+	}
+	if len(events) == 0 {
+		return nil, fmt.Errorf("event batch is empty")
+	}
+
+	// Get client identity once for the whole batch
+	clientID, err := ctx.GetClientIdentity().GetID()
+	if err != nil {
+		return nil, fmt.Errorf("failed to get client identity: %v", err)
+	}
+
+	txid := ctx.GetStub().GetTxID()
+	eventIDs := make([]string, 0, len(events))
+	for i := range events {
+		event := &events[i]
+		// Suffix the batch index so IDs stay unique (and deterministic) within one transaction
+		if event.EventID == "" {
+			event.EventID = fmt.Sprintf("EVT-%s-%s-%d", event.SwitchID, txid, i)
+		}
+		if err := s.putEvent(ctx, event, clientID); err != nil {
+			return nil, fmt.Errorf("event %d: %v", i, err)
+		}
+		eventIDs = append(eventIDs, event.EventID)
+	}
+
+	fmt.Printf("Batch recorded: %d events in tx %s\n", len(eventIDs), txid)
+	return eventIDs, nil
+}
+
+// putEvent fills the recorder fields of an event and writes it to the ledger
+func (s *SmartContract) putEvent(ctx contractapi.TransactionContextInterface, event *SecurityEvent, clientID string) error {
 	// If the client provided a recorded_time use it so endorsers remain deterministic.
 	// Otherwise use the transaction timestamp (deterministic) and only fallback to local time if unavailable.
 	if event.RecordedTime == 0 {
@@ -70,12 +117,6 @@ func (s *SmartContract) RecordEvent(ctx contractapi.TransactionContextInterface,
 			event.RecordedTime = time.Now().Unix()
 		}
 	}
-
-	// Get client identity
-	clientID, err := ctx.GetClientIdentity().GetID()
-	if err != nil {
-		return fmt.Errorf("failed to get client identity: %v", err)
-	}
 	event.RecordedBy = clientID
 
 	eventBytes, err := json.Marshal(event)
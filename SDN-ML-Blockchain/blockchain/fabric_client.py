@@ -11,6 +11,11 @@ import shutil
 import tempfile
 from datetime import datetime
 
+try:
+    from blockchain.http_session import PooledHTTPSession
+except ImportError:
+    from http_session import PooledHTTPSession
+
 
 class BlockchainClient:
     """
@@ -53,8 +58,9 @@ class BlockchainClient:
                 repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
                 self.network_path = os.path.abspath(os.path.join(repo_root, network_path))
         
-        # Gateway URL if using REST API
+        # Gateway URL if using REST API (pooled session created on first gateway call)
         self.gateway_url = "http://localhost:3001"
+        self._http = None
         
         print(f"Blockchain Client initialized")
         print(f"  Channel: {self.channel_name}")
@@ -112,6 +118,39 @@ class BlockchainClient:
             print(f"Error recording event to blockchain: {e}")
             return False
 
+    def record_events(self, events):
+        """
+        Record a batch of security events in a single transaction
+
+        Args:
+            events: List of event dicts (same format as record_event)
+
+        Returns:
+            bool: Success status (the whole batch commits or fails together)
+        """
+        try:
+            if not isinstance(events, (list, tuple)):
+                print("record_events: events must be a list")
+                return False
+            if not events:
+                return True
+
+            batch = []
+            for event_data in events:
+                if not isinstance(event_data, dict):
+                    print("record_events: unsupported event_data type in batch")
+                    return False
+                batch.append(self._normalize_event(dict(event_data)))
+
+            if self.use_gateway:
+                return self._invoke_via_gateway('RecordEvents', batch)
+            else:
+                return self._invoke_via_cli('RecordEvents', batch)
+
+        except Exception as e:
+            print(f"Error recording event batch to blockchain: {e}")
+            return False
+
     def _normalize_event(self, event):
         """
         Normalize event dict keys to the chaincode expected snake_case fields.
@@ -353,11 +392,19 @@ class BlockchainClient:
         ctor = {"Args": [function_name] + processed_args}
         return json.dumps(ctor)
 
+    def _get_http_session(self):
+        """Return the keep-alive session used for gateway calls"""
+        if self._http is None:
+            self._http = PooledHTTPSession(self.gateway_url)
+        return self._http
+
+    def get_http_stats(self):
+        """Per-endpoint latency stats of gateway calls (empty in CLI mode)"""
+        return self._http.get_stats() if self._http is not None else {}
+
     def _invoke_via_gateway(self, function_name, *args):
         """Invoke via REST gateway (requires separate gateway service)"""
         try:
-            import requests
-            url = f"{self.gateway_url}/invoke"
             payload = {
                 'channelName': self.channel_name,
                 'chaincodeName': self.chaincode_name,
@@ -365,7 +412,7 @@ class BlockchainClient:
                 'args': list(args)
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._get_http_session().post('/invoke', json=payload)
             return response.status_code == 200
             
         except Exception as e:
@@ -375,8 +422,6 @@ class BlockchainClient:
     def _query_via_gateway(self, function_name, *args):
         """Query via REST gateway"""
         try:
-            import requests
-            url = f"{self.gateway_url}/query"
             payload = {
                 'channelName': self.channel_name,
                 'chaincodeName': self.chaincode_name,
@@ -384,7 +429,7 @@ class BlockchainClient:
                 'args': list(args)
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._get_http_session().post('/query', json=payload)
             if response.status_code == 200:
                 return response.json()
             return None
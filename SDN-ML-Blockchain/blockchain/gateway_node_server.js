@@ -3,6 +3,7 @@
 
   Endpoints:
     POST /api/v1/events       -> submit RecordEvent (body: JSON event)
+    POST /api/v1/events/batch -> submit RecordEvents (body: JSON array of events or { events: [...] })
     GET  /api/v1/attacks/recent -> Get recent attacks (timeWindow query param)
 
   Configuration (env vars):
@@ -344,6 +345,49 @@ app.post('/api/v1/events', async (req, res) => {
   }
 });
 
+// Batch endpoint: N events committed in one RecordEvents transaction
+app.post('/api/v1/events/batch', async (req, res) => {
+  try {
+    const events = Array.isArray(req.body) ? req.body : (req.body && req.body.events);
+    if (!Array.isArray(events) || events.length === 0) {
+      return res.status(400).json({ error: 'Body must be a non-empty array of events (or { events: [...] })' });
+    }
+
+    // Same timestamp normalization as the single-event endpoint
+    for (const event of events) {
+      if (event && event.timestamp && typeof event.timestamp === 'number') {
+        event.timestamp = Math.floor(event.timestamp);
+      }
+    }
+
+    const c = await initGateway();
+    const payload = JSON.stringify(events);
+    const maxAttempts = 3;
+    const backoffMs = 1000;
+    for (let attempt = 1; attempt <= maxAttempts; attempt++) {
+      try {
+        const tx = c.createTransaction('RecordEvents');
+        const result = await tx.submit(payload);
+        let eventIds = [];
+        if (result && result.length) {
+          try { eventIds = JSON.parse(result.toString()); } catch (e) { eventIds = []; }
+        }
+        return res.json({ success: true, txId: tx.getTransactionId(), count: events.length, eventIds, attempts: attempt });
+      } catch (eAttempt) {
+        console.warn(`RecordEvents attempt ${attempt} failed: ${eAttempt.message || eAttempt}`);
+        if (attempt < maxAttempts) {
+          await sleep(backoffMs);
+          continue;
+        }
+        throw eAttempt;
+      }
+    }
+  } catch (err) {
+    console.error('RecordEvents failed:', err);
+    return res.status(500).json({ error: err.message || String(err) });
+  }
+});
+
 // Removed: GET /api/v1/trust/:deviceId endpoint - no longer used
 
 // New endpoint: Get recent attacks across all switches
@@ -370,6 +414,7 @@ app.listen(HTTP_PORT, () => {
   console.info(`Fabric Node Gateway adapter listening on port ${HTTP_PORT}`);
   console.info(`Available endpoints:`);
   console.info(`  POST /api/v1/events                 - Record security event`);
+  console.info(`  POST /api/v1/events/batch           - Record a batch of events in one transaction`);
   console.info(`  GET  /api/v1/attacks/recent         - Get recent attacks (timeWindow query param)`);
   console.info(`  GET  /health                        - Health check`);
 });
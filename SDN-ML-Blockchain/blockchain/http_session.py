@@ -0,0 +1,103 @@
+"""
+Pooled HTTP session for the blockchain REST gateway/adapter
+Keeps TCP connections alive between calls and records per-call latency.
+"""
+import os
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Defaults can be overridden per process through environment variables
+DEFAULT_POOL_SIZE = int(os.environ.get('BLOCKCHAIN_HTTP_POOL_SIZE', '4'))
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get('BLOCKCHAIN_HTTP_CONNECT_TIMEOUT', '3'))
+DEFAULT_READ_TIMEOUT = float(os.environ.get('BLOCKCHAIN_HTTP_READ_TIMEOUT', '10'))
+
+
+class PooledHTTPSession:
+    """
+    Thin wrapper around requests.Session bound to one base URL.
+
+    All calls share a keep-alive connection pool, use a (connect, read)
+    timeout pair and are timed; get_stats() reports count, errors and
+    latency per endpoint path.
+    """
+
+    def __init__(self, base_url,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT,
+                 latency_window=500):
+        """
+        Args:
+            base_url: Gateway base URL, e.g. http://localhost:3001
+            pool_size: Maximum number of kept-alive connections to the gateway
+            connect_timeout: TCP connect timeout in seconds
+            read_timeout: Response read timeout in seconds
+            latency_window: Number of recent latencies kept per endpoint
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.latency_window = latency_window
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._stats = {}
+
+    def post(self, path, json=None):
+        """POST to base_url + path; returns the requests.Response"""
+        return self._request('POST', path, json=json)
+
+    def get(self, path, params=None):
+        """GET base_url + path; returns the requests.Response"""
+        return self._request('GET', path, params=params)
+
+    def _request(self, method, path, **kwargs):
+        stats = self._stats.get(path)
+        if stats is None:
+            stats = {'count': 0, 'errors': 0, 'latencies': deque(maxlen=self.latency_window)}
+            self._stats[path] = stats
+
+        start = time.time()
+        try:
+            response = self.session.request(method, self.base_url + path,
+                                            timeout=self.timeout, **kwargs)
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            stats['count'] += 1
+            stats['latencies'].append(time.time() - start)
+
+        if response.status_code >= 400:
+            stats['errors'] += 1
+        return response
+
+    def get_stats(self):
+        """Return per-endpoint call counters and latency (ms)"""
+        result = {}
+        for path, stats in self._stats.items():
+            latencies = sorted(stats['latencies'])
+            if latencies:
+                latency_ms = {
+                    'avg': sum(latencies) / len(latencies) * 1000,
+                    'p95': latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+                    'max': latencies[-1] * 1000,
+                }
+            else:
+                latency_ms = {'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+            result[path] = {
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'latency_ms': latency_ms,
+            }
+        return result
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
@@ -20,6 +20,9 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
 import time
 
+from ryu_app.dataset import load_training_frame
+from ryu_app.compiled_model import CompiledKernelModel
+
 print("=" * 70)
 print("ML Model Analysis Tool - DDoS Detection")
 print("=" * 70)
@@ -32,8 +35,9 @@ if not os.path.exists(data_file):
     print("   Please run: python3 ryu_app/build_dataset.py")
     sys.exit(1)
 
-df = pd.read_csv(data_file)
-print(f"   Loaded {len(df)} samples")
+load_start = time.perf_counter()
+df = load_training_frame(data_file)
+print(f"   Loaded {len(df)} samples in {(time.perf_counter() - load_start) * 1000:.1f} ms")
 print(f"   Features: {list(df.columns[:-1])}")
 print(f"   Classes: {df['label'].unique()}")
 
@@ -54,7 +58,7 @@ print(f"   Test distribution: {np.bincount(y_test)}")
 
 # Check for pre-trained models
 print("\n3. Checking for pre-trained models...")
-algorithms = ['svm', 'decision_tree', 'random_forest', 'naive_bayes']
+algorithms = ['svm', 'decision_tree', 'random_forest', 'naive_bayes', 'svm_approx', 'sgd']
 model_dir = RYU_APP_DIR  # Models are in ryu_app/
 available_models = {}
 
@@ -72,50 +76,71 @@ if not available_models:
     print("   python3 ryu_app/ml_detector.py --all --data dataset/result.csv")
     sys.exit(1)
 
-# Helper function to classify using loaded model
-def classify_with_model(model, features):
-    """Classify features using loaded model"""
+# Per-sample latency is measured at these batch sizes: 1 = controller-side cost
+# of one verdict, 64 = one batched polling cycle, 4096 = offline throughput
+LATENCY_BATCH_SIZES = (1, 64, 4096)
+
+
+def _unwrap(model):
     # Nếu model được lưu dạng dict {model, threshold}, tách ra
-    threshold = 0.5
     if isinstance(model, dict) and "model" in model:
-        threshold = float(model.get("threshold", 0.5))
-        model = model["model"]
+        return model["model"]
+    return model
+
+
+# Helper function to classify using loaded model
+def classify_batch_with_model(model, X):
+    """Classify all rows of X with one predict (+ one predict_proba) call"""
+    model = _unwrap(model)
+    X = np.asarray(X).reshape(-1, 3)
+    predictions = model.predict(X).astype(int)
 
-    fparams = np.array(features).reshape(1, -1)
-    prediction = model.predict(fparams)[0]
-    
     # Get confidence if model supports probability
     try:
-        probabilities = model.predict_proba(fparams)[0]
-        confidence = max(probabilities)
+        confidences = model.predict_proba(X).max(axis=1)
     except Exception:
-        confidence = 0.8  # Default confidence
-    
-    return int(prediction), float(confidence)
+        confidences = np.full(len(X), 0.8)  # Default confidence
+
+    return predictions, confidences
+
+
+def classify_with_model(model, features):
+    """Classify one feature vector using loaded model"""
+    predictions, confidences = classify_batch_with_model(model, [features])
+    return int(predictions[0]), float(confidences[0])
+
+
+def per_sample_latency_us(model, X, batch_size, budget=2000, seed=0):
+    """Median microseconds per sample of predict() on batches of batch_size rows drawn from X"""
+    model = _unwrap(model)
+    rng = np.random.default_rng(seed)
+    calls = max(3, min(200, budget // batch_size))
+    timings = []
+    for _ in range(calls):
+        batch = X[rng.integers(0, len(X), batch_size)]
+        start = time.perf_counter()
+        model.predict(batch)
+        timings.append((time.perf_counter() - start) / batch_size)
+    return float(np.median(timings)) * 1e6
 
 # Evaluate models
 print("\n4. Evaluating models...")
 print("-" * 70)
 results = []
+loaded_models = {}
 
 for algo, model_file in available_models.items():
     print(f"\n   Evaluating {algo.upper()}...")
-    start_time = time.time()
-    
     try:
         # Load pre-trained model
         model = joblib.load(model_file)
+        loaded_models[algo] = _unwrap(model)
         
-        # Evaluate on test set
-        predictions = []
-        confidences = []
-        
-        for features in X_test:
-            pred, conf = classify_with_model(model, features)
-            predictions.append(pred)
-            confidences.append(conf)
-        
-        predictions = np.array(predictions)
+        # Evaluate on test set (one batched call per model)
+        start_time = time.time()
+        predictions, confidences = classify_batch_with_model(model, X_test)
+        evaluation_time = time.time() - start_time
+        latency = {size: per_sample_latency_us(model, X_test, size) for size in LATENCY_BATCH_SIZES}
         
         # Calculate metrics
         accuracy = accuracy_score(y_test, predictions)
@@ -131,8 +156,6 @@ for algo, model_file in available_models.items():
         tpr = tp / (tp + fn) if (tp + fn) > 0 else 0
         fpr = fp / (fp + tn) if (fp + tn) > 0 else 0
         
-        evaluation_time = time.time() - start_time
-        
         results.append({
             'algorithm': algo,
             'accuracy': accuracy,
@@ -143,6 +166,7 @@ for algo, model_file in available_models.items():
             'false_alarm_rate': fpr,
             'avg_confidence': np.mean(confidences),
             'evaluation_time': evaluation_time,
+            **{f'latency_us_b{size}': us for size, us in latency.items()},
             'tp': tp,
             'tn': tn,
             'fp': fp,
@@ -156,7 +180,8 @@ for algo, model_file in available_models.items():
         print(f"      Detection Rate: {tpr*100:.2f}%")
         print(f"      False Alarm:    {fpr*100:.2f}%")
         print(f"      Avg Confidence: {np.mean(confidences):.3f}")
-        print(f"      Time:           {evaluation_time:.2f}s")
+        print(f"      Time:           {evaluation_time * 1000:.1f} ms ({len(X_test)} samples, batched)")
+        print(f"      Latency/sample: " + ", ".join(f"{us:.2f} us @ batch {size}" for size, us in latency.items()))
         print(f"      Confusion Matrix:")
         print(f"        TP={tp}, TN={tn}, FP={fp}, FN={fn}")
         
@@ -182,6 +207,36 @@ print("\nRanked by F1-Score:")
 print(results_df[['algorithm', 'accuracy', 'precision', 'recall', 'f1_score', 
                   'detection_rate', 'false_alarm_rate']].to_string(index=False))
 
+print("\nPer-sample latency (us) by batch size:")
+print("   batch 1 = one verdict in the controller, 64 = one batched polling cycle, 4096 = offline")
+print(results_df[['algorithm'] + [f'latency_us_b{size}' for size in LATENCY_BATCH_SIZES]]
+      .to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+# Kernel approximation vs exact RBF SVC
+if 'svm' in loaded_models and 'svm_approx' in loaded_models:
+    by_algo = results_df.set_index('algorithm')
+    exact, approx = by_algo.loc['svm'], by_algo.loc['svm_approx']
+    agreement = np.mean(loaded_models['svm'].predict(X_test) == loaded_models['svm_approx'].predict(X_test))
+    feature_map = loaded_models['svm_approx'].steps[0][1]
+    print("\nSVM approximation (Nystroem + linear SVM) vs exact RBF SVC:")
+    print(f"   Size:      {len(loaded_models['svm'].support_vectors_)} support vectors vs "
+          f"{feature_map.n_components} fixed components")
+    print(f"   Accuracy:  {exact['accuracy']*100:.2f}% vs {approx['accuracy']*100:.2f}%")
+    print(f"   F1-Score:  {exact['f1_score']*100:.2f}% vs {approx['f1_score']*100:.2f}%")
+    print(f"   Agreement: {agreement*100:.2f}% of test predictions identical")
+    for size in LATENCY_BATCH_SIZES:
+        print(f"   Latency @ batch {size:<4}: {exact[f'latency_us_b{size}']:.2f} us vs "
+              f"{approx[f'latency_us_b{size}']:.2f} us per sample")
+    # The controller evaluates svm_approx through its compiled form (no Pipeline overhead)
+    compiled = CompiledKernelModel.from_sklearn(loaded_models['svm_approx'])
+    rows = X_test[:200].tolist()
+    start = time.perf_counter()
+    for row in rows:
+        compiled.predict_one(row)
+    compiled_us = (time.perf_counter() - start) / len(rows) * 1e6
+    print(f"   Compiled svm_approx @ batch 1: {compiled_us:.2f} us per sample "
+          f"({compiled.verify(loaded_models['svm_approx'], X_test)} mismatches on the test set)")
+
 best_model = results_df.iloc[0]
 print(f"\n🏆 Best Model: {best_model['algorithm'].upper()}")
 print(f"   F1-Score:       {best_model['f1_score']*100:.2f}%")
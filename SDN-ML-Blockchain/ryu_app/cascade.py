@@ -0,0 +1,257 @@
+"""
+Cascade Classifier
+Cheap-rule-first classification: two axis-aligned boxes calibrated on the
+training data decide the unambiguous region with a few comparisons, and only
+vectors in the uncertain band between them reach the model.
+
+    benign box   sfe in [a0, a1] and ssip in [b0, b1] and rfip in [c0, c1]  -> normal
+    attack box   same form, other bounds                                   -> attack
+
+Calibration picks the boxes that cover the most training rows while
+containing no row labelled, or predicted by the model, as the other class.
+Training rows alone do not make a box safe - the model's boundary can cut
+through the empty space between them - so each box is then probed with
+uniform random vectors: probes where the model disagrees become blocked
+points and the box is refitted, until a fresh round of probes agrees
+completely. A box whose agreement stays below min_agreement is dropped
+(those vectors go to the model).
+
+Each stage counts its hits and keeps a reservoir of recent per-vector
+latencies (single calls: end to end; batches: stage time / vectors).
+"""
+import time
+
+import numpy as np
+
+
+STAGES = ('benign_rule', 'attack_rule', 'model')
+
+
+def _fit_box(X, weights, blocked):
+    """
+    Interval box around the allowed rows that contains no blocked row
+
+    Starts from the bounding box of the allowed rows and, while blocked rows
+    remain inside, moves whichever bound (feature, side) excludes the outermost
+    blocked row at the smallest loss of covered weight.
+
+    Returns:
+        (((lo, hi) per feature), covered weight) or (None, 0)
+    """
+    inside = ~blocked
+    if not inside.any():
+        return None, 0
+    low, high = X[inside].min(axis=0), X[inside].max(axis=0)
+    while True:
+        inside = np.all((X >= low) & (X <= high), axis=1)
+        trapped = inside & blocked
+        if not trapped.any():
+            break
+        best = None
+        for feature in range(X.shape[1]):
+            values = X[inside & ~blocked, feature]
+            edge = X[trapped, feature]
+            for side, keep in ((0, values[values > edge.min()]), (1, values[values < edge.max()])):
+                if not len(keep):
+                    continue
+                bounds = [low.copy(), high.copy()]
+                bounds[side][feature] = keep.min() if side == 0 else keep.max()
+                cover = weights[np.all((X >= bounds[0]) & (X <= bounds[1]), axis=1) & ~blocked].sum()
+                if best is None or cover > best[0]:
+                    best = (cover, bounds)
+        if best is None:
+            return None, 0
+        low, high = best[1]
+    box = tuple((float(lo), float(hi)) for lo, hi in zip(low, high))
+    return box, weights[inside].sum()
+
+
+def _fit_probed_box(predict, label, X, weights, blocked, rng, samples, max_rounds):
+    """
+    _fit_box, refitted with every probe the model disagrees on as another blocked point
+
+    Returns:
+        (box, covered weight, agreement of the last probe round, rounds, probes in that round);
+        box is None if no box excludes the blocked rows
+    """
+    agreement, rounds = None, 0
+    for rounds in range(1, max_rounds + 1):
+        box, cover = _fit_box(X, weights, blocked)
+        if box is None:
+            return None, 0, None, rounds, 0
+        probes = rng.uniform([lo for lo, _ in box], [hi for _, hi in box], (samples, 3))
+        wrong = np.asarray(predict(probes)).astype(int) != label
+        agreement = 1.0 - float(wrong.mean())
+        if not wrong.any():
+            break
+        X = np.concatenate([X, probes[wrong]])
+        weights = np.concatenate([weights, np.zeros(int(wrong.sum()), dtype=weights.dtype)])
+        blocked = np.concatenate([blocked, np.ones(int(wrong.sum()), dtype=bool)])
+    return box, cover, agreement, rounds, samples
+
+
+class CascadeClassifier:
+    """Calibrated benign / attack boxes in front of a model"""
+
+    def __init__(self, benign_box, attack_box, benign_label, attack_label, latency_samples=4096):
+        """
+        Args:
+            benign_box: ((lo, hi) for sfe, ssip, rfip) or None
+            attack_box: Same form, or None
+            benign_label, attack_label: Labels returned by the rule stages (model.classes_ values)
+            latency_samples: Per-stage latency reservoir size
+        """
+        self.benign_box = tuple(map(tuple, benign_box)) if benign_box is not None else None
+        self.attack_box = tuple(map(tuple, attack_box)) if attack_box is not None else None
+        self.benign_label = benign_label
+        self.attack_label = attack_label
+        self.calibration = {}
+        self.hits = dict.fromkeys(STAGES, 0)
+        self._latency = {stage: np.zeros(latency_samples) for stage in STAGES}
+        self._latency_n = dict.fromkeys(STAGES, 0)
+
+    @classmethod
+    def calibrate(cls, predict, classes, X, y, probe_samples=5000, seed=0, min_agreement=1.0,
+                  max_rounds=20):
+        """
+        Fit the two boxes on training data, then shrink them until random probes agree with the model
+
+        Args:
+            predict: The model's predict (compiled or sklearn)
+            classes: model.classes_ (labels 0 / 1, numeric or string)
+            X, y: Training rows and labels
+            probe_samples: Random vectors per box and refinement round
+            min_agreement: Keep a box only if its last probe round agrees at least this much
+            max_rounds: Probe / refit rounds per box
+
+        Raises:
+            ValueError: classes are not a 0 / 1 pair
+        """
+        start = time.perf_counter()
+        by_value = {int(c): c for c in classes}
+        if set(by_value) != {0, 1}:
+            raise ValueError(f"Cascade needs 0 / 1 classes, model has {list(classes)}")
+
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 3)
+        labels = np.asarray(y).astype(int)
+        predicted = np.asarray(predict(X)).astype(int)
+        rows, weights = np.unique(np.column_stack([X, labels, predicted]), axis=0, return_counts=True)
+        Xu, yu, pu = rows[:, 0:3], rows[:, 3], rows[:, 4]
+        attack = (yu == 1) | (pu == 1)
+        benign = (yu == 0) | (pu == 0)
+
+        rng = np.random.default_rng(seed)
+        boxes, calibration = {}, {'rows': int(len(X)), 'dropped': []}
+        agreeing, probed = 0, 0
+        for name, label, blocked in (('benign', 0, attack), ('attack', 1, benign)):
+            box, cover, agreement, rounds, n = _fit_probed_box(
+                predict, label, Xu, weights, blocked, rng, probe_samples, max_rounds)
+            if box is not None and agreement < min_agreement:
+                calibration['dropped'].append(name)
+                box, cover = None, 0
+            elif box is not None:
+                agreeing += round(agreement * n)
+                probed += n
+            boxes[name] = box
+            calibration[f'{name}_coverage'] = float(cover / len(X))
+            calibration[f'{name}_agreement'] = agreement
+            calibration[f'{name}_rounds'] = rounds
+
+        cascade = cls(boxes['benign'], boxes['attack'], by_value[0], by_value[1])
+        calibration['probe_agreement'] = agreeing / probed if probed else None
+        calibration['seconds'] = time.perf_counter() - start
+        cascade.calibration = calibration
+        return cascade
+
+    def decide(self, features):
+        """Rule label for one vector, or None if it is in the uncertain band"""
+        sfe, ssip, rfip = features
+        for box, label in ((self.benign_box, self.benign_label), (self.attack_box, self.attack_label)):
+            if box is not None and box[0][0] <= sfe <= box[0][1] and box[1][0] <= ssip <= box[1][1] \
+                    and box[2][0] <= rfip <= box[2][1]:
+                return label
+        return None
+
+    def decide_batch(self, X):
+        """
+        Returns:
+            (labels, decided) - labels is only meaningful where decided is True
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 3)
+        labels = np.empty(len(X), dtype=np.asarray([self.benign_label]).dtype)
+        decided = np.zeros(len(X), dtype=bool)
+        for box, label in ((self.benign_box, self.benign_label), (self.attack_box, self.attack_label)):
+            if box is None:
+                continue
+            bounds = np.asarray(box)
+            hit = ~decided & np.all((X >= bounds[:, 0]) & (X <= bounds[:, 1]), axis=1)
+            labels[hit] = label
+            decided |= hit
+        return labels, decided
+
+    def _record(self, stage, seconds, count=1):
+        self.hits[stage] += count
+        reservoir = self._latency[stage]
+        reservoir[self._latency_n[stage] % len(reservoir)] = seconds
+        self._latency_n[stage] += 1
+
+    def classify(self, features, fallback):
+        """
+        Rule stages, then fallback(features) (the model) for the uncertain band
+
+        Returns:
+            [label] (same shape as MLDetector.classify)
+        """
+        start = time.perf_counter()
+        label = self.decide(features)
+        if label is not None:
+            self._record('benign_rule' if label == self.benign_label else 'attack_rule',
+                         time.perf_counter() - start)
+            return [label]
+        prediction = fallback(features)
+        self._record('model', time.perf_counter() - start)
+        return prediction
+
+    def classify_batch(self, X, fallback_batch):
+        """Vectorized cascade: rules on all rows, fallback_batch(rows) for the undecided ones"""
+        start = time.perf_counter()
+        labels, decided = self.decide_batch(X)
+        rule_seconds = time.perf_counter() - start
+        n_decided = int(decided.sum())
+        if n_decided:
+            benign = int(np.count_nonzero(labels[decided] == self.benign_label))
+            for stage, count in (('benign_rule', benign), ('attack_rule', n_decided - benign)):
+                if count:
+                    self._record(stage, rule_seconds / len(labels), count)
+        if n_decided < len(labels):
+            start = time.perf_counter()
+            undecided = ~decided
+            labels = labels.astype(object) if labels.dtype.kind in 'US' else labels
+            labels[undecided] = fallback_batch(np.asarray(X, dtype=np.float64).reshape(-1, 3)[undecided])
+            self._record('model', (time.perf_counter() - start + rule_seconds) / int(undecided.sum()),
+                         int(undecided.sum()))
+        return labels
+
+    def get_stats(self):
+        """Hits and hit rate per stage, latency percentiles (microseconds) per stage"""
+        total = sum(self.hits.values())
+        latency = {}
+        for stage in STAGES:
+            n = min(self._latency_n[stage], len(self._latency[stage]))
+            if n:
+                samples = self._latency[stage][:n] * 1e6
+                p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+                latency[stage] = {'p50': float(p50), 'p90': float(p90), 'p99': float(p99),
+                                  'max': float(samples.max())}
+        return {
+            'hits': dict(self.hits),
+            'hit_rate': {stage: (self.hits[stage] / total if total else 0.0) for stage in STAGES},
+            'latency_us': latency,
+        }
+
+    def describe(self):
+        def fmt(box):
+            if box is None:
+                return 'none'
+            return ' and '.join(f"{name} in [{lo:g}, {hi:g}]" for name, (lo, hi) in zip(('sfe', 'ssip', 'rfip'), box))
+        return f"benign if {fmt(self.benign_box)}; attack if {fmt(self.attack_box)}"
@@ -0,0 +1,116 @@
+"""
+Classification Batch Collector
+Gathers the feature vectors of switches that complete in the same polling
+cycle so they can be classified with one MLDetector.classify_batch() call
+instead of one model.predict() per switch.
+
+A batch is flushed by the caller when
+    - no other vector can join it before its deadline: no stats request is
+      outstanding and no switch is due within the window ('cycle')
+    - it reaches max_size vectors ('size')
+    - its deadline passes ('deadline'), measured from the first vector
+
+Polls are staggered (one phase per switch), so a batch only spans several
+switches if the deadline covers the gap between their phases - about
+base_interval / switches.
+Vectors are kept in arrival order, so per-switch verdicts stay in order.
+"""
+import time
+
+import numpy as np
+
+
+FLUSH_REASONS = ('cycle', 'size', 'deadline')
+
+
+class ClassificationBatch:
+    """Pending feature vectors of the current polling cycle"""
+
+    def __init__(self, max_size=64, deadline=0.25):
+        """
+        Args:
+            max_size: Flush once this many vectors are pending
+            deadline: Seconds a vector may wait for the rest of its cycle
+        """
+        self.max_size = max_size
+        self.deadline = deadline
+        self.generation = 0      # bumped on every drain (lets stale deadline timers bail out)
+        self._items = []         # (dpid, (sfe, ssip, rfip), context)
+        self._opened_at = None
+        self.stats = {'batches': 0, 'vectors': 0, 'max_batch': 0}
+        self.stats.update({f'flush_{reason}': 0 for reason in FLUSH_REASONS})
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, dpid, features, context=None, now=None):
+        """
+        Queue one feature vector
+
+        Returns:
+            True if it opened a new batch (the caller should arm the deadline timer)
+        """
+        opened = not self._items
+        if opened:
+            self._opened_at = time.time() if now is None else now
+        self._items.append((dpid, features, context))
+        return opened
+
+    def full(self):
+        return len(self._items) >= self.max_size
+
+    def expired(self, now=None):
+        if not self._items:
+            return False
+        now = time.time() if now is None else now
+        return now - self._opened_at >= self.deadline
+
+    def flush_reason(self, in_flight=0, next_poll=None, now=None):
+        """
+        Why the pending batch should be flushed now, or None to keep collecting
+
+        Args:
+            in_flight: Outstanding stats requests (their vectors may still join)
+            next_poll: Time the next switch is due (None = none scheduled)
+        """
+        if not self._items:
+            return None
+        if self.full():
+            return 'size'
+        if self.expired(now):
+            return 'deadline'
+        if in_flight == 0 and (next_poll is None or next_poll >= self._opened_at + self.deadline):
+            return 'cycle'
+        return None
+
+    def drain(self, reason='cycle'):
+        """
+        Take every pending vector
+
+        Returns:
+            (items, X): [(dpid, features, context)] in arrival order and the
+            features as an (n, 3) float array
+        """
+        items = self._items
+        self._items = []
+        self._opened_at = None
+        self.generation += 1
+        if not items:
+            return [], np.empty((0, 3))
+
+        n = len(items)
+        self.stats['batches'] += 1
+        self.stats['vectors'] += n
+        self.stats['max_batch'] = max(self.stats['max_batch'], n)
+        self.stats[f'flush_{reason}'] += 1
+
+        X = np.empty((n, 3))
+        for i, (_, features, _) in enumerate(items):
+            X[i] = features
+        return items, X
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['avg_batch'] = stats['vectors'] / stats['batches'] if stats['batches'] else 0.0
+        stats['pending'] = len(self._items)
+        return stats
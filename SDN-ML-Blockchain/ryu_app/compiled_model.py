@@ -0,0 +1,307 @@
+"""
+Compiled Tree Inference
+Flattens a trained DecisionTreeClassifier / RandomForestClassifier into plain
+node arrays (feature, threshold, left, right, leaf probabilities) that are
+walked without any sklearn call, input validation or dtype checks.
+
+Predictions are bit-identical to model.predict():
+    - features are rounded to float32 before comparing (sklearn trees do the same)
+    - forest leaf probabilities are summed in estimator order, then divided by
+      the number of trees, and the first maximum wins (np.argmax semantics)
+
+CompiledKernelModel does the same for the svm_approx pipeline (Nystroem RBF
+feature map + linear SVM): a fixed number of kernel evaluations and one dot
+product in numpy, without the Pipeline's per-call validation. Its predictions
+are checked against model.predict() (verify) rather than identical by
+construction, because the kernel is computed in a different order.
+"""
+from array import array
+
+import numpy as np
+
+
+class CompiledTreeModel:
+    """Flat-array evaluator for a fitted sklearn tree or forest classifier"""
+
+    def __init__(self, classes, roots, feature, threshold, left, right, leaf_proba, max_depth,
+                 n_features=3):
+        """
+        Args:
+            classes: model.classes_
+            roots: Index of each tree's root in the flat node arrays
+            feature, threshold, left, right: Flat node arrays (leaves point to themselves)
+            leaf_proba: (n_nodes, n_classes) class probabilities of each leaf
+            max_depth: Deepest root-to-leaf path over all trees
+            n_features: Input vector length
+        """
+        self.classes = np.asarray(classes)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.leaf_proba = np.asarray(leaf_proba, dtype=np.float64)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.n_trees = len(self.roots)
+        self.n_nodes = len(self.feature)
+
+        # Plain Python copies for the single-vector path (list indexing beats numpy scalars)
+        self._classes = self.classes.tolist()
+        self._roots = self.roots.tolist()
+        self._feature = self.feature.tolist()
+        self._threshold = self.threshold.tolist()
+        self._left = self.left.tolist()
+        self._right = self.right.tolist()
+        self._proba = self.leaf_proba.tolist()
+        # A single tree only needs the winning class of each leaf
+        self._leaf_class = [self._argmax(p) for p in self._proba] if self.n_trees == 1 else None
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Compile a fitted DecisionTreeClassifier or RandomForestClassifier
+
+        Raises:
+            ValueError: model is not a fitted single-output tree/forest classifier
+        """
+        if hasattr(model, 'estimators_'):
+            trees = [est.tree_ for est in model.estimators_]
+        elif hasattr(model, 'tree_'):
+            trees = [model.tree_]
+        else:
+            raise ValueError(f"Cannot compile {type(model).__name__}: not a fitted tree/forest classifier")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output classifiers can be compiled")
+        n_classes = len(model.classes_)
+
+        roots, features, thresholds, lefts, rights, probas = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for t in trees:
+            n = t.node_count
+            is_leaf = t.children_left == -1
+            node_ids = np.arange(offset, offset + n)
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, t.feature))
+            thresholds.append(np.where(is_leaf, 0.0, t.threshold))
+            lefts.append(np.where(is_leaf, node_ids, t.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, t.children_right + offset))
+            probas.append(_leaf_probabilities(t.value[:, 0, :n_classes]))
+            max_depth = max(max_depth, t.max_depth)
+            offset += n
+
+        return cls(model.classes_, roots, np.concatenate(features), np.concatenate(thresholds),
+                   np.concatenate(lefts), np.concatenate(rights), np.concatenate(probas), max_depth,
+                   n_features=getattr(model, 'n_features_in_', 3))
+
+    def describe(self):
+        return f"{self.n_trees} tree(s), {self.n_nodes} nodes"
+
+    @staticmethod
+    def _argmax(values):
+        best = 0
+        for i in range(1, len(values)):
+            if values[i] > values[best]:
+                best = i
+        return best
+
+    def predict_one(self, features):
+        """Class label for one [sfe, ssip, rfip] vector"""
+        x = array('f', features)  # float32 rounding, as sklearn's tree input
+        feature, threshold, left, right = self._feature, self._threshold, self._left, self._right
+
+        if self._leaf_class is not None:
+            node = 0
+            while left[node] != node:
+                node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+            return self._classes[self._leaf_class[node]]
+
+        proba = self._proba
+        acc = [0.0] * len(self._classes)
+        for node in self._roots:
+            while left[node] != node:
+                node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+            leaf = proba[node]
+            for c in range(len(acc)):
+                acc[c] += leaf[c]
+        n_trees = self.n_trees
+        return self._classes[self._argmax([a / n_trees for a in acc])]
+
+    def predict(self, X):
+        """Vectorized predict for an (n, 3) array (all rows and trees walked level by level)"""
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        leaf_proba = self.leaf_proba[nodes]          # (n, trees, classes)
+        acc = np.zeros((len(X), self.leaf_proba.shape[1]))
+        for t in range(self.n_trees):                # estimator order, like sklearn's accumulation
+            acc += leaf_proba[:, t]
+        if self.n_trees > 1:
+            acc /= self.n_trees
+        return self.classes.take(np.argmax(acc, axis=1))
+
+    def verify(self, model, X):
+        """
+        Compare against model.predict() on X (both the single and the vectorized path)
+
+        Returns:
+            Number of rows where either compiled path disagrees with sklearn
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        expected = model.predict(X)
+        batched = self.predict(X)
+        single = np.array([self.predict_one(row) for row in X.tolist()], dtype=expected.dtype)
+        return int(np.count_nonzero((batched != expected) | (single != expected)))
+
+
+class CompiledKernelModel:
+    """numpy evaluator for a fitted Pipeline(Nystroem(kernel='rbf'), linear classifier)"""
+
+    def __init__(self, classes, components, normalization, gamma, coef, intercept):
+        """
+        Args:
+            classes: model.classes_
+            components, normalization, gamma: Fitted Nystroem map
+            coef, intercept: Fitted linear classifier
+        """
+        self.classes = np.asarray(classes)
+        self.components = np.asarray(components, dtype=np.float64)
+        self.normalization = np.asarray(normalization, dtype=np.float64)
+        self.gamma = float(gamma)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.n_features = self.components.shape[1]
+        self.n_components = len(self.components)
+        # Fold the normalization into the linear weights: score = K(x, C) @ W + b
+        self.weights = self.normalization.T @ self.coef.T
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Compile a fitted Pipeline([... Nystroem(kernel='rbf'), linear classifier])
+
+        Raises:
+            ValueError: model is not such a pipeline
+        """
+        from sklearn.kernel_approximation import Nystroem
+
+        steps = getattr(model, 'steps', None)
+        if not steps or len(steps) != 2 or not isinstance(steps[0][1], Nystroem):
+            raise ValueError(f"Cannot compile {type(model).__name__}: expected Nystroem + linear classifier")
+        feature_map, linear = steps[0][1], steps[1][1]
+        if feature_map.kernel != 'rbf' or not hasattr(linear, 'coef_'):
+            raise ValueError("Only a fitted RBF Nystroem map with a linear classifier can be compiled")
+        gamma = feature_map.gamma if feature_map.gamma is not None else 1.0 / feature_map.components_.shape[1]
+        return cls(linear.classes_, feature_map.components_, feature_map.normalization_, gamma,
+                   linear.coef_, linear.intercept_)
+
+    @property
+    def n_nodes(self):
+        return self.n_components
+
+    def describe(self):
+        return f"{self.n_components} kernel components"
+
+    def _scores(self, X):
+        sq = ((X[:, None, :] - self.components[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-self.gamma * sq) @ self.weights + self.intercept
+
+    def _labels(self, scores):
+        if scores.shape[1] == 1:
+            return self.classes.take((scores[:, 0] > 0).astype(np.intp))
+        return self.classes.take(np.argmax(scores, axis=1))
+
+    def predict_one(self, features):
+        """Class label for one [sfe, ssip, rfip] vector"""
+        x = np.asarray(features, dtype=np.float64).reshape(1, self.n_features)
+        return self._labels(self._scores(x))[0]
+
+    def predict(self, X, chunk_rows=4096):
+        """Vectorized predict for an (n, 3) array"""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        out = np.empty(len(X), dtype=self.classes.dtype)
+        for start in range(0, len(X), chunk_rows):
+            out[start:start + chunk_rows] = self._labels(self._scores(X[start:start + chunk_rows]))
+        return out
+
+    def verify(self, model, X):
+        """
+        Compare against model.predict() on X (both the single and the vectorized path)
+
+        Returns:
+            Number of rows where either compiled path disagrees with sklearn
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        expected = model.predict(X)
+        batched = self.predict(X)
+        single = np.array([self.predict_one(row) for row in X], dtype=expected.dtype)
+        return int(np.count_nonzero((batched != expected) | (single != expected)))
+
+
+def compile_sklearn(model):
+    """
+    CompiledTreeModel for trees/forests, CompiledKernelModel for the svm_approx pipeline
+
+    Raises:
+        ValueError: the model type cannot be compiled
+    """
+    if hasattr(model, 'steps'):
+        return CompiledKernelModel.from_sklearn(model)
+    return CompiledTreeModel.from_sklearn(model)
+
+
+def _leaf_probabilities(value):
+    """
+    Per-leaf class probabilities exactly as sklearn's predict_proba returns them:
+    newer sklearn stores fractions in tree_.value, older versions store counts
+    that predict_proba normalizes.
+    """
+    value = np.asarray(value, dtype=np.float64)
+    sums = value.sum(axis=1)
+    if np.allclose(sums, 1.0):
+        return value.copy()
+    sums[sums == 0] = 1.0
+    return value / sums[:, None]
+
+
+def verification_samples(model, X_train=None, max_threshold_samples=5000, random_samples=2000, seed=0):
+    """
+    Inputs that exercise the compiled comparisons: the training rows, vectors
+    placed exactly on split thresholds (and one float32 step either side) and
+    random vectors over the usual SFE/SSIP/RFIP range.
+    """
+    rng = np.random.default_rng(seed)
+    parts = []
+    if X_train is not None and len(X_train):
+        parts.append(np.asarray(X_train, dtype=np.float64).reshape(-1, 3))
+
+    base = np.column_stack([rng.integers(-50, 300, random_samples),
+                            rng.integers(-50, 150, random_samples),
+                            rng.random(random_samples)]).astype(np.float64)
+    parts.append(base)
+
+    if hasattr(model, 'estimators_'):
+        trees = [est.tree_ for est in model.estimators_]
+    else:
+        trees = [model.tree_] if hasattr(model, 'tree_') else []
+    splits = [(f, thr) for t in trees for f, thr, left in zip(t.feature, t.threshold, t.children_left)
+              if left != -1]
+    if len(splits) > max_threshold_samples:
+        idx = rng.choice(len(splits), max_threshold_samples, replace=False)
+        splits = [splits[i] for i in idx]
+    if splits:
+        on = base[rng.integers(0, len(base), len(splits))].copy()
+        for row, (f, thr) in zip(on, splits):
+            row[f] = thr
+        for direction in (-np.inf, np.inf):
+            near = on.copy()
+            for row, (f, thr) in zip(near, splits):
+                row[f] = np.nextafter(np.float32(thr), np.float32(direction))
+            parts.append(near)
+        parts.append(on)
+    return np.concatenate(parts)
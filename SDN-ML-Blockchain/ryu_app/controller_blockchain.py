@@ -26,6 +26,9 @@ import json
 import sys
 import os
 import logging
+import atexit
+import signal
+import threading
 
 # Add blockchain path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'blockchain'))
@@ -34,10 +37,33 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..')) # Add parent dire
 
 try:
     from ryu_app.ml_detector import MLDetector
+    from ryu_app.event_queue import BlockchainEventQueue
+    from ryu_app.flow_features import FlowFeatureState
+    from ryu_app.flow_mirror import FlowTableMirror
+    from ryu_app.poll_scheduler import PollScheduler
+    from ryu_app.csv_writer import GroupCommitCSVWriter
+    from ryu_app.telemetry_store import TelemetryWriter
+    from ryu_app.classify_batch import ClassificationBatch
+    from ryu_app.cascade import STAGES as CASCADE_STAGES
+    from ryu_app.inference_worker import InferenceWorker
+    from ryu_app.online_learning import OnlineLearner
 except ImportError:
     from ml_detector import MLDetector
+    from event_queue import BlockchainEventQueue
+    from flow_features import FlowFeatureState
+    from flow_mirror import FlowTableMirror
+    from poll_scheduler import PollScheduler
+    from csv_writer import GroupCommitCSVWriter
+    from telemetry_store import TelemetryWriter
+    from classify_batch import ClassificationBatch
+    from cascade import STAGES as CASCADE_STAGES
+    from inference_worker import InferenceWorker
+    from online_learning import OnlineLearner
 
-import requests
+try:
+    from blockchain.http_session import PooledHTTPSession
+except ImportError:
+    from http_session import PooledHTTPSession
 
 # If BLOCKCHAIN_ADAPTER_URL is set, use REST adapter; otherwise fall back to CLI client
 BLOCKCHAIN_ADAPTER_URL = os.environ.get('BLOCKCHAIN_ADAPTER_URL', 'http://localhost:3001')
@@ -45,26 +71,44 @@ if BLOCKCHAIN_ADAPTER_URL:
     class BlockchainClient:
         def __init__(self, base_url=BLOCKCHAIN_ADAPTER_URL):
             self.base_url = base_url.rstrip('/')
+            # Keep-alive connection pool; size/timeouts via BLOCKCHAIN_HTTP_* env vars
+            self.http = PooledHTTPSession(self.base_url)
 
         def record_event(self, event):
             try:
-                r = requests.post(f"{self.base_url}/api/v1/events", json=event, timeout=10)
+                r = self.http.post("/api/v1/events", json=event)
                 r.raise_for_status()
                 return True
             except Exception as e:
                 print('Adapter record_event error:', e)
                 return False
 
+        def record_events(self, events):
+            """Record a batch of events in one transaction via the adapter batch endpoint"""
+            if not events:
+                return True
+            try:
+                r = self.http.post("/api/v1/events/batch", json=list(events))
+                r.raise_for_status()
+                return True
+            except Exception as e:
+                print('Adapter record_events error:', e)
+                return False
+
         def get_recent_attacks(self, time_window=300):
             """Get recent attacks across all switches within time_window seconds"""
             try:
-                r = requests.get(f"{self.base_url}/api/v1/attacks/recent?timeWindow={time_window}", timeout=10)
+                r = self.http.get("/api/v1/attacks/recent", params={'timeWindow': time_window})
                 r.raise_for_status()
                 return r.json().get('attacks', [])
             except Exception as e:
                 print('Adapter get_recent_attacks error:', e)
                 return []
 
+        def get_http_stats(self):
+            """Per-endpoint call count, errors and latency of adapter requests"""
+            return self.http.get_stats()
+
 
     BLOCKCHAIN_ENABLED = True
 else:
@@ -79,16 +123,107 @@ TEST_TYPE = int(os.environ.get('TEST_TYPE', '1'))
 # PREVENTION: 0 = no blocking, 1 = block attacks (default: 1 for detection mode, 0 for collection mode)
 PREVENTION = int(os.environ.get('PREVENTION', '1' if APP_TYPE == 1 else '0'))
 INTERVAL = 2  # Data collection interval in seconds
+# FLOW_MIRROR: 1 = compute features from the controller-side flow table mirror,
+# 0 = dump the full flow table of every switch each INTERVAL
+FLOW_MIRROR = int(os.environ.get('FLOW_MIRROR', '1'))
+FLOW_RECONCILE_INTERVAL = float(os.environ.get('FLOW_RECONCILE_INTERVAL', '30'))  # seconds between full dumps
+# FLOW_POLL_MODE (flow-stats dumps when FLOW_MIRROR=0):
+#   'full'      - unfiltered OFPFlowStatsRequest (table-miss + blocking rules included)
+#   'cookie'    - only controller-installed L3 flows, selected by cookie namespace
+#   'aggregate' - 'cookie' plus an OFPAggregateStatsRequest pre-check that skips the
+#                 dump when flow and byte counters did not change since the last poll
+FLOW_POLL_MODE = os.environ.get('FLOW_POLL_MODE', 'full')
+
+# Adaptive polling: stagger polls per switch, back off idle switches, poll faster under attack.
+# Data collection mode always keeps the fixed INTERVAL so training features stay comparable.
+ADAPTIVE_POLLING = int(os.environ.get('ADAPTIVE_POLLING', '1'))
+POLL_MIN_INTERVAL = float(os.environ.get('POLL_MIN_INTERVAL', '0.5'))
+POLL_MAX_INTERVAL = float(os.environ.get('POLL_MAX_INTERVAL', '10'))
+POLL_MAX_IN_FLIGHT = int(os.environ.get('POLL_MAX_IN_FLIGHT', '16'))
+POLL_STATS_INTERVAL = 60  # Log per-switch polling stats every N seconds
+
+# CSV logging: one background writer keeps files open and group-commits rows.
+# CSV_DURABILITY: 'none' (no fsync), 'interval' (fsync every CSV_COMMIT_INTERVAL s), 'every-row'
+CSV_DURABILITY = os.environ.get('CSV_DURABILITY', 'interval')
+CSV_COMMIT_INTERVAL = float(os.environ.get('CSV_COMMIT_INTERVAL', '1.0'))
+
+# Columnar telemetry store (data/telemetry): typed per-tick columns for the visualization scripts
+TELEMETRY_STORE = int(os.environ.get('TELEMETRY_STORE', '1'))
+TELEMETRY_SEGMENT_MB = int(os.environ.get('TELEMETRY_SEGMENT_MB', '64'))
+TELEMETRY_SEGMENT_SECONDS = float(os.environ.get('TELEMETRY_SEGMENT_SECONDS', '3600'))
+TELEMETRY_FLUSH_INTERVAL = 5  # Append buffered ticks to disk at least every N seconds
+
+# Cookie namespaces: upper 16 bits of the 64-bit cookie, lower 48 bits = flow serial number
+COOKIE_NS_SHIFT = 48
+COOKIE_NS_MASK = 0xFFFF << COOKIE_NS_SHIFT
+COOKIE_NS_TABLE_MISS = 0x1
+COOKIE_NS_L3 = 0x2
+COOKIE_NS_BLOCK = 0x3
 BLOCKCHAIN_LOG = True  # Enable blockchain logging
 
+# Blockchain submission queue: handlers only enqueue, a hub greenthread submits
+BLOCKCHAIN_QUEUE_SIZE = int(os.environ.get('BLOCKCHAIN_QUEUE_SIZE', '1000'))
+BLOCKCHAIN_BATCH_SIZE = int(os.environ.get('BLOCKCHAIN_BATCH_SIZE', '20'))
+BLOCKCHAIN_FLUSH_INTERVAL = float(os.environ.get('BLOCKCHAIN_FLUSH_INTERVAL', '0.5'))  # seconds
+BLOCKCHAIN_STATS_INTERVAL = 60  # Log queue counters every N seconds
+
 # IP Spoofing Detection Configuration
 # Set to 0 to disable IP Spoofing Detection (allow ML to handle all detection)
 # Set to 1 to enable IP Spoofing Detection (blocks spoofed IPs before ML)
 ENABLE_IP_SPOOFING_DETECTION = int(os.environ.get('ENABLE_IP_SPOOFING_DETECTION', '0'))
 
 # ML Model Configuration
-# Supported: 'decision_tree', 'random_forest', 'svm', 'naive_bayes'
+# Supported: 'decision_tree', 'random_forest', 'svm', 'naive_bayes', 'svm_approx', 'sgd'
 ML_MODEL_TYPE = os.environ.get('ML_MODEL_TYPE', 'decision_tree')
+# Evaluate decision_tree / random_forest from compiled flat arrays (verified identical to sklearn)
+ML_COMPILED = int(os.environ.get('ML_COMPILED', '1'))
+# Retrain from CSV when the saved model artifact fails its checks (0 = refuse to start instead)
+ML_RETRAIN_ON_LOAD_FAILURE = int(os.environ.get('ML_RETRAIN_ON_LOAD_FAILURE', '1'))
+# Train a missing model in a worker process; the threshold rule classifies until it is swapped in
+ML_BACKGROUND_TRAINING = int(os.environ.get('ML_BACKGROUND_TRAINING', '1'))
+# Train on unique (sfe, ssip, rfip, label) rows weighted by count instead of every repeated row
+ML_DEDUP = int(os.environ.get('ML_DEDUP', '1'))
+# Hot reload: a new ml_model_<type>.pkl is validated off the event loop and swapped in without
+# restarting ryu-manager (SIGHUP reloads now, SIGUSR1 rolls back to the previous model)
+ML_HOT_RELOAD = int(os.environ.get('ML_HOT_RELOAD', '1'))
+ML_RELOAD_INTERVAL = float(os.environ.get('ML_RELOAD_INTERVAL', '5'))  # seconds
+# Precomputed (sfe, ssip, rfip) decision grid: classification becomes an array index for any model.
+# ML_GRID_RANGE is the inclusive SFE/SSIP range; ML_GRID_OUT_OF_RANGE is 'fallback' (use model) or 'clamp'
+ML_GRID = int(os.environ.get('ML_GRID', '0'))
+ML_GRID_RANGE = tuple(int(v) for v in os.environ.get('ML_GRID_RANGE', '-32,127').split(','))
+ML_GRID_RFIP_STEPS = int(os.environ.get('ML_GRID_RFIP_STEPS', '33'))
+ML_GRID_OUT_OF_RANGE = os.environ.get('ML_GRID_OUT_OF_RANGE', 'fallback')
+# Rule-first cascade: interval boxes calibrated on the training data answer clear-cut vectors,
+# only the uncertain band between them reaches the model (per-stage hit rates / latency logged)
+ML_CASCADE = int(os.environ.get('ML_CASCADE', '0'))
+# A rule box is kept only if random vectors inside it agree with the model at least this much
+ML_CASCADE_MIN_AGREEMENT = float(os.environ.get('ML_CASCADE_MIN_AGREEMENT', '1.0'))
+# Inference worker: classify in a separate process fed through a shared-memory ring, so slow models
+# do not block the hub. Vectors are classified inline while the worker is not ready, once they wait
+# longer than ML_INFERENCE_DEADLINE, or when the ring (ML_INFERENCE_QUEUE vectors) is full -
+# ML_INFERENCE_OVERFLOW=drop skips those instead (no verdict, counted in the stats)
+ML_INFERENCE_WORKER = int(os.environ.get('ML_INFERENCE_WORKER', '0'))
+ML_INFERENCE_QUEUE = int(os.environ.get('ML_INFERENCE_QUEUE', '1024'))
+ML_INFERENCE_DEADLINE = float(os.environ.get('ML_INFERENCE_DEADLINE', '0.2'))  # seconds
+ML_INFERENCE_OVERFLOW = os.environ.get('ML_INFERENCE_OVERFLOW', 'inline')
+ML_INFERENCE_POLL_INTERVAL = 0.002  # seconds between verdict checks while vectors are queued
+# Online learning (naive_bayes / sgd only): operator-confirmed 'sfe,ssip,rfip,label' lines appended to
+# ML_FEEDBACK_FILE are applied with partial_fit in mini-batches off the event loop; the updated model
+# is checkpointed to ml_model_<type>.pkl every ML_CHECKPOINT_INTERVAL seconds and on exit, together with
+# the feedback file position it contains (a restart resumes there). With ML_INFERENCE_WORKER=1 every
+# update is checkpointed and the worker reloads it within ML_RELOAD_INTERVAL; until then its verdicts
+# come from the previous model while inline fallbacks already use the updated one
+ML_ONLINE_LEARNING = int(os.environ.get('ML_ONLINE_LEARNING', '0'))
+ML_FEEDBACK_FILE = os.environ.get('ML_FEEDBACK_FILE', os.path.join(os.path.dirname(__file__), '..', 'data',
+                                                                   'feedback.csv'))
+ML_ONLINE_BATCH = int(os.environ.get('ML_ONLINE_BATCH', '32'))
+ML_CHECKPOINT_INTERVAL = float(os.environ.get('ML_CHECKPOINT_INTERVAL', '300'))  # seconds
+
+# Batched classification: feature vectors completed within CLASSIFY_BATCH_DEADLINE share one predict()
+# call. Polls are staggered (about INTERVAL / switches apart), so the window has to span that gap
+CLASSIFY_BATCH = int(os.environ.get('CLASSIFY_BATCH', '1'))
+CLASSIFY_BATCH_DEADLINE = float(os.environ.get('CLASSIFY_BATCH_DEADLINE', '0.25'))  # seconds
+CLASSIFY_BATCH_MAX = int(os.environ.get('CLASSIFY_BATCH_MAX', '64'))
 
 # Logging setup: always write to logs/ryu_controller.log (alongside stdout).
 # Attach handler to the ROOT logger so self.logger (from Ryu) also propagates.
@@ -113,10 +248,18 @@ def _ensure_file_logger():
 
 _ensure_file_logger()
 
+csv_writer = GroupCommitCSVWriter(durability=CSV_DURABILITY, commit_interval=CSV_COMMIT_INTERVAL)
+atexit.register(csv_writer.close)
+
+if TELEMETRY_STORE:
+    telemetry = TelemetryWriter(segment_bytes=TELEMETRY_SEGMENT_MB * 1024 * 1024,
+                                segment_seconds=TELEMETRY_SEGMENT_SECONDS,
+                                background=True)
+    atexit.register(telemetry.close)
+else:
+    telemetry = None
+
 # Global variables
-gflows = []
-old_ssip_len = 0
-prev_flow_count = 0
 FLOW_SERIAL_NO = 0
 iteration = 0
 
@@ -127,6 +270,11 @@ def get_flow_number():
     return FLOW_SERIAL_NO
 
 
+def make_cookie(namespace, serial_no):
+    """Encode a flow serial number into a cookie namespace (see COOKIE_NS_*)"""
+    return (namespace << COOKIE_NS_SHIFT) | (serial_no & ~COOKIE_NS_MASK)
+
+
 def get_data_path(filename):
     """Get path for data files, create directory if needed"""
     base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -162,8 +310,7 @@ def init_flowcountcsv(dpid):
 
 def update_flowcountcsv(dpid, row):
     fname = get_data_path("switch_" + str(dpid) + "_flowcount.csv")
-    writ = csv.writer(open(fname, 'a', buffering=1), delimiter=',')
-    writ.writerow(row)
+    csv_writer.write_row(fname, list(row), header=["time", "flowcount"])
 
 
 def update_portcsv(dpid, row, label):
@@ -171,17 +318,9 @@ def update_portcsv(dpid, row, label):
     Append a row to per-switch data CSV and include the provided label.
     """
     fname = get_data_path("switch_" + str(dpid) + "_data.csv")
-    # Ensure file has header (init_portcsv should have created it)
-    with open(fname, 'a', newline='') as fh:
-        writ = csv.writer(fh, delimiter=',')
-        row_to_write = list(row)
-        row_to_write.append(str(label))
-        writ.writerow(row_to_write)
-        fh.flush()
-        try:
-            os.fsync(fh.fileno())
-        except Exception:
-            pass
+    row_to_write = list(row)
+    row_to_write.append(str(label))
+    csv_writer.write_row(fname, row_to_write, header=["time", "sfe", "ssip", "rfip", "type"])
 
 
 def update_resultcsv(row, label, reason='ml', confidence=1.0, dpid=None, timestamp=None):
@@ -197,14 +336,10 @@ def update_resultcsv(row, label, reason='ml', confidence=1.0, dpid=None, timesta
     # Chọn thư mục dựa trên APP_TYPE
     if APP_TYPE == 0:
         # Collection mode → dataset/result.csv (training data)
-        target_dir = os.path.join(base_dir, '..', 'dataset')
-        os.makedirs(target_dir, exist_ok=True)
-        fname = os.path.join(target_dir, 'result.csv')
+        fname = os.path.join(base_dir, '..', 'dataset', 'result.csv')
     else:
         # Detection mode → data/result.csv (detection results)
-        target_dir = os.path.join(base_dir, '..', 'data')
-        os.makedirs(target_dir, exist_ok=True)
-        fname = os.path.join(target_dir, 'result.csv')
+        fname = os.path.join(base_dir, '..', 'data', 'result.csv')
     
     # Header 4 cột giống tác giả gốc
     header = ['sfe', 'ssip', 'rfip', 'label']
@@ -215,24 +350,8 @@ def update_resultcsv(row, label, reason='ml', confidence=1.0, dpid=None, timesta
     rfip_val = str(row[2]) if len(row) > 2 else '1.0'
     label_val = int(label)
 
-    write_header = not os.path.exists(fname) or os.path.getsize(fname) == 0
-    try:
-        with open(fname, 'a', newline='') as fh:
-            writer = csv.writer(fh, delimiter=',')
-            if write_header:
-                writer.writerow(header)
-            # Chỉ ghi 4 cột: sfe, ssip, rfip, label
-            writer.writerow([sfe_val, ssip_val, rfip_val, label_val])
-            fh.flush()
-            try:
-                os.fsync(fh.fileno())
-            except Exception:
-                pass
-    except Exception as e:
-        try:
-            print(f"Error writing result.csv: {e}")
-        except Exception:
-            pass
+    # Chỉ ghi 4 cột: sfe, ssip, rfip, label (background writer tạo thư mục + header)
+    csv_writer.write_row(fname, [sfe_val, ssip_val, rfip_val, label_val], header=header)
 
 
 class BlockchainSDNController(app_manager.RyuApp):
@@ -249,34 +368,265 @@ class BlockchainSDNController(app_manager.RyuApp):
         self.arp_ip_to_port = {}
         self.blocked_ports = {}
         self.last_normal_traffic_log = {}  # Track last normal traffic log time per switch (to avoid spam)
-        self.old_ssip_len_per_switch = {}  # Track old SSIP length per switch (for accurate SSIP calculation)
+        self.flow_features = {}  # Per-switch FlowFeatureState (SFE/SSIP/RFIP history)
+        self.flow_mirrors = {}  # Per-switch FlowTableMirror (when FLOW_MIRROR=1)
+        self.last_reconcile = {}  # Per-switch time of the last full flow-stats dump
+        self.last_aggregate = {}  # Per-switch (flow_count, byte_count) of the last aggregate reply
+        self.filtered_requests = set()  # (dpid, xid) of cookie-filtered flow-stats requests
+        self.poll_scheduler = PollScheduler(base_interval=INTERVAL,
+                                            min_interval=POLL_MIN_INTERVAL,
+                                            max_interval=POLL_MAX_INTERVAL,
+                                            max_in_flight=POLL_MAX_IN_FLIGHT,
+                                            adaptive=bool(ADAPTIVE_POLLING) and APP_TYPE == 1)
         
         # Initialize blockchain client (must succeed)
         if BLOCKCHAIN_ENABLED and BLOCKCHAIN_LOG:
             self.blockchain_client = BlockchainClient()
+            self.blockchain_queue = BlockchainEventQueue(max_size=BLOCKCHAIN_QUEUE_SIZE,
+                                                         batch_size=BLOCKCHAIN_BATCH_SIZE)
+            self.blockchain_thread = hub.spawn(self._blockchain_submitter)
             self.logger.info("✓ Blockchain client initialized successfully")
         else:
             self.blockchain_client = None
+            self.blockchain_queue = None
 
         # Initialize ML detector
         if APP_TYPE == 1:
             # Initialize ML detector for attack detection (GIỐNG TÁC GIẢ GỐC)
-            self.ml_detector = MLDetector(model_type=ML_MODEL_TYPE)
-            self.logger.info(f"✓ ML Detector loaded: {ML_MODEL_TYPE}")
+            self.ml_detector = MLDetector(model_type=ML_MODEL_TYPE, compiled=bool(ML_COMPILED),
+                                          retrain_on_load_failure=bool(ML_RETRAIN_ON_LOAD_FAILURE),
+                                          background_training=bool(ML_BACKGROUND_TRAINING),
+                                          dedup=bool(ML_DEDUP))
+            if self.ml_detector.load_seconds is not None:
+                self.logger.info(f"✓ ML Detector loaded: {ML_MODEL_TYPE} "
+                                 f"(model load {self.ml_detector.load_seconds * 1000:.1f} ms)")
+            elif not self.ml_detector.is_trained:
+                self.logger.info(f"✓ ML Detector started: {ML_MODEL_TYPE} training in background "
+                                 "(threshold fallback until ready)")
+            else:
+                self.logger.info(f"✓ ML Detector loaded: {ML_MODEL_TYPE} (trained at startup)")
+            if ML_GRID:
+                self.ml_detector.build_grid(sfe_range=ML_GRID_RANGE, ssip_range=ML_GRID_RANGE,
+                                            rfip_steps=ML_GRID_RFIP_STEPS,
+                                            out_of_range=ML_GRID_OUT_OF_RANGE)
+            if ML_CASCADE:
+                self.ml_detector.enable_cascade(min_agreement=ML_CASCADE_MIN_AGREEMENT)
+            if ML_HOT_RELOAD:
+                self.ml_detector.start_watcher(interval=ML_RELOAD_INTERVAL)
+                self._install_model_signals()
+        if APP_TYPE == 1 and CLASSIFY_BATCH:
+            self.classify_batch = ClassificationBatch(max_size=CLASSIFY_BATCH_MAX,
+                                                      deadline=CLASSIFY_BATCH_DEADLINE)
+        else:
+            self.classify_batch = None
+        self.online_learner = None
+        if APP_TYPE == 1 and ML_ONLINE_LEARNING:
+            try:
+                self.online_learner = OnlineLearner(self.ml_detector, feedback_path=os.path.abspath(ML_FEEDBACK_FILE),
+                                                    batch_size=ML_ONLINE_BATCH,
+                                                    checkpoint_interval=(0.0 if ML_INFERENCE_WORKER
+                                                                         else ML_CHECKPOINT_INTERVAL))
+            except ValueError as e:
+                self.logger.warning(f"Online learning disabled: {e}")
+            else:
+                self.online_learner.start()
+                atexit.register(self.online_learner.stop)
+        self.inference_worker = None
+        if APP_TYPE == 1 and ML_INFERENCE_WORKER:
+            self.inference_worker = InferenceWorker(
+                self.ml_detector,
+                dict(model_type=ML_MODEL_TYPE, compiled=bool(ML_COMPILED),
+                     retrain_on_load_failure=bool(ML_RETRAIN_ON_LOAD_FAILURE), dedup=bool(ML_DEDUP)),
+                capacity=ML_INFERENCE_QUEUE, deadline=ML_INFERENCE_DEADLINE, overflow=ML_INFERENCE_OVERFLOW,
+                grid_options=self.ml_detector.grid_options,
+                cascade_options=self.ml_detector.cascade_options,
+                # The worker follows online updates through the checkpoints, even without hot reload
+                reload_interval=(ML_RELOAD_INTERVAL if ML_HOT_RELOAD or self.online_learner is not None
+                                 else None))
+            self.inference_worker.start()
+            atexit.register(self.inference_worker.stop)
+            self.inference_wakeup = hub.Event()
+            self.inference_thread = hub.spawn(self._inference_collector)
         
+        if FLOW_POLL_MODE not in ('full', 'cookie', 'aggregate'):
+            raise ValueError(f"Unknown FLOW_POLL_MODE: {FLOW_POLL_MODE} (use full, cookie or aggregate)")
+        if FLOW_MIRROR:
+            self.logger.info(f"✓ Flow stats: mirror (full dump every {FLOW_RECONCILE_INTERVAL:.0f}s)")
+        else:
+            self.logger.info(f"✓ Flow stats: polling mode '{FLOW_POLL_MODE}'")
+
         # Log IP Spoofing Detection status
         if ENABLE_IP_SPOOFING_DETECTION:
             self.logger.info("✓ IP Spoofing Detection: ENABLED")
         else:
             self.logger.info("✓ IP Spoofing Detection: DISABLED (ML will handle all detection)")
 
+    def _install_model_signals(self):
+        def reload_now(signum, frame):
+            # Loading and warming must not block the event loop
+            threading.Thread(target=self.ml_detector.reload_model, name='model-reload', daemon=True).start()
+
+        def rollback(signum, frame):
+            self.ml_detector.rollback()
+
+        try:
+            signal.signal(signal.SIGHUP, reload_now)
+            signal.signal(signal.SIGUSR1, rollback)
+        except ValueError:
+            # Not in the main thread (e.g. embedded in tests): file watching still works
+            self.logger.warning("Model reload signals unavailable (not in main thread)")
+
     def _flow_monitor(self):
-        """Monitor flow statistics periodically"""
+        """Monitor flow statistics, polling each switch when the scheduler says it is due"""
         hub.sleep(5)  # Initial delay
+        last_stats_log = time.time()
+        last_telemetry_flush = last_stats_log
+        while True:
+            now = time.time()
+            for dpid in self.poll_scheduler.due(now):
+                dp = self.datapaths.get(dpid)
+                if dp is None:
+                    self.poll_scheduler.remove(dpid)
+                    continue
+                self._poll_datapath(dp)
+
+            if now - last_stats_log >= POLL_STATS_INTERVAL:
+                last_stats_log = now
+                for dpid, stats in sorted(self.poll_scheduler.get_stats().items()):
+                    self.logger.info(
+                        "📡 Polling switch {}: interval={:.2f}s effective={} reply={} timeouts={}".format(
+                            dpid, stats['interval'],
+                            f"{stats['effective_period']:.2f}s" if stats['effective_period'] is not None else "-",
+                            f"{stats['reply_latency_ms']:.1f}ms" if stats['reply_latency_ms'] is not None else "-",
+                            stats['timeouts']
+                        )
+                    )
+                if self.classify_batch is not None:
+                    bstats = self.classify_batch.get_stats()
+                    self.logger.info(
+                        "🧮 Classification batches: {} vectors in {} batches (avg {:.1f}, max {}), "
+                        "flush cycle/size/deadline={}/{}/{}".format(
+                            bstats['vectors'], bstats['batches'], bstats['avg_batch'], bstats['max_batch'],
+                            bstats['flush_cycle'], bstats['flush_size'], bstats['flush_deadline']
+                        )
+                    )
+                if self.inference_worker is not None:
+                    wstats = self.inference_worker.get_stats()
+                    self.logger.info(
+                        "🧵 Inference worker {}: queued={} completed={} pending={} late={} "
+                        "inline not-ready/overflow/lagging={}/{}/{} dropped={}".format(
+                            'up' if wstats['ready'] else 'down', wstats['submitted'],
+                            wstats['completed'], wstats['pending'], wstats['late'], wstats['inline_not_ready'],
+                            wstats['inline_overflow'], wstats['inline_lagging'], wstats['dropped']
+                        )
+                    )
+                if self.online_learner is not None:
+                    ostats = self.online_learner.get_stats()
+                    self.logger.info(
+                        "🎓 Online learning: {} confirmed labels, {} applied in {} updates, pending={} "
+                        "failed={} dropped={} bad lines={} checkpoints={}".format(
+                            ostats['received'], ostats['applied'], ostats['updates'], ostats['pending'],
+                            ostats['failed'], ostats['dropped'], ostats['bad_lines'], ostats['checkpoints']
+                        )
+                    )
+                cstats = self.ml_detector.get_cascade_stats() if APP_TYPE == 1 else None
+                if cstats is not None:
+                    self.logger.info("🪜 Cascade: " + ", ".join(
+                        "{} {} ({:.1%}, p50/p99 {})".format(
+                            stage, cstats['hits'][stage], cstats['hit_rate'][stage],
+                            "{:.1f}/{:.1f}us".format(cstats['latency_us'][stage]['p50'],
+                                                     cstats['latency_us'][stage]['p99'])
+                            if stage in cstats['latency_us'] else "-"
+                        )
+                        for stage in CASCADE_STAGES
+                    ))
+
+            if telemetry and now - last_telemetry_flush >= TELEMETRY_FLUSH_INTERVAL:
+                last_telemetry_flush = now
+                telemetry.flush()
+
+            hub.sleep(self.poll_scheduler.next_wakeup(time.time()))
+
+    def _poll_datapath(self, datapath):
+        """
+        Produce one feature vector for a switch: from the flow table mirror when
+        available, or via a full flow-stats dump (which also reconciles the mirror)
+        """
+        dpid = datapath.id
+        mirror = self.flow_mirrors.get(dpid)
+        now = time.time()
+
+        if mirror is None:
+            self.request_flow_metrics(datapath, mode=FLOW_POLL_MODE)
+            return
+
+        if now - self.last_reconcile.get(dpid, 0) >= FLOW_RECONCILE_INTERVAL:
+            # Reconciliation needs the whole table, whatever FLOW_POLL_MODE says
+            xid = self.request_flow_metrics(datapath)
+            mirror.begin_reconcile(xid, request_time=now, max_age=FLOW_RECONCILE_INTERVAL)
+            self.last_reconcile[dpid] = now
+            return
+
+        mirror.expire(now)
+        feature_state = self._get_feature_state(dpid)
+        feature_state.begin('mirror')
+        mirror.feed(feature_state, 'mirror')
+        sfe, ssip, rfip = feature_state.finish('mirror')
+        self._handle_flow_features(dpid, sfe, ssip, rfip, feature_state.prev_flow_count)
+
+    def _queue_blockchain_event(self, event_data):
+        """Enqueue an event for the blockchain submitter (never blocks the hub)"""
+        if not self.blockchain_queue.enqueue(event_data):
+            self.logger.warning(
+                f"Blockchain queue full, dropped {event_data.get('event_type')} event "
+                f"(switch {event_data.get('switch_id')})"
+            )
+            return False
+        return True
+
+    def _submit_blockchain_events(self, events):
+        """Submit events as one RecordEvents transaction (or RecordEvent for a single event)"""
+        start = time.time()
+        try:
+            if len(events) == 1:
+                ok = self.blockchain_client.record_event(events[0])
+            else:
+                ok = self.blockchain_client.record_events(events)
+        except Exception as e:
+            self.logger.error(f"Blockchain logging error: {e}")
+            ok = False
+        self.blockchain_queue.record_submit(len(events), time.time() - start, ok)
+        return ok
+
+    def _blockchain_submitter(self):
+        """Drain the blockchain event queue in batches (dedicated greenthread)"""
+        last_stats_log = time.time()
         while True:
-            for dp in self.datapaths.values():
-                self.request_flow_metrics(dp)
-            hub.sleep(INTERVAL)
+            batch = self.blockchain_queue.pop_batch()
+            if not batch:
+                hub.sleep(BLOCKCHAIN_FLUSH_INTERVAL)
+            else:
+                self._submit_blockchain_events([event_data for _, event_data in batch])
+
+            now = time.time()
+            if now - last_stats_log >= BLOCKCHAIN_STATS_INTERVAL:
+                last_stats_log = now
+                stats = self.blockchain_queue.get_stats()
+                self.logger.info(
+                    "⛓️ Blockchain queue: depth={} submitted={} failed={} dropped={} "
+                    "latency avg={:.1f}ms p95={:.1f}ms".format(
+                        stats['depth'], stats['submitted'], stats['failed'], stats['dropped'],
+                        stats['submit_latency_ms']['avg'], stats['submit_latency_ms']['p95']
+                    )
+                )
+                if hasattr(self.blockchain_client, 'get_http_stats'):
+                    for path, http_stats in self.blockchain_client.get_http_stats().items():
+                        self.logger.info(
+                            "⛓️ HTTP {}: calls={} errors={} latency avg={:.1f}ms p95={:.1f}ms".format(
+                                path, http_stats['count'], http_stats['errors'],
+                                http_stats['latency_ms']['avg'], http_stats['latency_ms']['p95']
+                            )
+                        )
 
     @set_ev_cls(ofp_event.EventOFPSwitchFeatures, CONFIG_DISPATCHER)
     def switch_features_handler(self, ev):
@@ -285,8 +635,13 @@ class BlockchainSDNController(app_manager.RyuApp):
         ofproto = datapath.ofproto
         parser = datapath.ofproto_parser
         self.datapaths[datapath.id] = datapath
+        self.poll_scheduler.add(datapath.id)
+        if FLOW_MIRROR:
+            # Fresh mirror; the first poll reconciles it with a full dump
+            self.flow_mirrors[datapath.id] = FlowTableMirror()
+            self.last_reconcile[datapath.id] = 0
 
-        flow_serial_no = get_flow_number()
+        flow_serial_no = make_cookie(COOKIE_NS_TABLE_MISS, get_flow_number())
         match = parser.OFPMatch()
         actions = [parser.OFPActionOutput(ofproto.OFPP_CONTROLLER,
                                           ofproto.OFPCML_NO_BUFFER)]
@@ -297,206 +652,279 @@ class BlockchainSDNController(app_manager.RyuApp):
         
         # Log switch connection to blockchain
         if self.blockchain_client:
-            try:
-                event_data = {
-                    'event_type': 'switch_connected',
-                    'switch_id': str(datapath.id),
-                    'timestamp': int(time.time())
-                }
-                self.blockchain_client.record_event(event_data)
-                self.logger.info(f"⛓️ Switch {datapath.id} connection logged to blockchain")
-            except Exception as e:
-                self.logger.error(f"Blockchain logging error: {e}")
+            event_data = {
+                'event_type': 'switch_connected',
+                'switch_id': str(datapath.id),
+                'timestamp': int(time.time())
+            }
+            if self._queue_blockchain_event(event_data):
+                self.logger.info(f"⛓️ Switch {datapath.id} connection queued for blockchain")
+
+    def request_flow_metrics(self, datapath, mode='full'):
+        """
+        Request flow statistics from switch
 
-    def request_flow_metrics(self, datapath):
-        """Request flow statistics from switch"""
+        Args:
+            mode: 'full' (whole table), 'cookie' (controller-installed L3 flows only)
+                  or 'aggregate' (aggregate counters first, see aggregate_stats_reply_handler)
+
+        Returns:
+            xid of the request sent
+        """
         ofp = datapath.ofproto
         ofp_parser = datapath.ofproto_parser
-        req = ofp_parser.OFPFlowStatsRequest(datapath)
+        if mode == 'full':
+            req = ofp_parser.OFPFlowStatsRequest(datapath)
+        elif mode == 'cookie':
+            req = ofp_parser.OFPFlowStatsRequest(datapath,
+                                                 cookie=COOKIE_NS_L3 << COOKIE_NS_SHIFT,
+                                                 cookie_mask=COOKIE_NS_MASK)
+        elif mode == 'aggregate':
+            req = ofp_parser.OFPAggregateStatsRequest(datapath, 0, ofp.OFPTT_ALL,
+                                                      ofp.OFPP_ANY, ofp.OFPG_ANY,
+                                                      COOKIE_NS_L3 << COOKIE_NS_SHIFT,
+                                                      COOKIE_NS_MASK, ofp_parser.OFPMatch())
+        else:
+            raise ValueError(f"Unknown flow poll mode: {mode}")
         datapath.send_msg(req)
+        if mode == 'cookie':
+            self.filtered_requests.add((datapath.id, req.xid))
+        return req.xid
 
-    def _speed_of_flow_entries(self, flows):
-        """Calculate speed of flow entries (SFE)"""
-        global prev_flow_count
-        curr_flow_count = len(flows)
-        sfe = curr_flow_count - prev_flow_count
-        prev_flow_count = curr_flow_count
-        return sfe
-
-    def _speed_of_source_ip(self, flows, dpid):
-        """Calculate speed of source IP addresses (SSIP) - per switch"""
-        ssip = []
-        
-        for flow in flows:
-            for i in flow.match.items():
-                key = list(i)[0]
-                val = list(i)[1]
-                if key == "ipv4_src":
-                    if val not in ssip:
-                        ssip.append(val)
-        
-        cur_ssip_len = len(ssip)
-        old_ssip_len = self.old_ssip_len_per_switch.get(dpid, 0)
-        ssip_result = cur_ssip_len - old_ssip_len
-        self.old_ssip_len_per_switch[dpid] = cur_ssip_len
-        return ssip_result
-
-    def _ratio_of_flowpair(self, flows):
-        """Calculate ratio of flow pairs (RFIP)"""
-        flow_count = len(flows) - 1  # Exclude table miss entry
-        
-        if flow_count <= 0:
-            return 1.0
-        
-        collaborative_flows = {}
-        
-        for flow in flows:
-            srcip = dstip = None
-            for i in flow.match.items():
-                key = list(i)[0]
-                val = list(i)[1]
-                if key == "ipv4_src":
-                    srcip = val
-                if key == "ipv4_dst":
-                    dstip = val
-            
-            if srcip and dstip:
-                fwdflowhash = srcip + "_" + dstip
-                revflowhash = dstip + "_" + srcip
-                
-                if not fwdflowhash in collaborative_flows:
-                    if not revflowhash in collaborative_flows:
-                        collaborative_flows[fwdflowhash] = {}
-                    else:
-                        collaborative_flows[revflowhash][fwdflowhash] = 1
-        
-        onesideflow = iflow = 0
-        for key in collaborative_flows:
-            if collaborative_flows[key] == {}:
-                onesideflow += 1
-            else:
-                iflow += 2
-        
-        if flow_count != 0:
-            rfip = float(iflow) / flow_count
-            return rfip
-        return 1.0
+    @set_ev_cls(ofp_event.EventOFPAggregateStatsReply, MAIN_DISPATCHER)
+    def aggregate_stats_reply_handler(self, ev):
+        """Skip the flow-stats dump when the L3 flow counters did not change"""
+        msg = ev.msg
+        datapath = msg.datapath
+        dpid = datapath.id
+        counters = (msg.body.flow_count, msg.body.byte_count)
+
+        if self.last_aggregate.get(dpid) == counters:
+            feature_state = self._get_feature_state(dpid)
+            sfe, ssip, rfip = feature_state.repeat()
+            self._handle_flow_features(dpid, sfe, ssip, rfip, feature_state.prev_flow_count)
+        else:
+            self.last_aggregate[dpid] = counters
+            self.request_flow_metrics(datapath, mode='cookie')
+
+    def _get_feature_state(self, dpid):
+        """Return the feature state of a switch, creating it on first use"""
+        state = self.flow_features.get(dpid)
+        if state is None:
+            state = FlowFeatureState()
+            self.flow_features[dpid] = state
+        return state
 
     @set_ev_cls([ofp_event.EventOFPFlowStatsReply], MAIN_DISPATCHER)
     def flow_stats_reply_handler(self, ev):
-        """Handle flow statistics reply"""
-        global gflows
-        
-        t_flows = ev.msg.body
-        flags = ev.msg.flags
-        dpid = ev.msg.datapath.id
-        gflows.extend(t_flows)
-
-        if flags == 0:
-            # Calculate features
-            sfe = self._speed_of_flow_entries(gflows)
-            ssip = self._speed_of_source_ip(gflows, dpid)
-            rfip = self._ratio_of_flowpair(gflows)
-
-            # Default label/reason values
-            label = 0
-            reason = 'collect' if APP_TYPE == 0 else 'ml'
-            confidence = 1.0
+        """
+        Handle flow statistics reply (one multipart segment)
 
-            if APP_TYPE == 1:
-                # ML Detection 
-                result = self.ml_detector.classify([sfe, ssip, rfip])
-                reason = 'ml'
+        Each segment is folded into the feature accumulator of its (dpid, xid)
+        as it arrives and is not retained; features are computed when the
+        last segment (no OFPMPF_REPLY_MORE flag) of that request arrives.
+        """
+        msg = ev.msg
+        datapath = msg.datapath
+        dpid = datapath.id
+        feature_state = self._get_feature_state(dpid)
+
+        mirror = self.flow_mirrors.get(dpid)
+        reconciling = mirror is not None and mirror.is_reconciling(msg.xid)
+
+        if not feature_state.is_pending(msg.xid):
+            feature_state.begin(msg.xid)
+            if (dpid, msg.xid) in self.filtered_requests:
+                # Cookie-filtered replies omit the table-miss entry; count it so SFE/RFIP
+                # stay on the same scale as full dumps (and the training data)
+                feature_state.add_pair(None, None, msg.xid)
+        feature_state.add_flows(msg.body, msg.xid)
+        if reconciling:
+            mirror.add_dump_segment(msg.xid, msg.body)
+
+        if msg.flags & datapath.ofproto.OFPMPF_REPLY_MORE:
+            return
 
-                # Phân loại đơn giản giống tác giả gốc
-                # result is numpy array, e.g. array([1]) or array([0])
-                # Convert to int for comparison to avoid FutureWarning
-                prediction = int(result[0]) if len(result) > 0 else 0
-                
-                if prediction == 1:
-                    label = 1
-                    self.logger.warning(
-                        "🚨 ATTACK DETECTED! (Switch {}, SFE={:.1f}, SSIP={:.1f}, RFIP={:.2f})".format(
-                            dpid, sfe, ssip, rfip
-                        )
+        sfe, ssip, rfip = feature_state.finish(msg.xid)
+        self.filtered_requests.discard((dpid, msg.xid))
+        if reconciling:
+            added, removed = mirror.finish_reconcile(msg.xid)
+            if added or removed:
+                self.logger.info(
+                    f"Flow mirror of switch {dpid} reconciled: +{added}/-{removed} entries "
+                    f"({len(mirror)} mirrored)"
+                )
+        self._handle_flow_features(dpid, sfe, ssip, rfip, feature_state.prev_flow_count)
+
+    def _handle_flow_features(self, dpid, sfe, ssip, rfip, flow_count):
+        """Classify/label one feature vector of a switch, then log and persist it"""
+        # SFE/SSIP stay raw per-poll deltas: scaling a 0.5 s poll up to the 2 s training interval
+        # would multiply small benign deltas by 4 right after an attack verdict tightened polling.
+        # Only the scheduler's trend check compares them as rates
+        self.poll_scheduler.record_reply(dpid)
+
+        if self.classify_batch is not None:
+            # Wait for the switches due within the window (or the deadline); flush early only
+            # when nothing is in flight and no other poll falls inside it
+            if self.classify_batch.add(dpid, (sfe, ssip, rfip), flow_count):
+                hub.spawn(self._classify_batch_deadline, self.classify_batch.generation)
+            reason = self.classify_batch.flush_reason(self.poll_scheduler.in_flight(),
+                                                      self.poll_scheduler.next_due())
+            if reason:
+                self._flush_classify_batch(reason)
+            return
+        if self.inference_worker is not None:
+            self._classify_offloaded([(dpid, (sfe, ssip, rfip), flow_count)], [[sfe, ssip, rfip]])
+            return
+
+        prediction = None
+        if APP_TYPE == 1:
+            # ML Detection 
+            result = self.ml_detector.classify([sfe, ssip, rfip])
+
+            # Phân loại đơn giản giống tác giả gốc
+            # result is numpy array, e.g. array([1]) or array([0])
+            # Convert to int for comparison to avoid FutureWarning
+            prediction = int(result[0]) if len(result) > 0 else 0
+        self._apply_verdict(dpid, sfe, ssip, rfip, flow_count, prediction)
+
+    def _classify_batch_deadline(self, generation):
+        """Flush the batch opened at `generation` if the cycle has not completed it yet"""
+        hub.sleep(CLASSIFY_BATCH_DEADLINE)
+        if self.classify_batch.generation == generation:
+            self._flush_classify_batch('deadline')
+
+    def _flush_classify_batch(self, reason):
+        """Classify all pending vectors with one predict call and apply each verdict"""
+        items, X = self.classify_batch.drain(reason)
+        if not items:
+            return
+        if self.inference_worker is not None:
+            self._classify_offloaded(items, X)
+            return
+        results = self.ml_detector.classify_batch(X)
+        for (dpid, (sfe, ssip, rfip), flow_count), result in zip(items, results):
+            self._apply_verdict(dpid, sfe, ssip, rfip, flow_count, int(result))
+
+    def _classify_offloaded(self, items, X):
+        """Queue vectors for the inference worker; apply the verdicts resolved inline right away"""
+        self._apply_resolved(self.inference_worker.submit(items, X))
+        if self.inference_worker.pending:
+            self.inference_wakeup.set()
+
+    def _apply_resolved(self, resolved):
+        for (dpid, (sfe, ssip, rfip), flow_count), prediction in resolved:
+            if prediction is None:
+                continue  # dropped by the overflow policy
+            self._apply_verdict(dpid, sfe, ssip, rfip, flow_count, prediction)
+
+    def _inference_collector(self):
+        """Apply the inference worker's verdicts (and inline fallbacks for lagging vectors)"""
+        while True:
+            if not self.inference_worker.pending:
+                self.inference_wakeup.wait(timeout=1.0)
+                self.inference_wakeup.clear()
+                continue
+            self._apply_resolved(self.inference_worker.poll())
+            hub.sleep(ML_INFERENCE_POLL_INTERVAL)
+
+    def _apply_verdict(self, dpid, sfe, ssip, rfip, flow_count, prediction):
+        """
+        Act on the verdict of one feature vector: log, mitigate, queue blockchain
+        events, adapt polling and persist the tick
+
+        Args:
+            prediction: ML verdict (0/1) in detection mode, None in collection mode
+        """
+        # Default label/reason values
+        label = 0
+        reason = 'collect' if APP_TYPE == 0 else 'ml'
+        confidence = 1.0
+
+        if APP_TYPE == 1:
+            reason = 'ml'
+            if prediction == 1:
+                label = 1
+                self.logger.warning(
+                    "🚨 ATTACK DETECTED! (Switch {}, SFE={:.1f}, SSIP={:.1f}, RFIP={:.2f})".format(
+                        dpid, sfe, ssip, rfip
                     )
-                    self.mitigation = 1
+                )
+                self.mitigation = 1
+                
+                # Log to blockchain
+                if self.blockchain_client:
+                    event_data = {
+                        'event_type': 'attack_detected',
+                        'switch_id': str(dpid),
+                        'timestamp': int(time.time()),
+                        'features': {
+                            'sfe': float(sfe),
+                            'ssip': float(ssip),
+                            'rfip': float(rfip)
+                        }
+                    }
+                    if self._queue_blockchain_event(event_data):
+                        self.logger.info("⛓️ Attack event queued for blockchain")
+                
+                if PREVENTION == 1:
+                    self.logger.info("🛡️ Prevention Enabled - Mitigation Started")
+            
+            elif prediction == 0:
+                label = 0
+                self.logger.info("✓ Normal Traffic (Switch {})".format(dpid))
+                
+                # Gửi normal traffic event để logging (tránh spam: mỗi 30 giây)
+                if self.blockchain_client:
+                    current_time = time.time()
+                    last_log_time = self.last_normal_traffic_log.get(dpid, 0)
                     
-                    # Log to blockchain
-                    if self.blockchain_client:
-                        try:
-                            event_data = {
-                                'event_type': 'attack_detected',
-                                'switch_id': str(dpid),
-                                'timestamp': int(time.time()),
-                                'features': {
-                                    'sfe': float(sfe),
-                                    'ssip': float(ssip),
-                                    'rfip': float(rfip)
-                                }
+                    if current_time - last_log_time >= 30:
+                        event_data = {
+                            'event_type': 'normal_traffic',
+                            'switch_id': str(dpid),
+                            'timestamp': int(time.time()),
+                            'features': {
+                                'sfe': float(sfe),
+                                'ssip': float(ssip),
+                                'rfip': float(rfip)
                             }
-                            self.blockchain_client.record_event(event_data)
-                            self.logger.info("⛓️ Attack event logged to blockchain")
-                        except Exception as e:
-                            self.logger.error(f"Blockchain logging error: {e}")
-                    
-                    if PREVENTION == 1:
-                        self.logger.info("🛡️ Prevention Enabled - Mitigation Started")
+                        }
+                        if self._queue_blockchain_event(event_data):
+                            self.last_normal_traffic_log[dpid] = current_time
+                            self.logger.info(f"⛓️ Normal traffic queued for blockchain (switch {dpid})")
                 
-                elif prediction == 0:
-                    label = 0
-                    self.logger.info("✓ Normal Traffic (Switch {})".format(dpid))
-                    
-                    # Gửi normal traffic event để logging (tránh spam: mỗi 30 giây)
-                    if self.blockchain_client:
-                        current_time = time.time()
-                        last_log_time = self.last_normal_traffic_log.get(dpid, 0)
-                        
-                        if current_time - last_log_time >= 30:
-                            try:
-                                event_data = {
-                                    'event_type': 'normal_traffic',
-                                    'switch_id': str(dpid),
-                                    'timestamp': int(time.time()),
-                                    'features': {
-                                        'sfe': float(sfe),
-                                        'ssip': float(ssip),
-                                        'rfip': float(rfip)
-                                    }
-                                }
-                                self.blockchain_client.record_event(event_data)
-                                self.last_normal_traffic_log[dpid] = current_time
-                                self.logger.info(f"⛓️ Normal traffic logged to blockchain (switch {dpid})")
-                            except Exception as e:
-                                self.logger.debug(f"Blockchain logging error (normal traffic): {e}")
-                    
-            else:
-                # Data collection mode: label theo TEST_TYPE (0=normal, 1=attack)
-                label = TEST_TYPE
-                reason = 'collect'
-                confidence = 1.0
-                # Chỉ log khi có traffic thực sự (sfe != 0 hoặc ssip != 0)
-                if sfe != 0 or ssip != 0:
-                    label_text = "ATTACK" if label == 1 else "NORMAL"
-                    self.logger.info(
-                        f"📊 Data Collection Mode (TEST_TYPE={TEST_TYPE}): "
-                        f"Features [sfe={sfe}, ssip={ssip}, rfip={rfip:.4f}] from switch {dpid} → Label={label} ({label_text})"
-                    )
+        else:
+            # Data collection mode: label theo TEST_TYPE (0=normal, 1=attack)
+            label = TEST_TYPE
+            reason = 'collect'
+            confidence = 1.0
+            # Chỉ log khi có traffic thực sự (sfe != 0 hoặc ssip != 0)
+            if sfe != 0 or ssip != 0:
+                label_text = "ATTACK" if label == 1 else "NORMAL"
+                self.logger.info(
+                    f"📊 Data Collection Mode (TEST_TYPE={TEST_TYPE}): "
+                    f"Features [sfe={sfe}, ssip={ssip}, rfip={rfip:.4f}] from switch {dpid} → Label={label} ({label_text})"
+                )
 
-            # Chỉ ghi vào CSV khi có traffic thực sự (tránh spam dữ liệu [0,0,1.0])
-            # Hoặc trong detection mode thì luôn ghi (để theo dõi ML predictions)
-            if APP_TYPE == 1 or (sfe != 0 or ssip != 0):
-                t = time.strftime("%m/%d/%Y, %H:%M:%S", time.localtime())
-                row = [t, str(sfe), str(ssip), str(rfip)]
-                update_portcsv(dpid, row, label)
-                update_resultcsv([str(sfe), str(ssip), str(rfip)], label, reason=reason,
-                                 confidence=confidence, dpid=dpid, timestamp=t)
-            
-            gflows = []
+        self.poll_scheduler.adapt(dpid, sfe, ssip, attack=(APP_TYPE == 1 and label == 1))
+
+        now = time.time()
+        if telemetry:
+            # Every tick (including idle ones) goes to the columnar store
+            telemetry.append(dpid, sfe, ssip, rfip, flow_count, label, APP_TYPE, ts=now)
 
-            # Update flowcount
-            t = time.strftime("%m/%d/%Y, %H:%M:%S", time.localtime())
-            update_flowcountcsv(dpid, [t, str(prev_flow_count)])
+        # Chỉ ghi vào CSV khi có traffic thực sự (tránh spam dữ liệu [0,0,1.0])
+        # Hoặc trong detection mode thì luôn ghi (để theo dõi ML predictions)
+        t = time.strftime("%m/%d/%Y, %H:%M:%S", time.localtime(now))
+        if APP_TYPE == 1 or (sfe != 0 or ssip != 0):
+            row = [t, str(sfe), str(ssip), str(rfip)]
+            update_portcsv(dpid, row, label)
+            update_resultcsv([str(sfe), str(ssip), str(rfip)], label, reason=reason,
+                             confidence=confidence, dpid=dpid, timestamp=t)
+
+        # Update flowcount
+        update_flowcountcsv(dpid, [t, str(flow_count)])
 
     def add_flow(self, datapath, priority, match, actions, serial_no, buffer_id=None, idletime=0, hardtime=0):
         """Add flow entry to switch"""
@@ -504,17 +932,31 @@ class BlockchainSDNController(app_manager.RyuApp):
         parser = datapath.ofproto_parser
 
         inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS, actions)]
+        # Ask for FlowRemoved so the flow table mirror follows expirations
+        flags = ofproto.OFPFF_SEND_FLOW_REM if FLOW_MIRROR else 0
         
         if buffer_id:
             mod = parser.OFPFlowMod(datapath=datapath, cookie=serial_no, buffer_id=buffer_id,
                                     idle_timeout=idletime, hard_timeout=hardtime,
-                                    priority=priority, match=match, instructions=inst)
+                                    priority=priority, flags=flags, match=match, instructions=inst)
         else:
             mod = parser.OFPFlowMod(datapath=datapath, cookie=serial_no, priority=priority,
                                     idle_timeout=idletime, hard_timeout=hardtime,
-                                    match=match, instructions=inst)
+                                    flags=flags, match=match, instructions=inst)
         datapath.send_msg(mod)
 
+        mirror = self.flow_mirrors.get(datapath.id)
+        if mirror is not None:
+            mirror.install(serial_no, priority, match.items(), hard_timeout=hardtime)
+
+    @set_ev_cls(ofp_event.EventOFPFlowRemoved, MAIN_DISPATCHER)
+    def flow_removed_handler(self, ev):
+        """Keep the flow table mirror in sync with expired/deleted flows"""
+        msg = ev.msg
+        mirror = self.flow_mirrors.get(msg.datapath.id)
+        if mirror is not None:
+            mirror.remove(msg.priority, msg.match.items())
+
     def block_port(self, datapath, portnumber, src_ip=None, dst_ip=None, reason="DDoS Attack", block_mode="port_only"):
         """
         Block traffic from specific port (giống repo tham khảo)
@@ -535,7 +977,7 @@ class BlockchainSDNController(app_manager.RyuApp):
         match_args = {'in_port': portnumber}
         match = parser.OFPMatch(**match_args)
         actions = []
-        flow_serial_no = get_flow_number()
+        flow_serial_no = make_cookie(COOKIE_NS_BLOCK, get_flow_number())
         self.add_flow(datapath, 100, match, actions, flow_serial_no, hardtime=60)
         
         self.logger.warning(f"🚫 BLOCKING PORT {portnumber} on switch {dpid} for 60s (reason: {reason})")
@@ -543,22 +985,19 @@ class BlockchainSDNController(app_manager.RyuApp):
         
         # Log blocking action to blockchain
         if self.blockchain_client:
-            try:
-                event_data = {
-                    'event_type': 'port_blocked',
-                    'switch_id': str(datapath.id),
-                    'port': portnumber,
-                    'src_ip': src_ip if src_ip else None,
-                    'dst_ip': dst_ip if dst_ip else None,
-                    'timestamp': int(time.time()),
-                    'reason': reason,
-                    'action': action_desc,
-                    'block_mode': 'port_only'
-                }
-                self.blockchain_client.record_event(event_data)
-                self.logger.info(f"⛓️ Port blocking logged to blockchain (mode: port_only)")
-            except Exception as e:
-                self.logger.error(f"Blockchain logging error: {e}")
+            event_data = {
+                'event_type': 'port_blocked',
+                'switch_id': str(datapath.id),
+                'port': portnumber,
+                'src_ip': src_ip if src_ip else None,
+                'dst_ip': dst_ip if dst_ip else None,
+                'timestamp': int(time.time()),
+                'reason': reason,
+                'action': action_desc,
+                'block_mode': 'port_only'
+            }
+            if self._queue_blockchain_event(event_data):
+                self.logger.info(f"⛓️ Port blocking queued for blockchain (mode: port_only)")
 
     @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
     def _packet_in_handler(self, ev):
@@ -677,7 +1116,7 @@ class BlockchainSDNController(app_manager.RyuApp):
                     ipv4_dst=dstip,
                 )
 
-                flow_serial_no = get_flow_number()
+                flow_serial_no = make_cookie(COOKIE_NS_L3, get_flow_number())
                 if msg.buffer_id != ofproto.OFP_NO_BUFFER:
                     self.add_flow(datapath, 1, match, actions, flow_serial_no, buffer_id=msg.buffer_id)
                     return
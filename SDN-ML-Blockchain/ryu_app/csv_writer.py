@@ -0,0 +1,177 @@
+"""
+Group-Commit CSV Writer
+Single background writer for the controller's CSV logs (per-switch data,
+flowcount and result files).
+
+Callers only enqueue rows. The writer thread keeps one open handle per file,
+writes queued rows in batches and fsyncs according to the durability mode:
+
+    none      - rows are flushed to the OS, never fsynced
+    interval  - dirty files are fsynced every commit_interval seconds (group commit)
+    every-row - every row is flushed and fsynced before the next one is written
+"""
+import csv
+import os
+import queue
+import threading
+import time
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ('none', 'interval', 'every-row')
+
+
+class _OpenFile:
+    def __init__(self, path, header):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.fh = open(path, 'a', newline='')
+        self.writer = csv.writer(self.fh, delimiter=',')
+        self.dirty = False
+        if header and self.fh.tell() == 0:
+            self.writer.writerow(header)
+            self.dirty = True
+
+
+class GroupCommitCSVWriter:
+    """Background CSV appender with batched writes and group-commit fsync"""
+
+    def __init__(self, durability='interval', commit_interval=1.0, max_batch=1000):
+        """
+        Args:
+            durability: 'none', 'interval' or 'every-row'
+            commit_interval: Seconds between group fsyncs in 'interval' mode
+            max_batch: Maximum rows taken from the queue per write batch
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability} (use one of {DURABILITY_MODES})")
+        self.durability = durability
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+
+        self._queue = queue.Queue()
+        self._files = {}
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self.stats = {'rows': 0, 'batches': 0, 'fsyncs': 0, 'errors': 0}
+
+    def write_row(self, path, row, header=None):
+        """
+        Queue one row for path (never blocks on disk I/O)
+
+        Args:
+            path: CSV file to append to
+            row: list of values
+            header: Header row written first if the file is new/empty
+        """
+        if self._closed:
+            raise RuntimeError("CSV writer is closed")
+        self._ensure_started()
+        self._queue.put((path, row, header))
+
+    def flush(self, timeout=None):
+        """Block until every queued row is written (and committed per durability mode)"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(('__flush__', done, None))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write remaining rows, fsync and close all files"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='csv-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        last_commit = time.monotonic()
+        running = True
+        while running:
+            wait = max(self.commit_interval - (time.monotonic() - last_commit), 0.05)
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = ()
+
+            # Drain whatever else is already queued into the same batch
+            batch = [item] if item != () else []
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            flush_events = []
+            for entry in batch:
+                if entry is None:
+                    running = False
+                elif entry[0] == '__flush__':
+                    flush_events.append(entry[1])
+                else:
+                    self._write(*entry)
+            if batch:
+                self.stats['batches'] += 1
+
+            now = time.monotonic()
+            if flush_events or not running or now - last_commit >= self.commit_interval:
+                self._commit()
+                last_commit = now
+            for event in flush_events:
+                event.set()
+
+        self._commit()
+        for f in self._files.values():
+            try:
+                f.fh.close()
+            except Exception:
+                pass
+        self._files.clear()
+
+    def _write(self, path, row, header):
+        try:
+            f = self._files.get(path)
+            if f is None:
+                f = _OpenFile(path, header)
+                self._files[path] = f
+            f.writer.writerow(row)
+            f.dirty = True
+            self.stats['rows'] += 1
+            if self.durability == 'every-row':
+                self._sync(f)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error writing {path}: {e}")
+
+    def _commit(self):
+        """Flush dirty files to the OS and fsync them unless durability is 'none'"""
+        for path, f in self._files.items():
+            if not f.dirty:
+                continue
+            try:
+                if self.durability == 'none':
+                    f.fh.flush()
+                    f.dirty = False
+                else:
+                    self._sync(f)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error committing {path}: {e}")
+
+    def _sync(self, f):
+        f.fh.flush()
+        os.fsync(f.fh.fileno())
+        f.dirty = False
+        self.stats['fsyncs'] += 1
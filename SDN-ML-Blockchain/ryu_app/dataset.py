@@ -0,0 +1,139 @@
+"""
+Training Dataset Loader
+Parses a training CSV (sfe, ssip, rfip, label; header row, columns by position)
+once into typed arrays - features float32, labels int8 - and caches them in a
+binary .npz next to the CSV (<name>.csv.cache.npz).
+
+The cache is keyed by the CSV's size, mtime and SHA-256:
+    size + mtime unchanged      cache used without reading the CSV
+    mtime changed, same content cache used after one hash pass (touch, copy)
+    otherwise                   CSV re-parsed and cache rewritten
+
+Malformed rows are skipped (same as pd.read_csv(..., on_bad_lines='skip')).
+
+deduplicate() collapses repeated (sfe, ssip, rfip, label) rows into unique rows
+plus sample_weight counts; fitting on those is equivalent to fitting on the
+repeated rows for SVC, decision trees and Gaussian NB (random forests bootstrap
+over the unique rows, so they are only statistically equivalent).
+"""
+import os
+import time
+import logging
+
+import numpy as np
+
+try:
+    from ryu_app.model_artifact import file_sha256
+except ImportError:
+    from model_artifact import file_sha256
+
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ['sfe', 'ssip', 'rfip']
+CACHE_SUFFIX = '.cache.npz'
+CACHE_VERSION = 1
+
+
+def cache_path(csv_path):
+    return csv_path + CACHE_SUFFIX
+
+
+def _parse_csv(csv_path):
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, usecols=[0, 1, 2, 3], on_bad_lines='skip')
+    df = df.apply(pd.to_numeric, errors='coerce').dropna()
+    X = np.ascontiguousarray(df.iloc[:, 0:3].to_numpy(dtype=np.float32))
+    y = df.iloc[:, 3].to_numpy().astype(np.int8)
+    return X, y
+
+
+def _read_cache(path, st, csv_path):
+    """(X, y) from the cache if it still describes csv_path, else None"""
+    try:
+        with np.load(path, allow_pickle=False) as cache:
+            if int(cache['version']) != CACHE_VERSION or int(cache['size']) != st.st_size:
+                return None
+            X, y = cache['X'], cache['y']
+            fresh = int(cache['mtime_ns']) == st.st_mtime_ns
+            digest = str(cache['sha256'])
+    except (OSError, KeyError, ValueError):
+        return None
+    if not fresh:
+        if file_sha256(csv_path) != digest:
+            return None
+        # Same content under a new mtime: re-key so the next load skips the hash
+        _write_cache(path, X, y, st, digest)
+    return X, y
+
+
+def _write_cache(path, X, y, st, digest):
+    tmp = path + '.tmp'
+    try:
+        with open(tmp, 'wb') as fh:
+            np.savez(fh, version=CACHE_VERSION, size=st.st_size, mtime_ns=st.st_mtime_ns,
+                     sha256=digest, X=X, y=y)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not write dataset cache {path}: {e}")
+
+
+def load_training_data(csv_path, use_cache=True):
+    """
+    Load a training CSV as typed arrays (cached, see module docstring)
+
+    Args:
+        csv_path: CSV with sfe, ssip, rfip, label columns
+        use_cache: Read/write the .npz cache next to the CSV
+
+    Returns:
+        (X float32 [n, 3], y int8 [n])
+
+    Raises:
+        FileNotFoundError: csv_path does not exist
+    """
+    start = time.perf_counter()
+    st = os.stat(csv_path)
+    cache = cache_path(csv_path)
+    if use_cache:
+        cached = _read_cache(cache, st, csv_path)
+        if cached is not None:
+            logger.debug(f"Loaded {len(cached[1])} rows from {cache} in "
+                         f"{(time.perf_counter() - start) * 1000:.1f} ms")
+            return cached
+
+    X, y = _parse_csv(csv_path)
+    if use_cache:
+        _write_cache(cache, X, y, st, file_sha256(csv_path))
+    logger.debug(f"Parsed {len(y)} rows from {csv_path} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return X, y
+
+
+def load_training_frame(csv_path, use_cache=True):
+    """load_training_data() as a DataFrame with sfe, ssip, rfip, label columns"""
+    import pandas as pd
+
+    X, y = load_training_data(csv_path, use_cache=use_cache)
+    frame = pd.DataFrame(X, columns=FEATURES)
+    frame['label'] = y
+    return frame
+
+
+def deduplicate(X, y):
+    """
+    Collapse identical (features, label) rows
+
+    Returns:
+        (X_unique, y_unique, sample_weight) - weights are the row counts (float64),
+        rows in first-occurrence order
+    """
+    X = np.ascontiguousarray(X)
+    y = np.asarray(y)
+    rows = np.empty(len(y), dtype=[('x', X.dtype, (X.shape[1],)), ('y', y.dtype)])
+    rows['x'] = X
+    rows['y'] = y
+    _, first, counts = np.unique(rows, return_index=True, return_counts=True)
+    order = np.argsort(first, kind='stable')
+    keep = first[order]
+    return X[keep], y[keep], counts[order].astype(np.float64)
@@ -0,0 +1,145 @@
+"""
+Decision Grid
+Precomputed lookup table of a trained classifier over the discrete feature space:
+
+    SFE  - integer flow-count delta    (sfe_range, step 1)
+    SSIP - integer source-IP delta     (ssip_range, step 1)
+    RFIP - ratio in [0, 1]             (rfip_steps evenly spaced points)
+
+The model is evaluated once on every grid point at build time; classification
+is then an O(1) array index for any model type (SVM, RF, NB, tree). A feature
+vector is snapped to the nearest grid point (SFE/SSIP are rounded, which only
+matters for rescaled adaptive-polling features, RFIP goes to the nearest step).
+Vectors outside the SFE/SSIP range are either clamped to the grid edge or left
+to the model ('fallback').
+"""
+import math
+import time
+
+import numpy as np
+
+
+OUT_OF_RANGE_POLICIES = ('fallback', 'clamp')
+
+
+class DecisionGrid:
+    """Dense (sfe, ssip, rfip) -> class index table"""
+
+    def __init__(self, classes, grid, sfe_min, ssip_min, out_of_range='fallback', build_seconds=0.0):
+        """
+        Args:
+            classes: Class labels (grid values index into this)
+            grid: int8 array of shape (n_sfe, n_ssip, rfip_steps)
+            sfe_min, ssip_min: Feature value of index 0 on the SFE / SSIP axes
+            out_of_range: 'fallback' (lookup returns None) or 'clamp'
+            build_seconds: Time spent evaluating the model on the grid
+        """
+        if out_of_range not in OUT_OF_RANGE_POLICIES:
+            raise ValueError(f"Unknown out_of_range policy: {out_of_range} (use one of {OUT_OF_RANGE_POLICIES})")
+        self.classes = np.asarray(classes)
+        self.grid = grid
+        self.sfe_min = int(sfe_min)
+        self.ssip_min = int(ssip_min)
+        self.n_sfe, self.n_ssip, self.rfip_steps = grid.shape
+        self.out_of_range = out_of_range
+        self.build_seconds = build_seconds
+        self._classes = self.classes.tolist()
+        self._clamp = out_of_range == 'clamp'
+        self.stats = {'hits': 0, 'out_of_range': 0}
+
+    @classmethod
+    def build(cls, predict, classes, sfe_range=(-32, 127), ssip_range=(-32, 127), rfip_steps=33,
+              out_of_range='fallback', chunk_rows=1 << 16):
+        """
+        Evaluate predict() on every grid point
+
+        Args:
+            predict: Callable mapping an (n, 3) float array to class labels
+            classes: All labels predict() can return (e.g. model.classes_)
+            sfe_range, ssip_range: Inclusive integer ranges of the SFE / SSIP axes
+            rfip_steps: Number of RFIP points in [0, 1] (>= 2)
+            chunk_rows: Grid points per predict() call
+        """
+        if rfip_steps < 2:
+            raise ValueError("rfip_steps must be at least 2")
+        start = time.perf_counter()
+        sfe_axis = np.arange(sfe_range[0], sfe_range[1] + 1, dtype=np.float64)
+        ssip_axis = np.arange(ssip_range[0], ssip_range[1] + 1, dtype=np.float64)
+        rfip_axis = np.linspace(0.0, 1.0, rfip_steps)
+        shape = (len(sfe_axis), len(ssip_axis), len(rfip_axis))
+
+        classes = np.asarray(classes)
+        lookup = {label: i for i, label in enumerate(classes.tolist())}
+        flat = np.empty(int(np.prod(shape)), dtype=np.int8)
+        points = np.empty((min(chunk_rows, len(flat)), 3))
+        for begin in range(0, len(flat), chunk_rows):
+            idx = np.arange(begin, min(begin + chunk_rows, len(flat)))
+            i, j, k = np.unravel_index(idx, shape)
+            X = points[:len(idx)]
+            X[:, 0] = sfe_axis[i]
+            X[:, 1] = ssip_axis[j]
+            X[:, 2] = rfip_axis[k]
+            labels = np.asarray(predict(X))
+            flat[begin:begin + len(idx)] = [lookup[label] for label in labels.tolist()]
+
+        return cls(classes, flat.reshape(shape), sfe_range[0], ssip_range[0],
+                   out_of_range=out_of_range, build_seconds=time.perf_counter() - start)
+
+    @property
+    def nbytes(self):
+        return self.grid.nbytes
+
+    def lookup(self, features):
+        """
+        Class label of the grid point nearest to [sfe, ssip, rfip]
+
+        Returns:
+            The label, or None if the vector is outside the grid and the policy is 'fallback'
+        """
+        sfe, ssip, rfip = features
+        i = math.floor(sfe + 0.5) - self.sfe_min
+        j = math.floor(ssip + 0.5) - self.ssip_min
+        if not (0 <= i < self.n_sfe and 0 <= j < self.n_ssip):
+            if not self._clamp:
+                self.stats['out_of_range'] += 1
+                return None
+            i = min(max(i, 0), self.n_sfe - 1)
+            j = min(max(j, 0), self.n_ssip - 1)
+        k = min(max(math.floor(rfip * (self.rfip_steps - 1) + 0.5), 0), self.rfip_steps - 1)
+        self.stats['hits'] += 1
+        return self._classes[self.grid[i, j, k]]
+
+    def lookup_batch(self, X):
+        """
+        Vectorized lookup
+
+        Returns:
+            (labels, on_grid): labels for every row (rows with on_grid=False must be
+            classified by the model; their label is meaningless)
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 3)
+        i = np.floor(X[:, 0] + 0.5).astype(np.int64) - self.sfe_min
+        j = np.floor(X[:, 1] + 0.5).astype(np.int64) - self.ssip_min
+        on_grid = (i >= 0) & (i < self.n_sfe) & (j >= 0) & (j < self.n_ssip)
+        if self._clamp:
+            on_grid[:] = True
+        i = np.clip(i, 0, self.n_sfe - 1)
+        j = np.clip(j, 0, self.n_ssip - 1)
+        k = np.clip(np.floor(X[:, 2] * (self.rfip_steps - 1) + 0.5).astype(np.int64), 0, self.rfip_steps - 1)
+        hits = int(np.count_nonzero(on_grid))
+        self.stats['hits'] += hits
+        self.stats['out_of_range'] += len(X) - hits
+        return self.classes.take(self.grid[i, j, k]), on_grid
+
+    def describe(self):
+        """Shape, memory footprint and build time (for logging)"""
+        return {
+            'shape': self.grid.shape,
+            'cells': int(self.grid.size),
+            'bytes': int(self.nbytes),
+            'build_seconds': self.build_seconds,
+            'sfe_range': (self.sfe_min, self.sfe_min + self.n_sfe - 1),
+            'ssip_range': (self.ssip_min, self.ssip_min + self.n_ssip - 1),
+            'rfip_steps': self.rfip_steps,
+            'out_of_range': self.out_of_range,
+        }
@@ -0,0 +1,147 @@
+"""
+Blockchain Event Submission Queue
+Bounded in-memory buffer between Ryu event handlers and the blockchain client.
+
+Handlers only enqueue; a dedicated hub greenthread in the controller drains
+the queue in batches. Events are split into priority lanes so attack and
+blocking events are submitted before normal_traffic heartbeats.
+"""
+import time
+from collections import deque
+
+
+# Priority lanes (lower value = submitted first)
+PRIORITY_HIGH = 0    # attack_detected, port_blocked
+PRIORITY_NORMAL = 1  # switch_connected and unknown event types
+PRIORITY_LOW = 2     # normal_traffic heartbeats
+
+EVENT_PRIORITIES = {
+    'attack_detected': PRIORITY_HIGH,
+    'port_blocked': PRIORITY_HIGH,
+    'switch_connected': PRIORITY_NORMAL,
+    'normal_traffic': PRIORITY_LOW,
+}
+
+LANE_NAMES = ['high', 'normal', 'low']
+
+
+class BlockchainEventQueue:
+    """
+    Bounded priority queue of pending blockchain events.
+
+    When the queue is full, a new event evicts the oldest event of a strictly
+    lower priority lane; if there is none, the new event itself is dropped.
+    """
+
+    def __init__(self, max_size=1000, batch_size=20, latency_window=500):
+        """
+        Args:
+            max_size: Maximum number of events held across all lanes
+            batch_size: Default number of events returned by pop_batch()
+            latency_window: Number of recent submit latencies kept for stats
+        """
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.lanes = [deque() for _ in LANE_NAMES]
+        self.submit_latencies = deque(maxlen=latency_window)
+        self.stats = {
+            'enqueued': 0,
+            'submitted': 0,
+            'failed': 0,
+            'batches': 0,
+            'dropped': [0] * len(LANE_NAMES),
+            'max_depth': 0,
+        }
+
+    def __len__(self):
+        return sum(len(lane) for lane in self.lanes)
+
+    @staticmethod
+    def priority_of(event):
+        """Return the lane index for an event dict"""
+        return EVENT_PRIORITIES.get(event.get('event_type'), PRIORITY_NORMAL)
+
+    def enqueue(self, event):
+        """
+        Add an event to its priority lane (never blocks).
+
+        Returns:
+            bool: True if the event was queued, False if it was dropped
+        """
+        priority = self.priority_of(event)
+
+        if len(self) >= self.max_size:
+            # Evict the oldest event from the lowest lane below this priority
+            for lane_idx in range(len(self.lanes) - 1, priority, -1):
+                if self.lanes[lane_idx]:
+                    self.lanes[lane_idx].popleft()
+                    self.stats['dropped'][lane_idx] += 1
+                    break
+            else:
+                self.stats['dropped'][priority] += 1
+                return False
+
+        self.lanes[priority].append((time.time(), event))
+        self.stats['enqueued'] += 1
+        depth = len(self)
+        if depth > self.stats['max_depth']:
+            self.stats['max_depth'] = depth
+        return True
+
+    def pop_batch(self, max_items=None):
+        """
+        Remove up to max_items events, highest priority lane first.
+
+        Returns:
+            list of (enqueue_time, event) tuples
+        """
+        if max_items is None:
+            max_items = self.batch_size
+        batch = []
+        for lane in self.lanes:
+            while lane and len(batch) < max_items:
+                batch.append(lane.popleft())
+            if len(batch) >= max_items:
+                break
+        return batch
+
+    def record_submit(self, count, latency, success):
+        """
+        Account for one submit call made by the draining greenthread.
+
+        Args:
+            count: Number of events in the submitted batch
+            latency: Wall-clock duration of the submit call in seconds
+            success: Whether the client reported success
+        """
+        self.stats['batches'] += 1
+        self.submit_latencies.append(latency)
+        if success:
+            self.stats['submitted'] += count
+        else:
+            self.stats['failed'] += count
+
+    def get_stats(self):
+        """Return a snapshot of queue depth, drop and latency counters"""
+        latencies = sorted(self.submit_latencies)
+        if latencies:
+            latency_ms = {
+                'avg': sum(latencies) / len(latencies) * 1000,
+                'p95': latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+                'max': latencies[-1] * 1000,
+            }
+        else:
+            latency_ms = {'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+
+        return {
+            'depth': len(self),
+            'depth_per_lane': {name: len(lane) for name, lane in zip(LANE_NAMES, self.lanes)},
+            'max_depth': self.stats['max_depth'],
+            'enqueued': self.stats['enqueued'],
+            'submitted': self.stats['submitted'],
+            'failed': self.stats['failed'],
+            'batches': self.stats['batches'],
+            'dropped': sum(self.stats['dropped']),
+            'dropped_per_lane': dict(zip(LANE_NAMES, self.stats['dropped'])),
+            'submit_latency_ms': latency_ms,
+        }
@@ -0,0 +1,153 @@
+"""
+Flow Feature Engine
+Computes the SFE / SSIP / RFIP detection features of one datapath in a single
+pass over its flow entries.
+
+    SFE  - speed of flow entries: flow count delta since the previous interval
+    SSIP - speed of source IPs: distinct ipv4_src count delta since the previous interval
+    RFIP - ratio of flow pairs: share of flows that have a reverse-direction flow
+
+One FlowFeatureState is kept per datapath and reused between polling intervals,
+so source IPs are tracked in a set and flow pairs in a dict keyed by
+(src, dst) tuples instead of lists and concatenated strings.
+
+Multipart flow-stats replies are streamed: each segment is folded into the
+accumulator of its request (keyed by xid) as it arrives and can be discarded
+right away, so a full flow table dump is never buffered.
+"""
+
+# Keep at most this many unfinished intervals per datapath (older ones are dropped)
+MAX_PENDING_INTERVALS = 2
+
+
+class _IntervalAccumulator:
+    """Feature accumulators of one polling interval (one stats request)"""
+
+    def __init__(self):
+        self.sources = set()
+        self.pairs = {}  # (src, dst) -> True once the reverse flow was seen
+        self.matched_pairs = 0
+        self.flow_count = 0
+
+    def reset(self):
+        self.sources.clear()
+        self.pairs.clear()
+        self.matched_pairs = 0
+        self.flow_count = 0
+
+
+class FlowFeatureState:
+    """Per-datapath feature state (streaming: begin -> add_flows/add_pair -> finish)"""
+
+    def __init__(self):
+        self.prev_flow_count = 0
+        self.prev_ssip_len = 0
+        self.prev_rfip = 1.0
+        self.discarded_intervals = 0
+        self._pending = {}  # xid -> _IntervalAccumulator (insertion ordered)
+        self._spare = []    # finished accumulators kept for reuse
+
+    def begin(self, xid=None):
+        """Start accumulating a new polling interval identified by xid"""
+        if xid in self._pending:
+            self._pending[xid].reset()
+            return
+        while len(self._pending) >= MAX_PENDING_INTERVALS:
+            # A reply that never completed (lost segment, reconnect): drop the oldest
+            stale_xid = next(iter(self._pending))
+            self._release(stale_xid)
+            self.discarded_intervals += 1
+        acc = self._spare.pop() if self._spare else _IntervalAccumulator()
+        self._pending[xid] = acc
+
+    def is_pending(self, xid=None):
+        """True if an interval for xid was started and not finished yet"""
+        return xid in self._pending
+
+    def add_flows(self, flows, xid=None):
+        """
+        Accumulate a chunk of OFPFlowStats entries (e.g. one multipart segment)
+
+        Args:
+            flows: iterable of objects with a `match` attribute (OFPMatch)
+            xid: Interval the chunk belongs to
+        """
+        acc = self._pending[xid]
+        for flow in flows:
+            srcip = dstip = None
+            # OFPMatch.items() returns the (field, value) list without copying
+            for key, val in flow.match.items():
+                if key == 'ipv4_src':
+                    srcip = val
+                elif key == 'ipv4_dst':
+                    dstip = val
+            self._add(acc, srcip, dstip)
+
+    def add_pair(self, srcip, dstip, xid=None):
+        """Accumulate one flow entry given its ipv4_src / ipv4_dst (None if absent)"""
+        self._add(self._pending[xid], srcip, dstip)
+
+    @staticmethod
+    def _add(acc, srcip, dstip):
+        acc.flow_count += 1
+        if srcip is not None:
+            acc.sources.add(srcip)
+        if srcip and dstip:
+            fwd = (srcip, dstip)
+            pairs = acc.pairs
+            if fwd in pairs:
+                return
+            rev = (dstip, srcip)
+            matched = pairs.get(rev)
+            if matched is None:
+                pairs[fwd] = False
+            elif not matched:
+                pairs[rev] = True
+                acc.matched_pairs += 1
+
+    def finish(self, xid=None):
+        """
+        Close the interval and advance the per-datapath history
+
+        Returns:
+            (sfe, ssip, rfip)
+        """
+        acc = self._pending[xid]
+        flow_count = acc.flow_count
+        sfe = flow_count - self.prev_flow_count
+        self.prev_flow_count = flow_count
+
+        ssip_len = len(acc.sources)
+        ssip = ssip_len - self.prev_ssip_len
+        self.prev_ssip_len = ssip_len
+
+        paired_flows = flow_count - 1  # Exclude table miss entry
+        if paired_flows <= 0:
+            rfip = 1.0
+        else:
+            rfip = float(2 * acc.matched_pairs) / paired_flows
+        self.prev_rfip = rfip
+
+        self._release(xid)
+        return sfe, ssip, rfip
+
+    def repeat(self):
+        """
+        Features of an interval in which the flow table did not change
+        (e.g. aggregate counters identical to the previous poll)
+
+        Returns:
+            (0, 0, previous rfip)
+        """
+        return 0, 0, self.prev_rfip
+
+    def _release(self, xid):
+        acc = self._pending.pop(xid)
+        acc.reset()
+        self._spare.append(acc)
+
+    def compute(self, flows):
+        """Compute (sfe, ssip, rfip) for a complete flow table dump"""
+        self.begin()
+        self.add_flows(flows)
+        return self.finish()
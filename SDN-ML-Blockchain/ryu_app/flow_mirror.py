@@ -0,0 +1,156 @@
+"""
+Flow Table Mirror
+Controller-side copy of one switch's flow table, maintained from the
+controller's own OFPFlowMod messages and EventOFPFlowRemoved notifications.
+
+Features are computed from the mirror every polling interval; a full
+OFPFlowStatsRequest dump is only needed now and then to reconcile drift
+(flows expired without notification, switch restarted, lost messages).
+"""
+import time
+
+# Unanswered reconcile dumps kept per switch before the oldest is abandoned
+MAX_PENDING_RECONCILES = 2
+
+
+def match_key(priority, match_items):
+    """
+    Identity of a flow entry on the switch: an OFPFC_ADD with the same
+    priority and match replaces the existing entry, whatever its cookie.
+
+    Args:
+        priority: Flow priority
+        match_items: OFPMatch.items() (list of (field, value) tuples)
+    """
+    return (priority, tuple(sorted(match_items)))
+
+
+class FlowTableMirror:
+    """Mirror of a single datapath's flow table"""
+
+    def __init__(self):
+        # key -> [cookie, ipv4_src, ipv4_dst, hard_expiry or None, installed_at]
+        self.entries = {}
+        self._tombstones = {}      # key -> removal time (used while a reconcile is in flight)
+        self._reconciling = {}     # xid -> (request_time, {key: entry})
+        self.stats = {'installed': 0, 'removed': 0, 'expired': 0,
+                      'reconciles': 0, 'drift_added': 0, 'drift_removed': 0}
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _l3_fields(match_items):
+        srcip = dstip = None
+        for key, val in match_items:
+            if key == 'ipv4_src':
+                srcip = val
+            elif key == 'ipv4_dst':
+                dstip = val
+        return srcip, dstip
+
+    def install(self, cookie, priority, match_items, hard_timeout=0, now=None):
+        """Record an OFPFlowMod(ADD) sent by the controller"""
+        now = time.time() if now is None else now
+        key = match_key(priority, match_items)
+        srcip, dstip = self._l3_fields(match_items)
+        expiry = now + hard_timeout if hard_timeout else None
+        self.entries[key] = [cookie, srcip, dstip, expiry, now]
+        self._tombstones.pop(key, None)
+        self.stats['installed'] += 1
+
+    def remove(self, priority, match_items, now=None):
+        """Apply an EventOFPFlowRemoved notification"""
+        key = match_key(priority, match_items)
+        if self.entries.pop(key, None) is not None:
+            self.stats['removed'] += 1
+        if self._reconciling:
+            self._tombstones[key] = time.time() if now is None else now
+
+    def expire(self, now=None):
+        """Drop hard-timeout entries that are past their expiry (FlowRemoved may be late/lost)"""
+        now = time.time() if now is None else now
+        expired = [key for key, entry in self.entries.items()
+                   if entry[3] is not None and entry[3] <= now]
+        for key in expired:
+            del self.entries[key]
+        self.stats['expired'] += len(expired)
+        return len(expired)
+
+    def feed(self, feature_state, xid=None):
+        """Stream every mirrored entry into a FlowFeatureState interval"""
+        add_pair = feature_state.add_pair
+        for entry in self.entries.values():
+            add_pair(entry[1], entry[2], xid)
+
+    def begin_reconcile(self, xid, request_time=None, max_age=None):
+        """
+        Start collecting a full flow-stats dump sent with this xid
+
+        Args:
+            max_age: Abandon pending dumps requested more than this many seconds
+                before request_time (their reply was lost)
+        """
+        request_time = time.time() if request_time is None else request_time
+        if max_age is not None:
+            for stale in [x for x, (sent, _) in self._reconciling.items() if request_time - sent > max_age]:
+                del self._reconciling[stale]
+        while len(self._reconciling) >= MAX_PENDING_RECONCILES:
+            self._reconciling.pop(next(iter(self._reconciling)))
+        self._reconciling[xid] = (request_time, {})
+        self._prune_tombstones()
+
+    def is_reconciling(self, xid):
+        return xid in self._reconciling
+
+    def add_dump_segment(self, xid, flows):
+        """Fold one multipart segment of the dump (OFPFlowStats entries)"""
+        staged = self._reconciling[xid][1]
+        for flow in flows:
+            items = flow.match.items()
+            srcip, dstip = self._l3_fields(items)
+            # Remaining hard timeout is unknown from stats; rely on FlowRemoved/next reconcile
+            staged[match_key(flow.priority, items)] = [flow.cookie, srcip, dstip, None, None]
+
+    def finish_reconcile(self, xid):
+        """
+        Replace the mirror with the dump, keeping changes that happened after
+        the request was sent (they may not be reflected in the reply).
+
+        Returns:
+            (added, removed): number of entries the dump corrected
+        """
+        request_time, staged = self._reconciling.pop(xid)
+        for key, entry in self.entries.items():
+            installed_at = entry[4]
+            if key not in staged and installed_at is not None and installed_at >= request_time:
+                staged[key] = entry
+            elif key in staged:
+                # Keep our known hard expiry for entries the dump confirms
+                staged[key][3] = entry[3]
+                staged[key][4] = entry[4]
+        for key, removed_at in self._tombstones.items():
+            if removed_at >= request_time:
+                staged.pop(key, None)
+
+        added = sum(1 for key in staged if key not in self.entries)
+        removed = sum(1 for key in self.entries if key not in staged)
+        self.entries = staged
+        self._prune_tombstones()
+
+        self.stats['reconciles'] += 1
+        self.stats['drift_added'] += added
+        self.stats['drift_removed'] += removed
+        return added, removed
+
+    def abort_reconcile(self, xid):
+        self._reconciling.pop(xid, None)
+        self._prune_tombstones()
+
+    def _prune_tombstones(self):
+        """Forget removals older than every pending dump request (no reply can contain them)"""
+        if not self._reconciling:
+            self._tombstones.clear()
+            return
+        oldest = min(sent for sent, _ in self._reconciling.values())
+        self._tombstones = {key: at for key, at in self._tombstones.items() if at >= oldest}
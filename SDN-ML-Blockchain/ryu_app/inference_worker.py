@@ -0,0 +1,352 @@
+"""
+Inference Worker
+Runs MLDetector.classify_batch() in a separate process so slow models (SVC,
+random forests) do not block the controller's eventlet hub.
+
+Feature vectors and verdicts travel through two single-producer /
+single-consumer rings in one shared memory block - nothing is pickled per
+request:
+
+    header     int64[8]   request head/tail, response head/tail, ready, stop,
+                          worker batches, worker vectors
+    requests   ids int64[capacity], features float64[capacity, 3]
+    responses  ids int64[capacity], labels int64[capacity]
+
+Head and tail only ever grow (slot = index % capacity); each is written by one
+side only, after the slot data it publishes. A semaphore wakes the worker
+when requests are queued; the controller polls for responses.
+
+The worker never trains: it waits until ml_model_<type>.pkl exists (written
+by the controller's detector or its background trainer) and only loads it,
+so two processes never train and save the same artifact.
+
+The controller classifies inline (with its own MLDetector) when
+    - the worker is not running or has not loaded its model yet ('not_ready')
+    - the request ring is full ('overflow', or the vector is dropped with
+      overflow='drop')
+    - a request has waited longer than the deadline ('lagging'; the late
+      verdict is discarded when it arrives)
+"""
+import os
+import time
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ('inline', 'drop')
+
+# Header fields
+REQ_HEAD, REQ_TAIL, RESP_HEAD, RESP_TAIL, READY, STOP, WORKER_BATCHES, WORKER_VECTORS = range(8)
+HEADER_FIELDS = 8
+
+
+class _Rings:
+    """numpy views of the request / response rings in a shared memory buffer"""
+
+    def __init__(self, buf, capacity):
+        self.capacity = capacity
+        offset = 0
+
+        def view(shape, dtype):
+            nonlocal offset
+            array = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            offset += array.nbytes
+            return array
+
+        self.header = view((HEADER_FIELDS,), np.int64)
+        self.req_ids = view((capacity,), np.int64)
+        self.req_X = view((capacity, 3), np.float64)
+        self.resp_ids = view((capacity,), np.int64)
+        self.resp_labels = view((capacity,), np.int64)
+
+    @staticmethod
+    def nbytes(capacity):
+        return (HEADER_FIELDS + capacity * 6) * 8
+
+    def release(self):
+        # Views must go before the SharedMemory block can be closed
+        self.header = self.req_ids = self.req_X = self.resp_ids = self.resp_labels = None
+
+    def free_requests(self):
+        return self.capacity - int(self.header[REQ_HEAD] - self.header[REQ_TAIL])
+
+    def put_requests(self, ids, X):
+        """Producer: publish rows (the caller checked free_requests())"""
+        head = int(self.header[REQ_HEAD])
+        slots = (head + np.arange(len(ids))) % self.capacity
+        self.req_ids[slots] = ids
+        self.req_X[slots] = X
+        self.header[REQ_HEAD] = head + len(ids)
+
+    def take_requests(self):
+        """Consumer: (ids, X) of every published request"""
+        tail, head = int(self.header[REQ_TAIL]), int(self.header[REQ_HEAD])
+        slots = np.arange(tail, head) % self.capacity
+        ids, X = self.req_ids[slots].copy(), self.req_X[slots].copy()
+        self.header[REQ_TAIL] = head
+        return ids, X
+
+    def free_responses(self):
+        return self.capacity - int(self.header[RESP_HEAD] - self.header[RESP_TAIL])
+
+    def put_responses(self, ids, labels):
+        head = int(self.header[RESP_HEAD])
+        slots = (head + np.arange(len(ids))) % self.capacity
+        self.resp_ids[slots] = ids
+        self.resp_labels[slots] = labels
+        self.header[RESP_HEAD] = head + len(ids)
+
+    def take_responses(self):
+        tail, head = int(self.header[RESP_TAIL]), int(self.header[RESP_HEAD])
+        slots = np.arange(tail, head) % self.capacity
+        ids, labels = self.resp_ids[slots].copy(), self.resp_labels[slots].copy()
+        self.header[RESP_TAIL] = head
+        return ids, labels
+
+
+def _load_detector(rings, parent, detector_options, poll_interval=0.5):
+    """Wait for the controller's artifact and load it (None if stopped first); never trains"""
+    try:
+        from ryu_app.ml_detector import MLDetector, BASE_DIR
+        from ryu_app.model_artifact import ArtifactError
+    except ImportError:
+        from ml_detector import MLDetector, BASE_DIR
+        from model_artifact import ArtifactError
+
+    model_type = detector_options.get('model_type', 'decision_tree')
+    model_file = os.path.join(detector_options.get('model_dir') or BASE_DIR, f'ml_model_{model_type}.pkl')
+    waiting_logged = False
+    while not rings.header[STOP] and os.getppid() == parent:
+        if os.path.exists(model_file):
+            try:
+                return MLDetector(**detector_options)
+            except ArtifactError as e:
+                # e.g. the .pkl was replaced before its metadata sidecar: try again
+                logger.warning(f"Inference worker could not load {model_file} yet: {e}")
+        elif not waiting_logged:
+            waiting_logged = True
+            logger.info(f"Inference worker waiting for {model_file}")
+        time.sleep(poll_interval)
+    return None
+
+
+def _worker_main(shm_name, capacity, doorbell, detector_options, grid_options, cascade_options, reload_interval):
+    """Worker process: load the detector, then classify whatever the controller queues"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    rings = _Rings(shm.buf, capacity)
+    parent = os.getppid()
+    try:
+        detector = _load_detector(rings, parent, detector_options)
+        if detector is None:
+            return
+        if grid_options:
+            detector.build_grid(**grid_options)
+        if cascade_options:
+            detector.enable_cascade(**cascade_options)
+        if reload_interval:
+            detector.start_watcher(interval=reload_interval)
+        rings.header[READY] = 1
+
+        while not rings.header[STOP] and os.getppid() == parent:
+            doorbell.acquire(timeout=0.5)
+            if rings.header[REQ_HEAD] == rings.header[REQ_TAIL]:
+                continue
+            ids, X = rings.take_requests()
+            labels = np.asarray(detector.classify_batch(X)).astype(np.int64)
+            # The controller drains responses every poll; wait for room rather than lose verdicts
+            while rings.free_responses() < len(ids) and not rings.header[STOP]:
+                time.sleep(0.001)
+            rings.put_responses(ids, labels)
+            rings.header[WORKER_BATCHES] += 1
+            rings.header[WORKER_VECTORS] += len(ids)
+    finally:
+        rings.header[READY] = 0
+        rings.release()
+        shm.close()
+
+
+class InferenceWorker:
+    """Controller-side handle of the inference worker process"""
+
+    def __init__(self, detector, detector_options, capacity=1024, deadline=0.2, overflow='inline',
+                 grid_options=None, cascade_options=None, reload_interval=None):
+        """
+        Args:
+            detector: The controller's own MLDetector (inline fallback)
+            detector_options: MLDetector keyword arguments for the worker's detector
+                (load-only: training and retrain-on-load-failure are turned off)
+            capacity: Request / response ring size (vectors)
+            deadline: Seconds a queued vector may wait before it is classified inline
+            overflow: 'inline' (classify on the event loop) or 'drop' when the ring is full
+            grid_options: build_grid() arguments for the worker's detector (None = no grid)
+            cascade_options: enable_cascade() arguments for the worker's detector (None = no cascade)
+            reload_interval: Hot reload watcher interval in the worker (None = off)
+
+        Raises:
+            ValueError: unknown overflow policy
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow} (use {' or '.join(OVERFLOW_POLICIES)})")
+        self.detector = detector
+        self.detector_options = dict(detector_options, background_training=False,
+                                     retrain_on_load_failure=False)
+        self.capacity = capacity
+        self.deadline = deadline
+        self.overflow = overflow
+        self.grid_options = grid_options
+        self.cascade_options = cascade_options
+        self.reload_interval = reload_interval
+        self.process = None
+        self._shm = None
+        self._rings = None
+        self._doorbell = None
+        self._next_id = 0
+        self._pending = {}       # request id -> (item, features, submitted_at), in submission order
+        self._not_ready_warned = False
+        self.stats = {'submitted': 0, 'completed': 0, 'late': 0, 'dropped': 0,
+                      'inline_not_ready': 0, 'inline_overflow': 0, 'inline_lagging': 0}
+
+    def start(self):
+        ctx = multiprocessing.get_context('spawn')
+        self._shm = shared_memory.SharedMemory(create=True, size=_Rings.nbytes(self.capacity))
+        self._rings = _Rings(self._shm.buf, self.capacity)
+        self._rings.header[:] = 0
+        self._doorbell = ctx.Semaphore(0)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.capacity, self._doorbell, self.detector_options,
+                  self.grid_options, self.cascade_options, self.reload_interval),
+            name='inference-worker', daemon=True)
+        self.process.start()
+        logger.info(f"Inference worker started (pid {self.process.pid}, ring {self.capacity} vectors, "
+                     f"deadline {self.deadline * 1000:.0f} ms, overflow {self.overflow})")
+
+    def ready(self):
+        """True while the worker process is alive and has its model loaded"""
+        return (self.process is not None and self.process.is_alive()
+                and self._rings is not None and bool(self._rings.header[READY]))
+
+    def wait_until_ready(self, timeout=None):
+        """Block until ready() (True) or the timeout expires / the worker died (False)"""
+        end = None if timeout is None else time.monotonic() + timeout
+        while not self.ready():
+            if self.process is None or not self.process.is_alive():
+                return False
+            if end is not None and time.monotonic() >= end:
+                return False
+            time.sleep(0.01)
+        return True
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def submit(self, items, X, now=None):
+        """
+        Queue one batch of feature vectors for the worker
+
+        Args:
+            items: Opaque per-vector values handed back with the verdicts
+            X: (n, 3) features
+
+        Returns:
+            [(item, label)] resolved now (inline classification; label None if
+            dropped); the rest are returned by later poll() calls
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 3)
+        if not len(X):
+            return []
+        if not self.ready():
+            if not self._not_ready_warned:
+                self._not_ready_warned = True
+                logger.warning("Inference worker not ready, classifying on the event loop")
+            self.stats['inline_not_ready'] += len(X)
+            return self._inline(items, X)
+        self._not_ready_warned = False
+
+        now = time.time() if now is None else now
+        queued = min(len(X), self._rings.free_requests())
+        if queued:
+            ids = np.arange(self._next_id, self._next_id + queued)
+            self._next_id += queued
+            self._rings.put_requests(ids, X[:queued])
+            for request_id, item, row in zip(ids.tolist(), items[:queued], X[:queued]):
+                self._pending[request_id] = (item, row, now)
+            self.stats['submitted'] += queued
+            self._doorbell.release()
+        if queued == len(X):
+            return []
+
+        rest = len(X) - queued
+        if self.overflow == 'drop':
+            self.stats['dropped'] += rest
+            return [(item, None) for item in items[queued:]]
+        self.stats['inline_overflow'] += rest
+        return self._inline(items[queued:], X[queued:])
+
+    def poll(self, now=None):
+        """
+        Collect the worker's verdicts and classify inline whatever has waited
+        longer than the deadline (or everything, if the worker died)
+
+        Returns:
+            [(item, label)]
+        """
+        resolved = []
+        if self._rings is not None:
+            ids, labels = self._rings.take_responses()
+            for request_id, label in zip(ids.tolist(), labels.tolist()):
+                entry = self._pending.pop(request_id, None)
+                if entry is None:
+                    self.stats['late'] += 1
+                    continue
+                resolved.append((entry[0], label))
+            self.stats['completed'] += len(resolved)
+
+        if self._pending:
+            now = time.time() if now is None else now
+            alive = self.process is not None and self.process.is_alive()
+            expired = [request_id for request_id, (_, _, submitted_at) in self._pending.items()
+                       if not alive or now - submitted_at >= self.deadline]
+            if expired:
+                entries = [self._pending.pop(request_id) for request_id in expired]
+                X = np.array([row for _, row, _ in entries])
+                self.stats['inline_lagging'] += len(entries)
+                resolved.extend(self._inline([item for item, _, _ in entries], X))
+        return resolved
+
+    def _inline(self, items, X):
+        labels = self.detector.classify_batch(X)
+        return [(item, int(label)) for item, label in zip(items, labels)]
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['pending'] = len(self._pending)
+        stats['ready'] = self.ready()
+        if self._rings is not None:
+            stats['worker_batches'] = int(self._rings.header[WORKER_BATCHES])
+            stats['worker_vectors'] = int(self._rings.header[WORKER_VECTORS])
+        return stats
+
+    def stop(self, timeout=5.0):
+        """Stop the worker process and free the shared memory (pending vectors are dropped)"""
+        if self.process is not None:
+            self._rings.header[STOP] = 1
+            self._doorbell.release()
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+        if self._shm is not None:
+            self._rings.release()
+            self._rings = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        self._pending.clear()
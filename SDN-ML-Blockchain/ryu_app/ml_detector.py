@@ -5,12 +5,33 @@ Supports multiple ML algorithms for DDoS detection
 from __future__ import division
 import numpy as np
 import os
+import copy
+import time
+import threading
+import multiprocessing
 import logging
 from sklearn import svm
 from sklearn import tree
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.naive_bayes import GaussianNB
-import joblib
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import Pipeline
+from sklearn.utils.validation import has_fit_parameter
+
+try:
+    from ryu_app.compiled_model import compile_sklearn, verification_samples
+    from ryu_app.decision_grid import DecisionGrid
+    from ryu_app.cascade import CascadeClassifier
+    from ryu_app.model_artifact import ArtifactError, save_artifact, load_artifact, file_sha256, meta_path
+    from ryu_app.dataset import load_training_data, deduplicate
+except ImportError:
+    from compiled_model import compile_sklearn, verification_samples
+    from decision_grid import DecisionGrid
+    from cascade import CascadeClassifier
+    from model_artifact import ArtifactError, save_artifact, load_artifact, file_sha256, meta_path
+    from dataset import load_training_data, deduplicate
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,77 +41,698 @@ DEFAULT_DATA_PATH = os.path.abspath(os.path.join(PROJECT_ROOT, 'dataset', 'resul
 # Setup logger
 logger = logging.getLogger(__name__)
 
+SUPPORTED_MODELS = ['decision_tree', 'random_forest', 'svm', 'naive_bayes', 'svm_approx', 'sgd']
+TREE_MODELS = ('decision_tree', 'random_forest')
+# Model types with a compiled (sklearn-free) evaluator, see compiled_model
+COMPILED_MODELS = TREE_MODELS + ('svm_approx',)
+# Model types that can absorb new labelled rows without a full retrain (see partial_fit_model)
+INCREMENTAL_MODELS = ('naive_bayes', 'sgd')
+
+# Feature vectors a reloaded model must classify before it is swapped in
+WARMUP_ROWS = np.array([[0, 0, 1.0], [5, 2, 0.5], [60, 40, 0.1], [3000, 2000, 0.0]])
+
+
+def create_model(model_type):
+    """Untrained estimator for model_type (the settings the detector deploys)"""
+    if model_type == 'svm':
+        return svm.SVC(kernel='rbf', gamma='scale')
+    elif model_type == 'decision_tree':
+        return tree.DecisionTreeClassifier()
+    elif model_type == 'random_forest':
+        return RandomForestClassifier(n_estimators=100, random_state=42)
+    elif model_type == 'naive_bayes':
+        return GaussianNB()
+    elif model_type == 'svm_approx':
+        # RBF kernel approximated by a fixed-size Nystroem feature map + linear SVM:
+        # fit is linear in the number of rows, predict cost does not depend on it
+        # (unlike SVC, whose support vectors grow with the data)
+        return Pipeline([
+            ('feature_map', Nystroem(kernel='rbf', n_components=256, random_state=0)),
+            ('linear', svm.LinearSVC(C=1.0)),
+        ])
+    elif model_type == 'sgd':
+        # Linear model trained by SGD: supports partial_fit (online learning). The scaler
+        # is fitted once on the training data and stays fixed during incremental updates
+        return Pipeline([
+            ('scale', StandardScaler()),
+            ('linear', SGDClassifier(loss='log_loss', random_state=0)),
+        ])
+    raise ValueError(f"Unknown model type: {model_type}")
+
+
+def fit_model(model, X, y, dedup=True, n_jobs=None):
+    """
+    Fit model on typed training arrays
+
+    Args:
+        dedup: Fit on unique rows weighted by their counts (see dataset.deduplicate)
+        n_jobs: Parallel jobs while fitting estimators that support it (random forest);
+            reset afterwards so the deployed model predicts single-threaded
+
+    Returns:
+        dict with rows, fit_rows, fit_seconds
+
+    Raises:
+        ValueError: fewer than two classes in y
+    """
+    unique_labels, counts = np.unique(y, return_counts=True)
+    num_classes = len(unique_labels)
+    if num_classes < 2:
+        label_counts = dict(zip(unique_labels.tolist(), counts.tolist()))
+        raise ValueError(
+            f"Dataset chỉ có {num_classes} class (cần ít nhất 2 class để train model). "
+            f"Phân bố label: {label_counts}. "
+            f"Vui lòng thu thập thêm dữ liệu: "
+            f"chạy với APP_TYPE=0 TEST_TYPE=0 để thu thập normal traffic (label=0), "
+            f"và APP_TYPE=0 TEST_TYPE=1 để thu thập attack traffic (label=1)."
+        )
+
+    parallel = n_jobs is not None and 'n_jobs' in model.get_params()
+    if parallel:
+        model.set_params(n_jobs=n_jobs)
+    rows = len(X)
+    start = time.perf_counter()
+    X_full = X
+    weights = None
+    if dedup:
+        X, y, weights = deduplicate(X, y)
+    pin_data_dependent_params(model, X_full, X)
+    if weights is None:
+        model.fit(X, y)
+    elif isinstance(model, Pipeline):
+        # Pipelines route sample weights to named steps: give them to every step that
+        # takes them (e.g. the sgd scaler), or it is fitted on the unweighted unique rows
+        model.fit(X, y, **{f'{name}__sample_weight': weights for name, step in model.steps
+                           if step not in (None, 'passthrough') and has_fit_parameter(step, 'sample_weight')})
+    else:
+        model.fit(X, y, sample_weight=weights)
+    fit_seconds = time.perf_counter() - start
+    if parallel:
+        model.set_params(n_jobs=None)
+    return {'rows': rows, 'fit_rows': len(X), 'fit_seconds': fit_seconds}
+
+
+def pin_data_dependent_params(model, X, X_unique):
+    """
+    Before fitting (possibly on deduplicated rows X_unique): SVC gamma='scale'
+    and the GaussianNB var_smoothing epsilon are computed from the unweighted
+    feature variance, so pin them to the values the full (repeated) rows X
+    would give. The svm_approx feature map gets the same gamma as 'scale'.
+    """
+    if isinstance(model, svm.SVC) and model.gamma == 'scale':
+        model.set_params(gamma=1.0 / (X.shape[1] * X.var(dtype=np.float64)))
+    elif isinstance(model, Pipeline) and isinstance(model.steps[0][1], Nystroem):
+        if model.steps[0][1].gamma is None:
+            model.set_params(**{f'{model.steps[0][0]}__gamma': 1.0 / (X.shape[1] * X.var(dtype=np.float64))})
+    elif isinstance(model, GaussianNB):
+        unique_var = X_unique.var(axis=0, dtype=np.float64).max()
+        if unique_var > 0:
+            full_var = X.var(axis=0, dtype=np.float64).max()
+            model.set_params(var_smoothing=model.var_smoothing * full_var / unique_var)
+    return model
+
+
+def partial_fit_model(model, X, y):
+    """
+    Update a fitted naive_bayes / sgd model in place with new labelled rows
+
+    GaussianNB re-derives its variance epsilon from each batch; var_smoothing is
+    rescaled so the epsilon of the fitted model is kept. Pipelines transform X
+    with their fitted leading steps and update only the last step.
+
+    Raises:
+        ValueError: the model has no partial_fit
+    """
+    if isinstance(model, Pipeline):
+        X = model[:-1].transform(X)
+        model = model.steps[-1][1]
+    if hasattr(model, 'coef_'):
+        # Linear models reject a dtype other than the one they were fitted with
+        X = np.asarray(X, dtype=model.coef_.dtype)
+    if not hasattr(model, 'partial_fit'):
+        raise ValueError(f"{type(model).__name__} does not support incremental updates")
+    if isinstance(model, GaussianNB):
+        epsilon = model.epsilon_
+        spread = np.var(X, axis=0, dtype=np.float64).max()
+        if spread > 0:
+            model.set_params(var_smoothing=epsilon / spread)
+        model.partial_fit(X, y)
+        # A constant batch gives epsilon 0 (nothing subtracted or added): var_ still holds the old one
+        model.epsilon_ = epsilon
+    else:
+        model.partial_fit(X, y)
+    return model
+
+
+class _ModelState:
+    """One model version with its compiled copy, grid, cascade and metadata (swapped as one reference)"""
+
+    __slots__ = ('model', 'compiled', 'grid', 'meta', 'cascade')
+
+    def __init__(self, model=None, compiled=None, grid=None, meta=None, cascade=None):
+        self.model = model
+        self.compiled = compiled
+        self.grid = grid
+        self.meta = meta
+        self.cascade = cascade
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return _ModelState(**values)
+
 
 class MLDetector:
-    def __init__(self, model_type='decision_tree', model_path=None):
+    def __init__(self, model_type='decision_tree', model_path=None, compiled=True,
+                 retrain_on_load_failure=True, background_training=False, model_dir=None,
+                 dedup=True):
         """
         Initialize ML detector with specified model type (GIỐNG TÁC GIẢ GỐC)
         
         Args:
-            model_type: 'svm', 'decision_tree', 'random_forest', or 'naive_bayes'
+            model_type: 'svm', 'decision_tree', 'random_forest', 'naive_bayes',
+                'svm_approx' (Nystroem RBF approximation + linear SVM, constant-time predict)
+                or 'sgd' (scaled linear model, supports partial_fit like naive_bayes)
             model_path: Path to training data CSV
+            compiled: Compile tree/forest models to flat arrays (see compile_model)
+            retrain_on_load_failure: Retrain from CSV if the saved artifact is corrupt or
+                incompatible (False raises ArtifactError instead)
+            background_training: If a model has to be trained, do it in a worker process
+                and classify with the threshold fallback until it is swapped in
+            model_dir: Directory of ml_model_<type>.pkl (default: ryu_app/)
+            dedup: Fit on unique training rows weighted by their counts (see dataset.deduplicate)
         """
         self.model_type = model_type
-        self.model = None
+        self._state = _ModelState()
+        self.load_seconds = None
         self.is_trained = False
-        self.model_dir = BASE_DIR
+        self.model_dir = model_dir or BASE_DIR
+        self.compile_enabled = compiled
+        self.dedup = dedup
+        self.grid_options = None
+        self.cascade_options = None
+        self.background_training = background_training
+        self.training_process = None
+        self._ready = threading.Event()
+        self._started_at = time.time()
+        self._first_verdict_logged = False
+        self._fallback_warned = False
+        self._previous_state = None
+        self._swap_lock = threading.Lock()
+        self.swap_count = 0
+        self.update_count = 0
+        self.update_rows = 0
+        self._loaded_signature = None
+        self._watcher = None
+        self._watch_stop = threading.Event()
         
         # Resolve paths
         if model_path is None:
             model_path = DEFAULT_DATA_PATH
         elif not os.path.isabs(model_path):
             model_path = os.path.abspath(os.path.join(PROJECT_ROOT, model_path))
+        self.data_path = model_path
         
         # Kiểm tra xem đã có model đã train sẵn chưa
-        model_file = os.path.join(self.model_dir, f'ml_model_{self.model_type}.pkl')
+        self.model_file = os.path.join(self.model_dir, f'ml_model_{self.model_type}.pkl')
         
-        if os.path.exists(model_file):
+        if os.path.exists(self.model_file):
             # Load model đã train sẵn
             try:
-                self.load_model(model_file)
-                logger.info(f"✓ Loaded pre-trained {model_type} model from {model_file}")
-            except Exception as e:
-                logger.warning(f"Failed to load pre-trained model: {e}. Will train new model.")
+                self.load_model(self.model_file)
+                logger.info(f"✓ Loaded pre-trained {model_type} model from {self.model_file}")
+            except ArtifactError as e:
+                if not retrain_on_load_failure:
+                    raise
+                logger.error(f"Failed to load pre-trained model: {e}. Retraining from {model_path}.")
                 # Nếu load thất bại, train lại
-                if not os.path.exists(model_path):
-                    raise FileNotFoundError(
-                        f"Training data CSV not found at {model_path}. "
-                        "Please run in data collection mode (APP_TYPE=0) to create data/result.csv"
-                    )
-                ok = self.train(model_path)
-                if not ok:
-                    raise RuntimeError(
-                        f"Failed to train {model_type} model from {model_path}. "
-                        "Check CSV format and contents."
-                    )
+                self._train_initial(model_path)
         else:
             # Chưa có model → cần train mới
-            if not os.path.exists(model_path):
-                raise FileNotFoundError(
-                    f"Training data CSV not found at {model_path}. "
-                    "Please run in data collection mode (APP_TYPE=0) to create data/result.csv"
-                )
-
             logger.info(f"No pre-trained model found. Training new {model_type} model from {model_path}")
-            ok = self.train(model_path)
-            if not ok:
-                raise RuntimeError(
-                    f"Failed to train {model_type} model from {model_path}. "
-                    "Check CSV format and contents."
-                )
+            self._train_initial(model_path)
+
+        if self.is_trained:
+            if compiled and self.model_type in COMPILED_MODELS:
+                self.compile_model()
+            self._ready.set()
+
+    # The active model version: classify() reads self._state once, so a swap
+    # (single reference assignment) never mixes two models in one verdict
+    @property
+    def model(self):
+        return self._state.model
+
+    @model.setter
+    def model(self, model):
+        # The compiled copy, grid, cascade and metadata belong to the previous model
+        self._state = _ModelState(model)
+
+    @property
+    def compiled(self):
+        return self._state.compiled
+
+    @compiled.setter
+    def compiled(self, compiled):
+        self._state = self._state.replace(compiled=compiled)
+
+    @property
+    def grid(self):
+        return self._state.grid
+
+    @grid.setter
+    def grid(self, grid):
+        self._state = self._state.replace(grid=grid)
+
+    @property
+    def cascade(self):
+        return self._state.cascade
+
+    @property
+    def artifact_meta(self):
+        return self._state.meta
+
+    @artifact_meta.setter
+    def artifact_meta(self, meta):
+        self._state = self._state.replace(meta=meta)
+
+    def _train_initial(self, data_path):
+        """Train the first model, synchronously or in a background worker process"""
+        if not os.path.exists(data_path):
+            raise FileNotFoundError(
+                f"Training data CSV not found at {data_path}. "
+                "Please run in data collection mode (APP_TYPE=0) to create data/result.csv"
+            )
+        if self.background_training:
+            self._start_background_training()
+            return
+        ok = self.train(data_path)
+        if not ok:
+            raise RuntimeError(
+                f"Failed to train {self.model_type} model from {data_path}. "
+                "Check CSV format and contents."
+            )
+
+    def _start_background_training(self):
+        ctx = multiprocessing.get_context('spawn')
+        self.training_process = ctx.Process(target=train_model_artifact,
+                                            args=(self.model_type, self.data_path, self.model_dir, self.dedup),
+                                            name=f'train-{self.model_type}', daemon=True)
+        self.training_process.start()
+        threading.Thread(target=self._finish_background_training,
+                         name=f'train-{self.model_type}-wait', daemon=True).start()
+        logger.info(
+            f"Training {self.model_type} model in background process (pid {self.training_process.pid}); "
+            "threshold fallback (sfe > 50 or ssip > 30) is used until it is ready"
+        )
+
+    def _finish_background_training(self):
+        """Wait for the training process, then load, warm and swap in its model (off the event loop)"""
+        process = self.training_process
+        process.join()
+        if process.exitcode != 0:
+            logger.error(
+                f"Background training of {self.model_type} failed (exit code {process.exitcode}); "
+                "staying on threshold fallback"
+            )
+            return
+
+        signature = self._artifact_signature()
+        try:
+            model, meta, seconds = load_artifact(self.model_file, model_type=self.model_type)
+            state = self._prepare_state(model, meta)
+        except Exception as e:
+            logger.error(f"Could not load background-trained {self.model_type} model: {e}")
+            return
+        self.load_seconds = seconds
+        self._loaded_signature = signature
+        self._swap(state)
+        logger.info(
+            f"✓ {self.model_type} model trained in background and swapped in "
+            f"{time.time() - self._started_at:.2f}s after startup"
+        )
+
+    def _prepare_state(self, model, meta=None):
+        """Build the compiled copy / grid / cascade of model without touching the active version"""
+        compiled = None
+        if self.compile_enabled and self.model_type in COMPILED_MODELS:
+            compiled = self._compile(model)
+        grid = self._build_grid(model, compiled)[0] if self.grid_options else None
+        cascade = self._build_cascade(model, compiled) if self.cascade_options else None
+        return _ModelState(model, compiled, grid, meta, cascade)
+
+    def _swap(self, state):
+        """Make state the active model version (one reference assignment)"""
+        with self._swap_lock:
+            if self.is_trained:
+                self._previous_state = self._state
+            self._state = state
+            self.is_trained = True
+            self.swap_count += 1
+        self._ready.set()
+
+    def _warm(self, state):
+        """Run every evaluator of state once and check its output (raises ValueError)"""
+        n_features = getattr(state.model, 'n_features_in_', 3)
+        if n_features != 3:
+            raise ValueError(f"model expects {n_features} features, detector provides 3 (sfe, ssip, rfip)")
+        expected = state.model.predict(WARMUP_ROWS)
+        if not np.isin(expected, state.model.classes_).all():
+            raise ValueError(f"model predicted labels outside its classes {state.model.classes_}")
+        if state.compiled is not None:
+            state.compiled.predict_one(WARMUP_ROWS[0].tolist())
+            if state.compiled.predict(WARMUP_ROWS).tolist() != expected.tolist():
+                raise ValueError("compiled model disagrees with sklearn on warm-up rows")
+        if state.grid is not None:
+            state.grid.lookup_batch(WARMUP_ROWS)
+        if state.cascade is not None:
+            state.cascade.decide_batch(WARMUP_ROWS)
+
+    def reload_model(self, filepath=None):
+        """
+        Hot reload: load, validate and warm an artifact without touching the
+        active model, then swap it in between classifications. The model it
+        replaces is kept for rollback().
+
+        Args:
+            filepath: Artifact to load (default: this detector's ml_model_<type>.pkl)
+
+        Returns:
+            True if the new model is active, False if it was rejected
+        """
+        filepath = filepath or self.model_file
+        signature = self._artifact_signature(filepath)
+        try:
+            model, meta, seconds = load_artifact(filepath, model_type=self.model_type)
+            state = self._prepare_state(model, meta)
+            self._warm(state)
+        except Exception as e:
+            logger.error(f"Hot reload of {filepath} rejected, keeping the active model: {e}")
+            if filepath == self.model_file:
+                # Don't retry the same broken file; a new write changes the signature
+                self._loaded_signature = signature
+            return False
+
+        self.load_seconds = seconds
+        if filepath == self.model_file:
+            self._loaded_signature = signature
+        self._swap(state)
+        created = meta.get('created_at') if meta else 'legacy artifact'
+        logger.info(
+            f"✓ Hot-swapped {self.model_type} model from {filepath} (swap #{self.swap_count}, "
+            f"created {created}, load {seconds * 1000:.1f} ms)"
+        )
+        return True
+
+    def rollback(self):
+        """
+        Swap the previously active model back in (calling it again undoes the rollback)
+
+        Returns:
+            False if there is no previous model
+        """
+        with self._swap_lock:
+            previous = self._previous_state
+        if previous is None:
+            logger.warning(f"No previous {self.model_type} model to roll back to")
+            return False
+        self._swap(previous)
+        created = previous.meta.get('created_at') if previous.meta else 'legacy artifact'
+        logger.info(f"↩ Rolled back to previous {self.model_type} model (swap #{self.swap_count}, created {created})")
+        return True
+
+    def _artifact_signature(self, filepath=None):
+        """(mtime, size) of the artifact and its sidecar; None if the artifact is missing"""
+        filepath = filepath or self.model_file
+        signature = []
+        for path in (filepath, meta_path(filepath)):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                if path == filepath:
+                    return None
+                signature.append(None)
+        return tuple(signature)
+
+    def start_watcher(self, interval=5.0):
+        """
+        Watch ml_model_<type>.pkl from a daemon thread and reload_model() when it
+        changes (validation and warm-up never run on the controller's event loop)
+        """
+        if self._watcher is not None:
+            return
+        if self._loaded_signature is None and self.is_trained:
+            self._loaded_signature = self._artifact_signature()
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                         name=f'model-watch-{self.model_type}', daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {self.model_file} for new models (every {interval:.1f}s)")
+
+    def stop_watcher(self):
+        if self._watcher is not None:
+            self._watch_stop.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval):
+        pending = None
+        while not self._watch_stop.wait(interval):
+            if self.training_process is not None and self.training_process.is_alive():
+                continue
+            signature = self._artifact_signature()
+            if signature is None or signature == self._loaded_signature:
+                pending = None
+                continue
+            if signature != pending:
+                # Reload only once the file is unchanged for a full interval (not mid-copy)
+                pending = signature
+                continue
+            pending = None
+            self.reload_model()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until a trained model is active (True) or the timeout expires (False)"""
+        return self._ready.wait(timeout)
+
+    def compile_model(self):
+        """
+        Export the trained tree/forest (CompiledTreeModel) or svm_approx pipeline
+        (CompiledKernelModel) to arrays evaluated without sklearn and switch classify()/classify_batch() to it, but only
+        if its predictions are identical to model.predict() on the verification set
+
+        Returns:
+            True if the compiled path is active
+        """
+        compiled = self._compile(self.model)
+        self.compiled = compiled
+        return compiled is not None
+
+    def _compile(self, model):
+        """Compiled evaluator of model if it is verified identical to model.predict(), else None"""
+        try:
+            compiled = compile_sklearn(model)
+            X_train = None
+            if os.path.exists(self.data_path):
+                X_train = load_training_data(self.data_path)[0]
+            samples = verification_samples(model, X_train)
+            mismatches = compiled.verify(model, samples)
+        except Exception as e:
+            logger.warning(f"Could not compile {self.model_type} model: {e}. Using sklearn predict.")
+            return None
+
+        if mismatches:
+            logger.warning(
+                f"Compiled {self.model_type} model disagrees with sklearn on {mismatches}/{len(samples)} "
+                "samples. Using sklearn predict."
+            )
+            return None
+        logger.info(
+            f"✓ Compiled {self.model_type} model: {compiled.describe()}, "
+            f"identical to sklearn on {len(samples)} samples"
+        )
+        return compiled
+
+    def build_grid(self, sfe_range=(-32, 127), ssip_range=(-32, 127), rfip_steps=33,
+                   out_of_range='fallback'):
+        """
+        Precompute a DecisionGrid of the trained model so classify() becomes an
+        array index (any model type). Agreement with the model on the training
+        rows inside the grid is logged along with memory and build time.
+        Models swapped in later (background training) get a grid with the same options.
+
+        Returns:
+            DecisionGrid.describe() dict plus 'agreement' (None without training data),
+            or None if no model is trained yet (the grid is built when one is)
+        """
+        self.grid_options = dict(sfe_range=sfe_range, ssip_range=ssip_range,
+                                 rfip_steps=rfip_steps, out_of_range=out_of_range)
+        if not self.is_trained:
+            logger.info(f"Decision grid for {self.model_type} deferred until the model is trained")
+            return None
+        state = self._state
+        grid, info = self._build_grid(state.model, state.compiled)
+        self.grid = grid
+        return info
+
+    def _build_grid(self, model, compiled):
+        """
+        Returns:
+            (DecisionGrid of model with self.grid_options, describe() dict plus 'agreement')
+        """
+        predict = compiled.predict if compiled is not None else model.predict
+        grid = DecisionGrid.build(predict, model.classes_, **self.grid_options)
+        out_of_range = self.grid_options['out_of_range']
+
+        info = grid.describe()
+        info['agreement'] = None
+        if os.path.exists(self.data_path):
+            X = load_training_data(self.data_path)[0]
+            labels, on_grid = grid.lookup_batch(X)
+            if on_grid.any():
+                info['agreement'] = float(np.mean(labels[on_grid] == predict(X[on_grid])))
+            grid.stats = {'hits': 0, 'out_of_range': 0}
+
+        agreement = f"{info['agreement'] * 100:.2f}%" if info['agreement'] is not None else "n/a"
+        logger.info(
+            f"✓ Decision grid for {self.model_type}: shape={info['shape']} "
+            f"({info['bytes'] / 1024:.0f} KiB) built in {info['build_seconds']:.2f}s, "
+            f"agreement with model on training rows: {agreement}, out of range: {out_of_range}"
+        )
+        return grid, info
+
+    def enable_cascade(self, min_agreement=1.0):
+        """
+        Put a CascadeClassifier in front of the model: boxes calibrated on the
+        training data answer the unambiguous vectors, the rest go to the model
+        (grid / compiled / sklearn as before). Models swapped in later are
+        calibrated too.
+
+        Args:
+            min_agreement: Drop a rule box whose random probes agree with the model less than this
+
+        Returns:
+            The cascade, or None if no model is trained yet (calibrated when one is)
+            or it could not be calibrated
+        """
+        self.cascade_options = dict(min_agreement=min_agreement)
+        if not self.is_trained:
+            logger.info(f"Cascade for {self.model_type} deferred until the model is trained")
+            return None
+        state = self._state
+        cascade = self._build_cascade(state.model, state.compiled)
+        self._state = state.replace(cascade=cascade)
+        return cascade
+
+    def _build_cascade(self, model, compiled):
+        """CascadeClassifier calibrated against model on the training data, or None"""
+        if not os.path.exists(self.data_path):
+            logger.warning(f"Cascade disabled: training data {self.data_path} not found")
+            return None
+        X, y = load_training_data(self.data_path)
+        predict = compiled.predict if compiled is not None else model.predict
+        try:
+            cascade = CascadeClassifier.calibrate(predict, model.classes_, X, y, **self.cascade_options)
+        except ValueError as e:
+            logger.warning(f"Cascade disabled: {e}")
+            return None
+
+        info = cascade.calibration
+        for name in info['dropped']:
+            logger.warning(
+                f"Cascade {name} rule disabled for {self.model_type}: agreement with the model on random "
+                f"vectors inside the box {info[f'{name}_agreement'] * 100:.2f}% < "
+                f"{self.cascade_options['min_agreement'] * 100:.2f}% after {info[f'{name}_rounds']} rounds"
+            )
+        agreement = f"{info['probe_agreement'] * 100:.2f}%" if info['probe_agreement'] is not None else "n/a"
+        logger.info(
+            f"✓ Cascade for {self.model_type}: {cascade.describe()} - rules cover "
+            f"{(info['benign_coverage'] + info['attack_coverage']) * 100:.1f}% of training rows, "
+            f"agreement with model on random vectors inside the boxes: {agreement} "
+            f"(calibrated in {info['seconds']:.2f}s)"
+        )
+        return cascade
+
+    def get_cascade_stats(self):
+        """Per-stage hits, hit rates and latency of the active cascade (None without one)"""
+        cascade = self._state.cascade
+        return cascade.get_stats() if cascade is not None else None
+
+    def partial_fit(self, X, y, batch_size=None):
+        """
+        Absorb new labelled rows into a copy of the active model (naive_bayes / sgd),
+        then swap it in like a reload - the model classify() is using is never
+        mutated. Call from a worker thread: grid / cascade are rebuilt for the copy.
+
+        Args:
+            X, y: Labelled feature vectors
+            batch_size: Apply in mini-batches of this many rows (None = one update)
+
+        Returns:
+            True if the updated model is active, False if the update failed
+
+        Raises:
+            ValueError: the model type is not incremental or no model is trained
+        """
+        if self.model_type not in INCREMENTAL_MODELS:
+            raise ValueError(f"{self.model_type} does not support incremental updates "
+                             f"(use one of {', '.join(INCREMENTAL_MODELS)})")
+        if not self.is_trained:
+            raise ValueError("No trained model to update")
+        X = np.asarray(X, dtype=np.float64).reshape(-1, 3)
+        y = np.asarray(y).astype(self._state.model.classes_.dtype)
+        if not len(X):
+            return True
+        step = batch_size or len(X)
+
+        # A reload swapped in meanwhile would be overwritten: apply the rows to it instead
+        for _ in range(3):
+            base = self._state
+            model = copy.deepcopy(base.model)
+            try:
+                for start in range(0, len(X), step):
+                    partial_fit_model(model, X[start:start + step], y[start:start + step])
+                state = self._prepare_state(model, base.meta)
+                self._warm(state)
+            except Exception as e:
+                logger.error(f"Incremental update of {self.model_type} failed: {e}")
+                return False
+            with self._swap_lock:
+                if self._state is not base:
+                    continue
+                self._previous_state = base
+                self._state = state
+                self.swap_count += 1
+                self.update_count += 1
+                self.update_rows += len(X)
+            logger.info(f"✓ {self.model_type} model updated with {len(X)} labelled rows "
+                        f"({self.update_rows} since start)")
+            return True
+        logger.warning(f"Incremental update of {self.model_type} skipped: model kept being replaced")
+        return False
+
+    def checkpoint(self, extra=None):
+        """
+        Save the active model to ml_model_<type>.pkl (not picked up again by this
+        detector's watcher; other processes watching the file reload it)
+
+        Args:
+            extra: Additional sidecar metadata (see save_artifact)
+        """
+        state = self._state
+        meta = save_artifact(state.model, self.model_file, self.model_type, data_path=self.data_path,
+                             extra=extra)
+        with self._swap_lock:
+            if self._state is state:
+                self._state = state.replace(meta=meta)
+            self._loaded_signature = self._artifact_signature()
+        logger.info(f"✓ Checkpointed {self.model_type} model to {self.model_file}")
+        return meta
 
     def _create_default_model(self):
         """Create model instance based on type"""
-        if self.model_type == 'svm':
-            self.model = svm.SVC(kernel='rbf', gamma='scale')
-        elif self.model_type == 'decision_tree':
-            self.model = tree.DecisionTreeClassifier()
-        elif self.model_type == 'random_forest':
-            self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        elif self.model_type == 'naive_bayes':
-            self.model = GaussianNB()
-        else:
-            raise ValueError(f"Unknown model type: {self.model_type}")
+        self.model = create_model(self.model_type)
 
     def train(self, data_path):
         """
@@ -100,46 +742,24 @@ class MLDetector:
             data_path: Path to CSV file with format: sfe, ssip, rfip, label
         """
         try:
-            # Load trực tiếp giống tác giả: numpy.loadtxt với dtype='str'
-            # Skip header nếu có (dòng đầu chứa 'sfe,ssip,rfip,label')
-            data = np.loadtxt(open(data_path, 'rb'), delimiter=',', dtype='str', skiprows=1)
-            
-            # Kiểm tra số lượng class (y vẫn là string)
-            unique_labels = np.unique(data[:, 3])
-            num_classes = len(unique_labels)
-            
-            if num_classes < 2:
-                from collections import Counter
-                label_counts = Counter(data[:, 3])
-                raise ValueError(
-                    f"Dataset chỉ có {num_classes} class (cần ít nhất 2 class để train model). "
-                    f"Phân bố label: {dict(label_counts)}. "
-                    f"Vui lòng thu thập thêm dữ liệu: "
-                    f"chạy với APP_TYPE=0 TEST_TYPE=0 để thu thập normal traffic (label=0), "
-                    f"và APP_TYPE=0 TEST_TYPE=1 để thu thập attack traffic (label=1)."
-                )
-            
-            # Create model
-            self._create_default_model()
+            # Typed arrays (float32 features, int8 labels) from the shared cached loader
+            X, y = load_training_data(data_path)
 
-            # Train trực tiếp giống tác giả: sklearn tự convert string sang numeric
-            X = data[:, 0:3]
-            y = data[:, 3]
-            
-            # Naive Bayes cần convert sang numeric trước (các model khác sklearn tự convert)
-            if self.model_type == 'naive_bayes':
-                X = X.astype(float)
-                y = y.astype(int)
-            
-                self.model.fit(X, y)
+            # Create model (replaces the compiled copy / grid of the previous model)
+            model = create_model(self.model_type)
+            info = fit_model(model, X, y, dedup=self.dedup)
+            self.model = model
 
             self.is_trained = True
-            logger.info(f"✓ Model trained successfully with {len(X)} samples")
+            logger.info(f"✓ Model trained successfully with {info['rows']} samples in {info['fit_seconds']:.2f}s")
+            if self.dedup:
+                logger.info(f"  (fit on {info['fit_rows']} unique weighted rows, "
+                            f"{info['rows'] / max(info['fit_rows'], 1):.1f}x compression)")
             
-            # Save model (không cần threshold)
-            model_file = os.path.join(self.model_dir, f'ml_model_{self.model_type}.pkl')
-            joblib.dump(self.model, model_file)
-            logger.info(f"✓ Model saved to {model_file}")
+            # Save model + metadata sidecar (không cần threshold)
+            self.artifact_meta = save_artifact(self.model, self.model_file, self.model_type, data_path=data_path)
+            self._loaded_signature = self._artifact_signature()
+            logger.info(f"✓ Model saved to {self.model_file}")
             
             return True
             
@@ -158,11 +778,29 @@ class MLDetector:
             prediction array (giống tác giả gốc)
         """
         if not self.is_trained:
-            logger.warning("Warning: Model not trained. Using default classification.")
+            self._warn_fallback()
             sfe, ssip, rfip = features
             if sfe > 50 or ssip > 30:
                 return ['1']
             return ['0']
+
+        state = self._state
+        if not self._first_verdict_logged:
+            self._log_first_verdict()
+
+        if state.cascade is not None:
+            return state.cascade.classify(features, lambda f: self._classify_model(state, f))
+        return self._classify_model(state, features)
+
+    def _classify_model(self, state, features):
+        """Model stage of classify(): grid, compiled copy or sklearn"""
+        if state.grid is not None:
+            label = state.grid.lookup(features)
+            if label is not None:
+                return [label]
+
+        if state.compiled is not None:
+            return [state.compiled.predict_one(features)]
         
         # Prepare input giống tác giả gốc
         fparams = np.zeros((1, 3))
@@ -171,7 +809,7 @@ class MLDetector:
         fparams[:, 2] = features[2]  # rfip
         
         # Predict trực tiếp giống tác giả - KHÔNG CÓ threshold, KHÔNG CÓ confidence
-        prediction = self.model.predict(fparams)
+        prediction = state.model.predict(fparams)
         
         logger.debug(
             f"ML Detection: Features={features}, Prediction={prediction}"
@@ -179,6 +817,62 @@ class MLDetector:
         
         return prediction
 
+    def _warn_fallback(self):
+        if not self._fallback_warned:
+            self._fallback_warned = True
+            logger.warning("Warning: Model not trained. Using default classification.")
+
+    def _log_first_verdict(self):
+        self._first_verdict_logged = True
+        logger.info(
+            f"⏱ First ML verdict ({self.model_type}) {time.time() - self._started_at:.2f}s after detector start"
+        )
+
+    def classify_batch(self, features):
+        """
+        Classify many feature vectors in one vectorized predict call
+
+        Args:
+            features: sequence / (n, 3) array of [sfe, ssip, rfip]
+
+        Returns:
+            prediction array of length n (same values as classify() per row)
+        """
+        X = np.asarray(features, dtype=np.float64).reshape(-1, 3)
+        if len(X) == 0:
+            return np.empty(0)
+
+        if not self.is_trained:
+            self._warn_fallback()
+            return np.where((X[:, 0] > 50) | (X[:, 1] > 30), '1', '0')
+
+        state = self._state
+        if not self._first_verdict_logged:
+            self._log_first_verdict()
+
+        if state.cascade is not None:
+            prediction = state.cascade.classify_batch(X, lambda rows: self._classify_model_batch(state, rows))
+        else:
+            prediction = self._classify_model_batch(state, X)
+
+        logger.debug(
+            f"ML Detection (batch of {len(X)}): Predictions={prediction}"
+        )
+
+        return prediction
+
+    def _classify_model_batch(self, state, X):
+        """Model stage of classify_batch(): grid lookup with predict() for the misses"""
+        predict = state.compiled.predict if state.compiled is not None else state.model.predict
+        if state.grid is not None:
+            prediction, on_grid = state.grid.lookup_batch(X)
+            if not on_grid.all():
+                prediction = prediction.copy()
+                prediction[~on_grid] = predict(X[~on_grid])
+        else:
+            prediction = predict(X)
+        return prediction
+
     def get_feature_importance(self):
         """Get feature importance (for tree-based models)"""
         if hasattr(self.model, 'feature_importances_'):
@@ -188,24 +882,51 @@ class MLDetector:
         return None
 
     def save_model(self, filepath):
-        """Save model to file"""
+        """Save model to file (with metadata sidecar, see model_artifact)"""
         if not os.path.isabs(filepath):
             filepath = os.path.join(self.model_dir, filepath)
-        joblib.dump(self.model, filepath)
+        self.artifact_meta = save_artifact(self.model, filepath, self.model_type, data_path=self.data_path)
         print(f"✓ Model saved to {filepath}")
 
-    def load_model(self, filepath):
-        """Load model from file"""
+    def load_model(self, filepath, mmap=True):
+        """
+        Load model from file: checks the metadata sidecar (schema, checksum,
+        sklearn version) and memory-maps the stored arrays
+
+        Raises:
+            ArtifactError: the artifact is corrupt or incompatible
+        """
         if not os.path.isabs(filepath):
             filepath = os.path.join(self.model_dir, filepath)
-        obj = joblib.load(filepath)
-        if isinstance(obj, dict) and "model" in obj:
-            # Backward compatibility: old format có threshold
-            self.model = obj["model"]
-        else:
-            self.model = obj
+        model, meta, seconds = load_artifact(filepath, mmap=mmap, model_type=self.model_type)
+        self._state = _ModelState(model, meta=meta)
+        self.load_seconds = seconds
         self.is_trained = True
-        logger.info(f"✓ Model loaded from {filepath}")
+        if filepath == self.model_file:
+            self._loaded_signature = self._artifact_signature()
+
+        details = "legacy artifact, no metadata"
+        if meta is not None:
+            details = f"sklearn {meta.get('sklearn_version')}, created {meta.get('created_at')}"
+            data_sha = meta.get('data_sha256')
+            if data_sha and os.path.exists(self.data_path) and file_sha256(self.data_path) != data_sha:
+                logger.info(f"Training data {self.data_path} changed since this model was built")
+        logger.info(
+            f"✓ Model loaded from {filepath} in {seconds * 1000:.1f} ms "
+            f"({'mmap' if mmap else 'in-memory'}, {details})"
+        )
+
+
+def train_model_artifact(model_type, data_path, model_dir, dedup=True):
+    """
+    Worker-process entry point for background training: train model_type from
+    data_path and save ml_model_<type>.pkl (+ metadata) into model_dir
+    """
+    detector = MLDetector(model_type=model_type, model_path=data_path, compiled=False,
+                          model_dir=model_dir, dedup=dedup)
+    if not detector.is_trained:
+        raise RuntimeError(f"Training {model_type} from {data_path} failed")
+    return os.path.join(model_dir, f'ml_model_{model_type}.pkl')
 
 
 if __name__ == "__main__":
@@ -214,17 +935,17 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description='Train ML models for DDoS detection')
     parser.add_argument('--model', type=str, default='decision_tree', 
-                        choices=['decision_tree', 'random_forest', 'svm', 'naive_bayes'],
+                        choices=SUPPORTED_MODELS,
                         help='Model type to train')
     parser.add_argument('--data', type=str, default=DEFAULT_DATA_PATH,
                         help='Path to training data CSV')
     parser.add_argument('--force', action='store_true',
                         help='Force retrain even if model exists')
     parser.add_argument('--all', action='store_true', help='Train/save all supported models')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for --all (default: one per model, at most the CPU count)')
     args = parser.parse_args()
 
-    SUPPORTED_MODELS = ['decision_tree', 'random_forest', 'svm', 'naive_bayes']
-
     def process_model(model_type, args):
         print(f"\n=== Processing model: {model_type} ===")
         try:
@@ -251,11 +972,16 @@ if __name__ == "__main__":
         return True
 
     if args.all:
+        # Concurrent training + JSON summary (see training_orchestrator)
+        try:
+            from ryu_app.training_orchestrator import train_all, print_summary
+        except ImportError:
+            from training_orchestrator import train_all, print_summary
+
         print("Training all supported models...")
-        success_count = 0
-        for model in SUPPORTED_MODELS:
-            if process_model(model, args):
-                success_count += 1
+        summary = train_all(args.data, force=args.force, workers=args.workers)
+        print_summary(summary)
+        success_count = sum(1 for r in summary['models'] if r['status'] != 'failed')
         print(f"\n✓ Successfully trained {success_count}/{len(SUPPORTED_MODELS)} models")
     else:
         process_model(args.model, args)
@@ -0,0 +1,151 @@
+"""
+Model Artifacts
+A trained model is stored as an uncompressed joblib file (ml_model_<type>.pkl)
+plus a JSON metadata sidecar (ml_model_<type>.pkl.meta.json):
+
+    format_version   sidecar layout version
+    model_type       'decision_tree', 'random_forest', 'svm', 'naive_bayes', 'svm_approx'
+    schema / schema_hash
+                     feature columns the model expects (hash of FEATURE_SCHEMA)
+    data_sha256      hash of the training CSV (None if unknown)
+    sklearn_version  version the model was fitted with
+    created_at       UTC creation time (ISO 8601)
+    sha256 / bytes   integrity check of the .pkl file
+
+Uncompressed joblib files store numpy arrays raw, so they can be loaded with
+mmap_mode='r'. Controller processes on one host then share a single copy of
+array-backed weights (SVC support vectors and dual coefficients, NB means and
+variances) through the page cache instead of each holding its own copy.
+"""
+import datetime
+import hashlib
+import json
+import os
+import time
+import logging
+
+import joblib
+import sklearn
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+META_SUFFIX = '.meta.json'
+
+# Input layout every detector model is trained on (order matters)
+FEATURE_SCHEMA = {'features': ['sfe', 'ssip', 'rfip'], 'label': 'label', 'dtype': 'float64'}
+
+
+class ArtifactError(Exception):
+    """Model artifact is corrupt or incompatible with this detector"""
+
+
+def schema_hash(schema=None):
+    payload = json.dumps(schema or FEATURE_SCHEMA, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def meta_path(path):
+    return path + META_SUFFIX
+
+
+def save_artifact(model, path, model_type, data_path=None, extra=None):
+    """
+    Dump model to path (uncompressed, mmap-able) and write its metadata sidecar
+
+    Args:
+        extra: Additional metadata entries stored with the model (e.g. the online
+            learner's feedback position)
+
+    Returns:
+        The metadata dict
+    """
+    # Write to a temp file first so a crash never leaves a half-written model in place
+    tmp = path + '.tmp'
+    joblib.dump(model, tmp)
+    os.replace(tmp, path)
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'model_type': model_type,
+        'model_class': type(model).__name__,
+        'schema': FEATURE_SCHEMA,
+        'schema_hash': schema_hash(),
+        'data_sha256': file_sha256(data_path) if data_path and os.path.exists(data_path) else None,
+        'sklearn_version': sklearn.__version__,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'sha256': file_sha256(path),
+        'bytes': os.path.getsize(path),
+    }
+    if extra:
+        meta.update(extra)
+    tmp = meta_path(path) + '.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(tmp, meta_path(path))
+    return meta
+
+
+def read_meta(path):
+    """Sidecar metadata of an artifact (None for legacy .pkl files without one)"""
+    try:
+        with open(meta_path(path)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        raise ArtifactError(f"Unreadable metadata {meta_path(path)}: {e}")
+
+
+def load_artifact(path, mmap=True, verify=True, model_type=None):
+    """
+    Load a model artifact
+
+    Args:
+        path: .pkl file
+        mmap: Memory-map the stored numpy arrays (read-only, shared between processes)
+        verify: Check the sha256 recorded in the sidecar
+        model_type: Expected model type (checked when the sidecar has one)
+
+    Returns:
+        (model, meta or None for legacy files, load seconds)
+
+    Raises:
+        ArtifactError: checksum, schema or model type mismatch
+    """
+    start = time.perf_counter()
+    meta = read_meta(path)
+    if meta is None:
+        logger.warning(f"No metadata sidecar for {path} (legacy artifact): skipping integrity checks")
+    else:
+        if meta.get('schema_hash') != schema_hash():
+            raise ArtifactError(
+                f"{path} was trained on feature schema {meta.get('schema')}, expected {FEATURE_SCHEMA}"
+            )
+        if model_type and meta.get('model_type') not in (None, model_type):
+            raise ArtifactError(f"{path} holds a {meta.get('model_type')} model, expected {model_type}")
+        if verify and file_sha256(path) != meta.get('sha256'):
+            raise ArtifactError(f"Checksum mismatch for {path}: file is corrupt or was replaced")
+        if meta.get('sklearn_version') != sklearn.__version__:
+            logger.warning(
+                f"{path} was created with scikit-learn {meta.get('sklearn_version')}, "
+                f"running {sklearn.__version__}"
+            )
+
+    try:
+        obj = joblib.load(path, mmap_mode='r' if mmap else None)
+    except Exception as e:
+        raise ArtifactError(f"Cannot unpickle {path}: {e}")
+    if isinstance(obj, dict) and "model" in obj:
+        # Backward compatibility: old format có threshold
+        obj = obj["model"]
+    return obj, meta, time.perf_counter() - start
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Model Compaction Sweep
+Measures how much tree capacity the 3-feature problem needs: sweeps tree count,
+max depth and leaf size for decision_tree / random_forest, and records for
+each configuration the test accuracy, pickle size and per-call inference
+latency (sklearn and the compiled path the controller uses).
+
+Prints the configurations with their Pareto front (accuracy up, size and
+compiled latency down), then refits the smallest configuration whose accuracy
+is within --tolerance of the shipped configuration on the full dataset and
+saves it as the deployable ml_model_<type>.pkl (a running controller picks it
+up through hot reload).
+
+Usage:
+    python3 ryu_app/model_compaction.py --model random_forest --tolerance 0.005
+"""
+import itertools
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ryu_app.compiled_model import CompiledTreeModel
+from ryu_app.dataset import load_training_data
+from ryu_app.ml_detector import BASE_DIR, DEFAULT_DATA_PATH, fit_model
+from ryu_app.model_artifact import save_artifact
+
+
+# Sweep grids (None = unbounded depth); SHIPPED is what ml_detector.create_model deploys
+SWEEP = {
+    'decision_tree': {
+        'max_depth': [2, 3, 4, 6, 8, None],
+        'min_samples_leaf': [1, 5, 20],
+    },
+    'random_forest': {
+        'n_estimators': [5, 10, 25, 50, 100],
+        'max_depth': [3, 6, None],
+        'min_samples_leaf': [1, 5],
+    },
+}
+SHIPPED = {
+    'decision_tree': {'max_depth': None, 'min_samples_leaf': 1},
+    'random_forest': {'n_estimators': 100, 'max_depth': None, 'min_samples_leaf': 1},
+}
+
+
+def build(model_type, params):
+    """Untrained estimator of model_type with params (fixed seeds for reproducible sweeps)"""
+    if model_type == 'decision_tree':
+        return DecisionTreeClassifier(random_state=0, **params)
+    if model_type == 'random_forest':
+        return RandomForestClassifier(random_state=42, **params)
+    raise ValueError(f"Compaction supports decision_tree and random_forest, not {model_type}")
+
+
+def candidate_params(model_type):
+    grid = SWEEP[model_type]
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _median_call_us(fn, rows):
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1e6
+
+
+def evaluate(model, X_test, y_test, calls=200, seed=0):
+    """Accuracy, pickle size and median single-call latency (sklearn and compiled) of a fitted model"""
+    compiled = CompiledTreeModel.from_sklearn(model)
+    rows = X_test[np.random.default_rng(seed).integers(0, len(X_test), calls)]
+    return {
+        'accuracy': float(np.mean(model.predict(X_test) == y_test)),
+        'bytes': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+        'nodes': compiled.n_nodes,
+        'sklearn_us': _median_call_us(lambda r: model.predict(r.reshape(1, -1)), rows),
+        'compiled_us': _median_call_us(compiled.predict_one, rows.tolist()),
+    }
+
+
+def pareto_front(results, keys=(('accuracy', 1), ('bytes', -1), ('compiled_us', -1))):
+    """
+    Results not dominated by any other (at least as good on every key, better on one)
+
+    Args:
+        keys: (field, direction) pairs, direction 1 = higher is better, -1 = lower is better
+    """
+    def score(r):
+        return [r[k] * d for k, d in keys]
+
+    front = []
+    for r in results:
+        s = score(r)
+        dominated = any(
+            all(a >= b for a, b in zip(score(o), s)) and any(a > b for a, b in zip(score(o), s))
+            for o in results if o is not r
+        )
+        if not dominated:
+            front.append(r)
+    return front
+
+
+def select(results, reference_accuracy, tolerance):
+    """Smallest (pickle bytes, nodes, compiled latency) result within tolerance of reference_accuracy"""
+    eligible = [r for r in results if r['accuracy'] >= reference_accuracy - tolerance]
+    return min(eligible, key=lambda r: (r['bytes'], r['nodes'], r['compiled_us'])) if eligible else None
+
+
+def run_sweep(model_type, data_path=DEFAULT_DATA_PATH, tolerance=0.005, output=None, dry_run=False,
+              test_size=0.3):
+    """
+    Sweep model_type, print the table and Pareto front, save the selected model
+
+    Args:
+        tolerance: Allowed accuracy drop (absolute) vs the shipped configuration
+        output: Artifact to write (default: <ryu_app>/ml_model_<type>.pkl)
+        dry_run: Only report, do not write the artifact
+
+    Returns:
+        dict with results, pareto, reference, selected and path (None on dry_run)
+    """
+    X, y = load_training_data(data_path)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42, stratify=y)
+
+    results = []
+    for params in candidate_params(model_type):
+        model = build(model_type, params)
+        fit = fit_model(model, X_train, y_train)
+        results.append(dict(params=params, fit_seconds=fit['fit_seconds'], **evaluate(model, X_test, y_test)))
+
+    reference = next(r for r in results if r['params'] == SHIPPED[model_type])
+    front = pareto_front(results)
+    selected = select(results, reference['accuracy'], tolerance)
+
+    print("=" * 98)
+    print(f"COMPACTION SWEEP: {model_type} ({len(X_train)} train / {len(X_test)} test rows, "
+          f"tolerance {tolerance * 100:.2f}%)")
+    print("=" * 98)
+    print(f"{'params':<54} {'acc':>7} {'KiB':>8} {'nodes':>6} {'sk us':>7} {'cp us':>7}  ")
+    for r in sorted(results, key=lambda r: r['bytes']):
+        params = ', '.join(f"{k}={v}" for k, v in r['params'].items())
+        marks = ''.join(mark if hit else ' ' for mark, hit in (('P', any(r is f for f in front)),
+                                                             ('*', r is selected), ('S', r is reference)))
+        print(f"{params:<54} {r['accuracy'] * 100:6.2f}% {r['bytes'] / 1024:8.1f} {r['nodes']:>6} "
+              f"{r['sklearn_us']:7.1f} {r['compiled_us']:7.2f}  {marks}")
+    print("-" * 98)
+    print("P = Pareto front (accuracy, size, compiled latency), * = selected, S = shipped configuration")
+
+    path = None
+    if selected is not None and not dry_run:
+        # Deployable artifact: the selected configuration refit on the whole dataset
+        model = build(model_type, selected['params'])
+        fit_model(model, X, y)
+        path = output or os.path.join(BASE_DIR, f'ml_model_{model_type}.pkl')
+        save_artifact(model, path, model_type, data_path=data_path)
+        print(f"✓ Saved {model_type} {selected['params']} to {path} "
+              f"({selected['bytes'] / max(reference['bytes'], 1) * 100:.1f}% of the shipped size)")
+    elif selected is None:
+        print("No configuration within tolerance")
+    return {'results': results, 'pareto': front, 'reference': reference, 'selected': selected, 'path': path}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tree/forest capacity sweep with Pareto front')
+    parser.add_argument('--model', choices=sorted(SWEEP), default='random_forest', help='Model type to sweep')
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help='Training CSV (sfe,ssip,rfip,label)')
+    parser.add_argument('--tolerance', type=float, default=0.005,
+                        help='Allowed accuracy drop vs the shipped configuration (absolute, e.g. 0.005)')
+    parser.add_argument('--output', default=None, help='Artifact path (default: ryu_app/ml_model_<type>.pkl)')
+    parser.add_argument('--report', default=None, help='Also write all results as JSON')
+    parser.add_argument('--dry-run', action='store_true', help='Only report, do not save the selected model')
+    args = parser.parse_args()
+
+    outcome = run_sweep(args.model, args.data, tolerance=args.tolerance, output=args.output,
+                        dry_run=args.dry_run)
+    if args.report:
+        with open(args.report, 'w') as fh:
+            json.dump({k: outcome[k] for k in ('results', 'pareto', 'reference', 'selected', 'path')},
+                      fh, indent=2)
@@ -0,0 +1,223 @@
+"""
+Online Learning
+Adapts an incremental detector model (naive_bayes / sgd) to traffic drift
+without a full retrain: operator-confirmed labels are buffered and applied
+with MLDetector.partial_fit() in mini-batches on a daemon thread, and the
+updated model is checkpointed to ml_model_<type>.pkl periodically (and on
+stop), so a restarted controller - or the inference worker's hot reload -
+continues from it.
+
+Labels come from add() or from a feedback file the operator appends to, one
+confirmed vector per line:
+
+    sfe,ssip,rfip,label
+
+Lines that do not parse (e.g. a header) are skipped; the file is read from
+where the previous pass stopped (from the start again if it was truncated or
+replaced). The position up to which rows are contained in the model is saved
+in the checkpoint's metadata sidecar ('feedback': path, offset, device,
+inode), so a restarted controller resumes after them instead of applying the
+whole file again on top of the checkpoint.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+
+try:
+    from ryu_app.ml_detector import INCREMENTAL_MODELS
+except ImportError:
+    from ml_detector import INCREMENTAL_MODELS
+
+
+logger = logging.getLogger(__name__)
+
+
+class OnlineLearner:
+    """Mini-batch partial_fit of an MLDetector from confirmed labels"""
+
+    def __init__(self, detector, feedback_path=None, batch_size=32, interval=1.0,
+                 checkpoint_interval=300.0, max_pending=10000):
+        """
+        Args:
+            detector: MLDetector with an incremental model type
+            feedback_path: File of operator-confirmed 'sfe,ssip,rfip,label' lines (None = add() only)
+            batch_size: Rows per partial_fit call
+            interval: Seconds between passes (feedback file read, pending rows applied)
+            checkpoint_interval: Seconds between checkpoints of an updated model
+            max_pending: Buffered rows kept when updates fall behind (oldest dropped first)
+
+        Raises:
+            ValueError: the detector's model type does not support partial_fit
+        """
+        if detector.model_type not in INCREMENTAL_MODELS:
+            raise ValueError(f"Online learning needs one of {', '.join(INCREMENTAL_MODELS)}, "
+                             f"not {detector.model_type}")
+        self.detector = detector
+        self.feedback_path = feedback_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.checkpoint_interval = checkpoint_interval
+        self._pending = deque(maxlen=max_pending)
+        self._offset = 0
+        self._identity = None    # (st_dev, st_ino) of the feedback file _offset refers to
+        self._applied = None     # feedback position contained in the model (saved with checkpoints)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._dirty = False
+        self._last_checkpoint = time.monotonic()
+        self.stats = {'received': 0, 'applied': 0, 'updates': 0, 'failed': 0, 'dropped': 0,
+                      'bad_lines': 0, 'checkpoints': 0}
+        if feedback_path:
+            self._resume()
+
+    def _resume(self):
+        """Continue after the feedback rows the loaded checkpoint already contains"""
+        position = (self.detector.artifact_meta or {}).get('feedback')
+        if not position or position.get('path') != os.path.abspath(self.feedback_path):
+            return
+        try:
+            st = os.stat(self.feedback_path)
+        except OSError:
+            return
+        if (st.st_dev, st.st_ino) != (position['device'], position['inode']) or st.st_size < position['offset']:
+            logger.info(f"Feedback file {self.feedback_path} changed since the checkpoint, reading it from the start")
+            return
+        self._offset = position['offset']
+        self._identity = (st.st_dev, st.st_ino)
+        self._applied = position
+        logger.info(f"Online learning resumes {self.feedback_path} at byte {self._offset} (rows before it are "
+                    f"in the checkpoint)")
+
+    def add(self, features, label):
+        """Queue one confirmed (sfe, ssip, rfip) -> label row (cheap: safe on the event loop)"""
+        if len(self._pending) == self._pending.maxlen:
+            self.stats['dropped'] += 1
+        self._pending.append((tuple(features), int(label)))
+        self.stats['received'] += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'online-learning-{self.detector.model_type}',
+                                        daemon=True)
+        self._thread.start()
+        source = self.feedback_path or 'add() only'
+        logger.info(f"Online learning for {self.detector.model_type}: labels from {source}, "
+                    f"batches of {self.batch_size}, checkpoint every {self.checkpoint_interval:.0f}s")
+
+    def stop(self):
+        """Stop the thread, apply what is still pending and checkpoint"""
+        if self._thread is not None:
+            self._stop.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.step()
+        if self._dirty:
+            self.checkpoint()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.step()
+                if self._dirty and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                    self.checkpoint()
+            except Exception as e:
+                logger.error(f"Online learning pass failed: {e}")
+
+    def step(self):
+        """One pass: read new feedback lines, apply every pending row. Returns rows applied"""
+        if self.feedback_path:
+            self.read_feedback()
+        if not self._pending or not self.detector.is_trained:
+            return 0  # rows wait for the model (e.g. still training in the background)
+        position = self._position()
+        rows = [self._pending.popleft() for _ in range(len(self._pending))]
+        X = np.array([features for features, _ in rows], dtype=np.float64)
+        y = np.array([label for _, label in rows])
+        if self.detector.partial_fit(X, y, batch_size=self.batch_size):
+            if position is not None:
+                self._applied = position
+            self._dirty = True
+            self.stats['applied'] += len(rows)
+            self.stats['updates'] += 1
+            return len(rows)
+        self.stats['failed'] += len(rows)
+        return 0
+
+    def read_feedback(self):
+        """Queue the lines appended to the feedback file since the last read"""
+        try:
+            st = os.stat(self.feedback_path)
+        except OSError:
+            return 0
+        size, identity = st.st_size, (st.st_dev, st.st_ino)
+        if self._identity is not None and identity != self._identity:
+            logger.info(f"Feedback file {self.feedback_path} was replaced, reading it from the start")
+            self._offset = 0
+        elif size < self._offset:
+            logger.info(f"Feedback file {self.feedback_path} was truncated, reading it from the start")
+            self._offset = 0
+        self._identity = identity
+        if size == self._offset:
+            return 0
+
+        with open(self.feedback_path, 'rb') as fh:
+            fh.seek(self._offset)
+            data = fh.read(size - self._offset)
+        # Leave a partially written last line for the next pass
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        count = 0
+        for line in data[:end].decode('utf-8', errors='replace').splitlines():
+            if not line.strip():
+                continue
+            try:
+                sfe, ssip, rfip, label = (field.strip() for field in line.split(',')[:4])
+                row = (float(sfe), float(ssip), float(rfip))
+                label = int(float(label))
+            except ValueError:
+                self.stats['bad_lines'] += 1
+                continue
+            if label not in (0, 1):
+                self.stats['bad_lines'] += 1
+                continue
+            self.add(row, label)
+            count += 1
+        return count
+
+    def _position(self):
+        if self._identity is None:
+            return None
+        return {'path': os.path.abspath(self.feedback_path), 'offset': self._offset,
+                'device': self._identity[0], 'inode': self._identity[1]}
+
+    def checkpoint(self):
+        try:
+            self.detector.checkpoint(extra={'feedback': self._applied} if self._applied else None)
+        except Exception as e:
+            logger.error(f"Checkpoint of the online model failed: {e}")
+            return False
+        self._dirty = False
+        self._last_checkpoint = time.monotonic()
+        self.stats['checkpoints'] += 1
+        return True
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['pending'] = len(self._pending)
+        return stats
@@ -0,0 +1,198 @@
+"""
+Adaptive Flow-Stats Poll Scheduler
+Decides when each datapath is polled instead of firing requests at every
+switch at once every INTERVAL seconds.
+
+- Polls are staggered across the base interval (each dpid gets its own phase)
+- Idle switches (no new flows / sources) back off up to max_interval
+- Switches whose SFE/SSIP trend up, or whose last verdict was an attack,
+  are polled faster down to min_interval. SFE/SSIP are per-poll deltas, so
+  the trend compares them as rates per base_interval; the deltas themselves
+  are classified as they are
+- A global in-flight budget caps outstanding stats requests
+- Effective polling period and reply latency are tracked per switch
+"""
+import time
+
+
+# Golden-ratio phase spreading keeps dpids evenly staggered as switches join
+_PHASE_STEP = 0.6180339887498949
+
+
+class _SwitchSchedule:
+    def __init__(self, interval, next_due):
+        self.interval = interval
+        self.next_due = next_due
+        self.sent_at = None          # time of the outstanding request (None = idle)
+        self.last_reply = None       # time the last feature vector completed
+        self.prev_sfe = 0            # previous SFE / SSIP as rates per base interval
+        self.prev_ssip = 0
+        self.last_elapsed = None     # seconds covered by the latest feature vector
+        self.period_ema = None       # effective polling period (s)
+        self.latency_ema = None      # request -> features latency (s)
+        self.polls = 0
+        self.timeouts = 0
+
+
+class PollScheduler:
+    """Per-datapath poll timing with backoff, tightening and an in-flight budget"""
+
+    def __init__(self, base_interval=2.0, min_interval=0.5, max_interval=10.0,
+                 backoff=1.5, tighten=0.5, max_in_flight=16, reply_timeout=5.0,
+                 adaptive=True):
+        """
+        Args:
+            base_interval: Normal polling period per switch (seconds)
+            min_interval: Fastest period used while a switch looks under attack
+            max_interval: Slowest period for idle switches
+            backoff: Interval multiplier applied after an idle poll
+            tighten: Interval multiplier applied on attack / rising features
+            max_in_flight: Maximum outstanding stats requests across all switches
+            reply_timeout: Seconds after which an unanswered request is given up
+            adaptive: False keeps every switch on base_interval (staggering only)
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval if adaptive else base_interval
+        self.max_interval = max_interval if adaptive else base_interval
+        self.backoff = backoff
+        self.tighten = tighten
+        self.max_in_flight = max_in_flight
+        self.reply_timeout = reply_timeout
+        self.adaptive = adaptive
+        self.switches = {}
+        self._phase = 0.0
+        self.budget_deferrals = 0
+
+    def add(self, dpid, now=None):
+        """Register a switch; its first poll is staggered within one base interval"""
+        now = time.time() if now is None else now
+        if dpid in self.switches:
+            return
+        self._phase = (self._phase + _PHASE_STEP) % 1.0
+        self.switches[dpid] = _SwitchSchedule(self.base_interval,
+                                              now + self._phase * self.base_interval)
+
+    def remove(self, dpid):
+        self.switches.pop(dpid, None)
+
+    def in_flight(self):
+        return sum(1 for sched in self.switches.values() if sched.sent_at is not None)
+
+    def due(self, now=None):
+        """
+        Return the dpids to poll now (earliest first) and mark them in flight.
+        Switches beyond the in-flight budget stay due for the next call.
+        """
+        now = time.time() if now is None else now
+        budget = self.max_in_flight
+        for sched in self.switches.values():
+            if sched.sent_at is not None:
+                if now - sched.sent_at >= self.reply_timeout:
+                    # Reply lost: release the slot and poll again on the next turn
+                    sched.sent_at = None
+                    sched.timeouts += 1
+                else:
+                    budget -= 1
+
+        ready = sorted((sched.next_due, dpid) for dpid, sched in self.switches.items()
+                       if sched.sent_at is None and sched.next_due <= now)
+        if len(ready) > budget:
+            self.budget_deferrals += len(ready) - max(budget, 0)
+            ready = ready[:max(budget, 0)]
+
+        selected = []
+        for _, dpid in ready:
+            sched = self.switches[dpid]
+            sched.sent_at = now
+            sched.next_due = now + sched.interval
+            sched.polls += 1
+            selected.append(dpid)
+        return selected
+
+    def next_due(self):
+        """Time the earliest idle switch is due (None if every switch is in flight)"""
+        idle = [sched.next_due for sched in self.switches.values() if sched.sent_at is None]
+        return min(idle) if idle else None
+
+    def next_wakeup(self, now=None, max_sleep=1.0, min_sleep=0.05):
+        """Seconds until the earliest switch is due (clamped to [min_sleep, max_sleep])"""
+        now = time.time() if now is None else now
+        next_due = self.next_due()
+        if next_due is None:
+            return max_sleep
+        return min(max(next_due - now, min_sleep), max_sleep)
+
+    def record_reply(self, dpid, now=None):
+        """
+        A feature vector for dpid completed (reply received or computed locally)
+
+        Returns:
+            Seconds since the previous completed vector of this switch (None on the first)
+        """
+        now = time.time() if now is None else now
+        sched = self.switches.get(dpid)
+        if sched is None:
+            return None
+
+        if sched.sent_at is not None:
+            sched.latency_ema = self._ema(sched.latency_ema, now - sched.sent_at)
+            sched.sent_at = None
+
+        elapsed = None
+        if sched.last_reply is not None:
+            elapsed = now - sched.last_reply
+            sched.period_ema = self._ema(sched.period_ema, elapsed)
+        sched.last_reply = now
+        sched.last_elapsed = elapsed
+        return elapsed
+
+    def adapt(self, dpid, sfe, ssip, attack=False):
+        """
+        Adjust the polling interval of dpid from its latest features/verdict
+
+        Args:
+            sfe, ssip: Raw per-poll deltas of the vector record_reply() completed
+        """
+        sched = self.switches.get(dpid)
+        if sched is None:
+            return
+        # Compare polls of different lengths as rates; a short poll (e.g. a delayed reply
+        # followed by a prompt one) is counted as min_interval so noise is not blown up
+        if sched.last_elapsed:
+            scale = self.base_interval / max(sched.last_elapsed, self.min_interval)
+            sfe, ssip = sfe * scale, ssip * scale
+        rising = (sfe > sched.prev_sfe or ssip > sched.prev_ssip) and (sfe > 0 or ssip > 0)
+        sched.prev_sfe, sched.prev_ssip = sfe, ssip
+        if not self.adaptive:
+            return
+
+        if attack or rising:
+            interval = sched.interval * self.tighten
+        elif sfe <= 0 and ssip <= 0:
+            interval = sched.interval * self.backoff
+        else:
+            interval = self.base_interval
+        interval = min(max(interval, self.min_interval), self.max_interval)
+
+        if interval < sched.interval:
+            # Pull the next poll in right away instead of waiting out the old interval
+            sched.next_due = min(sched.next_due, (sched.last_reply or time.time()) + interval)
+        sched.interval = interval
+
+    @staticmethod
+    def _ema(previous, value, alpha=0.2):
+        return value if previous is None else (1 - alpha) * previous + alpha * value
+
+    def get_stats(self):
+        """Per-switch interval, effective period and reply latency"""
+        return {
+            dpid: {
+                'interval': sched.interval,
+                'effective_period': sched.period_ema,
+                'reply_latency_ms': sched.latency_ema * 1000 if sched.latency_ema is not None else None,
+                'in_flight': sched.sent_at is not None,
+                'polls': sched.polls,
+                'timeouts': sched.timeouts,
+            }
+            for dpid, sched in self.switches.items()
+        }
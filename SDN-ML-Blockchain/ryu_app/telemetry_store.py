@@ -0,0 +1,353 @@
+"""
+Columnar Telemetry Store
+Append-only binary store for the per-switch feature time series (one row per
+feature tick: epoch time, dpid, SFE/SSIP/RFIP, flow count, label).
+
+Layout (one directory per segment, one raw little-endian file per column):
+
+    data/telemetry/
+        seg-000001/
+            meta.json       schema, committed row count, first/last timestamp
+            ts.bin          float64 epoch seconds
+            dpid.bin        uint64
+            sfe.bin         float32
+            ...
+
+Rows are buffered in fixed-size typed chunks and appended column by column
+when a chunk fills up (or on flush). meta.json is rewritten atomically after
+the column files, so a reader only ever sees committed rows; if a chunk fails
+partway, every column is truncated back to the committed row count (or, if
+that fails too, the segment is sealed and the next chunk starts a new one),
+so the columns never go out of alignment. A segment is sealed and a new one
+started once it reaches segment_bytes or segment_seconds.
+
+With background=True, full chunks are handed to a writer thread (same
+pattern as csv_writer), so append() and flush() never touch the disk on the
+caller's thread.
+
+Readers memory-map the column files (np.memmap), so millions of ticks load
+without any text parsing.
+"""
+import json
+import os
+import queue
+import threading
+import time
+import logging
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# (column, dtype) in on-disk order
+SCHEMA = (
+    ('ts', '<f8'),          # epoch seconds
+    ('dpid', '<u8'),
+    ('sfe', '<f4'),
+    ('ssip', '<f4'),
+    ('rfip', '<f4'),
+    ('flow_count', '<u4'),
+    ('label', 'i1'),        # 0 = normal, 1 = attack
+    ('mode', 'i1'),         # APP_TYPE of the controller: 0 = collection, 1 = detection
+)
+COLUMNS = tuple(name for name, _ in SCHEMA)
+ROW_BYTES = sum(np.dtype(dtype).itemsize for _, dtype in SCHEMA)
+
+META_FILE = 'meta.json'
+SEGMENT_PREFIX = 'seg-'
+
+
+def default_root():
+    """data/telemetry of the project"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(base_dir, '..', 'data', 'telemetry'))
+
+
+def _write_meta(seg_dir, meta):
+    tmp = os.path.join(seg_dir, META_FILE + '.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, os.path.join(seg_dir, META_FILE))
+
+
+class TelemetryWriter:
+    """Buffered columnar appender with size/time based segment rotation"""
+
+    def __init__(self, root=None, chunk_rows=1024, segment_bytes=64 * 1024 * 1024,
+                 segment_seconds=3600, fsync=False, background=False):
+        """
+        Args:
+            root: Store directory (default: data/telemetry)
+            chunk_rows: Rows buffered in memory before they are appended to disk
+            segment_bytes: Seal the current segment once it holds this many bytes
+            segment_seconds: Seal the current segment once it is this old
+            fsync: fsync column files and meta on every chunk commit
+            background: Write chunks from a writer thread instead of the caller's
+        """
+        self.root = root or default_root()
+        self.chunk_rows = chunk_rows
+        self.segment_rows = max(segment_bytes // ROW_BYTES, 1)
+        self.segment_seconds = segment_seconds
+        self.fsync = fsync
+        self.background = background
+
+        self._chunk = self._new_chunk()
+        self._fill = 0
+        self._segment = None     # current segment directory
+        self._meta = None
+        self._opened_at = None
+        self._closed = False
+        self._queue = queue.Queue()
+        self._thread = None
+        self.stats = {'rows': 0, 'chunks': 0, 'segments': 0, 'errors': 0, 'rollbacks': 0}
+
+    def _new_chunk(self):
+        return {name: np.empty(self.chunk_rows, dtype=dtype) for name, dtype in SCHEMA}
+
+    def append(self, dpid, sfe, ssip, rfip, flow_count, label, mode, ts=None):
+        """Buffer one feature tick (ts defaults to now)"""
+        if self._closed:
+            raise RuntimeError("Telemetry writer is closed")
+        i = self._fill
+        chunk = self._chunk
+        chunk['ts'][i] = time.time() if ts is None else ts
+        chunk['dpid'][i] = dpid
+        chunk['sfe'][i] = sfe
+        chunk['ssip'][i] = ssip
+        chunk['rfip'][i] = rfip
+        chunk['flow_count'][i] = max(int(flow_count), 0)
+        chunk['label'][i] = label
+        chunk['mode'][i] = mode
+        self._fill = i + 1
+        if self._fill == self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered rows to the current segment and commit its meta (queued if background)"""
+        if self._fill == 0:
+            return
+        chunk, n = self._chunk, self._fill
+        self._fill = 0
+        if not self.background:
+            self._write_chunk(chunk, n)
+            return
+        # The writer thread owns the full chunk; keep filling a fresh one
+        self._chunk = self._new_chunk()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='telemetry-writer', daemon=True)
+            self._thread.start()
+        self._queue.put((chunk, n))
+
+    def wait(self, timeout=None):
+        """Block until every queued chunk is written (background mode)"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Flush buffered rows and seal the current segment"""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+        else:
+            self._seal()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            self._write_chunk(*item)
+        self._seal()
+
+    def _write_chunk(self, chunk, n):
+        try:
+            if self._segment is None or self._should_rotate(chunk['ts'][0]):
+                self._open_segment(chunk['ts'][0])
+        except OSError as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error opening telemetry segment ({n} rows lost): {e}")
+            return
+        seg_dir, meta = self._segment, self._meta
+        committed = meta['rows']
+        try:
+            for name, _ in SCHEMA:
+                with open(os.path.join(seg_dir, name + '.bin'), 'ab') as fh:
+                    chunk[name][:n].tofile(fh)
+                    if self.fsync:
+                        fh.flush()
+                        os.fsync(fh.fileno())
+            updated = dict(meta, rows=committed + n, last_ts=float(chunk['ts'][n - 1]))
+            if committed == 0:
+                updated['first_ts'] = float(chunk['ts'][0])
+            _write_meta(seg_dir, updated)
+        except OSError as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error writing telemetry chunk ({n} rows lost): {e}")
+            self._rollback(seg_dir, committed)
+            return
+        self._meta = updated
+        self.stats['rows'] += n
+        self.stats['chunks'] += 1
+
+    def _rollback(self, seg_dir, rows):
+        """Cut every column file back to the committed row count (seal the segment if impossible)"""
+        self.stats['rollbacks'] += 1
+        try:
+            for name, dtype in SCHEMA:
+                path = os.path.join(seg_dir, name + '.bin')
+                if os.path.exists(path) and os.path.getsize(path) > rows * np.dtype(dtype).itemsize:
+                    os.truncate(path, rows * np.dtype(dtype).itemsize)
+        except OSError as e:
+            logger.error(f"Could not roll back telemetry segment {seg_dir}, sealing it: {e}")
+            self._seal()
+
+    def _should_rotate(self, ts):
+        if self._meta['rows'] >= self.segment_rows:
+            return True
+        return ts - self._opened_at >= self.segment_seconds
+
+    def _open_segment(self, first_ts):
+        self._seal()
+        os.makedirs(self.root, exist_ok=True)
+        # A restarted writer never appends to an old segment: start after the last one
+        seq = 1
+        existing = _list_segments(self.root)
+        if existing:
+            seq = int(os.path.basename(existing[-1])[len(SEGMENT_PREFIX):]) + 1
+        seg_dir = os.path.join(self.root, f"{SEGMENT_PREFIX}{seq:06d}")
+        os.makedirs(seg_dir)
+        self._segment = seg_dir
+        self._opened_at = float(first_ts)
+        self._meta = {
+            'schema': [[name, dtype] for name, dtype in SCHEMA],
+            'rows': 0,
+            'first_ts': None,
+            'last_ts': None,
+            'sealed': False,
+        }
+        _write_meta(seg_dir, self._meta)
+        self.stats['segments'] += 1
+
+    def _seal(self):
+        if self._segment is None:
+            return
+        self._meta['sealed'] = True
+        try:
+            _write_meta(self._segment, self._meta)
+        except OSError as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error sealing telemetry segment {self._segment}: {e}")
+        self._segment = None
+
+
+def _list_segments(root):
+    if not os.path.isdir(root):
+        return []
+    names = sorted(n for n in os.listdir(root)
+                   if n.startswith(SEGMENT_PREFIX) and n[len(SEGMENT_PREFIX):].isdigit())
+    return [os.path.join(root, n) for n in names]
+
+
+class TelemetryReader:
+    """Memory-mapped reader over all committed segments of a store"""
+
+    def __init__(self, root=None):
+        self.root = root or default_root()
+
+    def exists(self):
+        """True if the store holds at least one segment"""
+        return bool(_list_segments(self.root))
+
+    def segments(self):
+        """[(segment directory, meta dict)] in write order"""
+        result = []
+        for seg_dir in _list_segments(self.root):
+            try:
+                with open(os.path.join(seg_dir, META_FILE)) as fh:
+                    result.append((seg_dir, json.load(fh)))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping telemetry segment {seg_dir}: {e}")
+        return result
+
+    def read_segment(self, seg_dir, meta, columns=None):
+        """
+        Map the committed rows of one segment
+
+        Returns:
+            dict column -> read-only np.memmap (zero-copy)
+        """
+        rows = meta['rows']
+        dtypes = dict(meta['schema'])
+        arrays = {}
+        for name in columns or COLUMNS:
+            if rows == 0:
+                arrays[name] = np.empty(0, dtype=dtypes[name])
+            else:
+                arrays[name] = np.memmap(os.path.join(seg_dir, name + '.bin'),
+                                         dtype=dtypes[name], mode='r', shape=(rows,))
+        return arrays
+
+    def load(self, columns=None, dpid=None, start=None, end=None):
+        """
+        Load ticks across segments
+
+        Args:
+            columns: Columns to return (default: all)
+            dpid: Only rows of this datapath
+            start, end: Epoch time range [start, end)
+
+        Returns:
+            dict column -> np.ndarray
+        """
+        columns = list(columns or COLUMNS)
+        need = set(columns)
+        if dpid is not None:
+            need.add('dpid')
+        if start is not None or end is not None:
+            need.add('ts')
+
+        parts = {name: [] for name in columns}
+        for seg_dir, meta in self.segments():
+            if meta['rows'] == 0:
+                continue
+            if start is not None and meta['last_ts'] < start:
+                continue
+            if end is not None and meta['first_ts'] >= end:
+                continue
+            arrays = self.read_segment(seg_dir, meta, [c for c in COLUMNS if c in need])
+            mask = None
+            if dpid is not None:
+                mask = arrays['dpid'] == dpid
+            if start is not None:
+                m = arrays['ts'] >= start
+                mask = m if mask is None else mask & m
+            if end is not None:
+                m = arrays['ts'] < end
+                mask = m if mask is None else mask & m
+            for name in columns:
+                parts[name].append(arrays[name] if mask is None else arrays[name][mask])
+
+        dtypes = dict(SCHEMA)
+        return {
+            name: np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=dtypes[name])
+            for name in columns
+        }
+
+    def to_dataframe(self, columns=None, **filters):
+        """load() as a pandas DataFrame (adds a datetime 'time' column when ts is loaded)"""
+        import pandas as pd
+        df = pd.DataFrame(self.load(columns=columns, **filters))
+        if 'ts' in df.columns:
+            df['time'] = pd.to_datetime(df['ts'], unit='s')
+        return df
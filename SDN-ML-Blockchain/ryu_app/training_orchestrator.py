@@ -0,0 +1,185 @@
+"""
+Training Orchestrator
+Trains every detector model type concurrently (python3 ryu_app/ml_detector.py --all):
+
+- the training CSV is parsed once (dataset.load_training_data) and handed to
+  the workers through multiprocessing.shared_memory instead of being re-parsed
+- one spawn-context worker process per model type; random forests also build
+  their trees in parallel (forest_jobs)
+- each worker saves its artifact, then measures model size and per-sample
+  inference latency (single vector and batched)
+- results go to one JSON summary (training_summary.json next to the models)
+"""
+import datetime
+import json
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+try:
+    from ryu_app.dataset import load_training_data
+    from ryu_app.model_artifact import save_artifact, load_artifact
+    from ryu_app.ml_detector import (BASE_DIR, DEFAULT_DATA_PATH, SUPPORTED_MODELS,
+                                     create_model, fit_model)
+except ImportError:
+    from dataset import load_training_data
+    from model_artifact import save_artifact, load_artifact
+    from ml_detector import BASE_DIR, DEFAULT_DATA_PATH, SUPPORTED_MODELS, create_model, fit_model
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FILE = 'training_summary.json'
+
+# Slowest first so the pool is not left waiting on it at the end
+FIT_ORDER = ['random_forest', 'svm', 'svm_approx', 'sgd', 'decision_tree', 'naive_bayes']
+
+
+def _share(X, y):
+    """Copy X and y into one shared memory block; returns (block, spec for _attach)"""
+    shm = shared_memory.SharedMemory(create=True, size=X.nbytes + y.nbytes)
+    spec = {'name': shm.name, 'arrays': {}}
+    offset = 0
+    for key, array in (('X', X), ('y', y)):
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=offset)
+        view[...] = array
+        spec['arrays'][key] = (offset, array.shape, array.dtype.str)
+        offset += array.nbytes
+    return shm, spec
+
+
+def _attach(spec):
+    """(block, X, y) views of a block created by _share (read-only)"""
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    arrays = {}
+    for key, (offset, shape, dtype) in spec['arrays'].items():
+        array = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[key] = array
+    return shm, arrays['X'], arrays['y']
+
+
+def measure_latency(model, X, calls=200, batch_size=4096, seed=0):
+    """
+    Returns:
+        (median microseconds per single-vector predict, microseconds per sample in
+        one predict of batch_size rows)
+    """
+    rng = np.random.default_rng(seed)
+    rows = X[rng.integers(0, len(X), calls)]
+    timings = []
+    for row in rows:
+        sample = row.reshape(1, -1)
+        start = time.perf_counter()
+        model.predict(sample)
+        timings.append(time.perf_counter() - start)
+
+    batch = X[rng.integers(0, len(X), batch_size)]
+    start = time.perf_counter()
+    model.predict(batch)
+    batch_seconds = time.perf_counter() - start
+    return float(np.median(timings)) * 1e6, batch_seconds / batch_size * 1e6
+
+
+def _train_one(model_type, spec, data_path, model_dir, force, dedup, n_jobs):
+    """Worker: fit (or load) one model type and measure it"""
+    result = {'model_type': model_type, 'path': os.path.join(model_dir, f'ml_model_{model_type}.pkl')}
+    shm = None
+    try:
+        shm, X, y = _attach(spec)
+        if os.path.exists(result['path']) and not force:
+            model, _, load_seconds = load_artifact(result['path'], model_type=model_type)
+            result.update(status='existing', load_seconds=load_seconds)
+        else:
+            model = create_model(model_type)
+            result.update(fit_model(model, X, y, dedup=dedup, n_jobs=n_jobs))
+            save_artifact(model, result['path'], model_type, data_path=data_path)
+            result['status'] = 'trained'
+        result['model_bytes'] = os.path.getsize(result['path'])
+        single_us, batch_us = measure_latency(model, X)
+        result.update(latency_single_us=single_us, latency_batch_us=batch_us,
+                      train_accuracy=float(np.mean(model.predict(X) == y)))
+    except Exception as e:
+        result.update(status='failed', error=str(e))
+    finally:
+        if shm is not None:
+            shm.close()
+    return result
+
+
+def train_all(data_path=DEFAULT_DATA_PATH, model_types=SUPPORTED_MODELS, model_dir=BASE_DIR,
+              workers=None, force=False, dedup=True, forest_jobs=-1, summary_path=None):
+    """
+    Train model_types concurrently and write the JSON summary
+
+    Args:
+        data_path: Training CSV
+        model_types: Model types to train (existing artifacts are kept unless force)
+        model_dir: Where ml_model_<type>.pkl files go
+        workers: Worker processes (default: one per model type, at most the CPU count)
+        forest_jobs: n_jobs for random forest construction (-1 = all cores)
+        summary_path: JSON summary file (default: <model_dir>/training_summary.json)
+
+    Returns:
+        The summary dict
+    """
+    start = time.perf_counter()
+    X, y = load_training_data(data_path)
+    load_seconds = time.perf_counter() - start
+    model_types = sorted(model_types, key=lambda m: FIT_ORDER.index(m) if m in FIT_ORDER else len(FIT_ORDER))
+    if workers is None:
+        workers = min(len(model_types), os.cpu_count() or 1)
+
+    shm, spec = _share(X, y)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [
+                pool.submit(_train_one, model_type, spec, data_path, model_dir, force, dedup,
+                            forest_jobs if model_type == 'random_forest' else None)
+                for model_type in model_types
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    summary = {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'data_path': os.path.abspath(data_path),
+        'rows': len(X),
+        'load_seconds': load_seconds,
+        'workers': workers,
+        'dedup': dedup,
+        'wall_seconds': time.perf_counter() - start,
+        'models': sorted(results, key=lambda r: SUPPORTED_MODELS.index(r['model_type'])
+                         if r['model_type'] in SUPPORTED_MODELS else len(SUPPORTED_MODELS)),
+    }
+    summary_path = summary_path or os.path.join(model_dir, SUMMARY_FILE)
+    tmp = summary_path + '.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump(summary, fh, indent=2)
+    os.replace(tmp, summary_path)
+    summary['summary_path'] = summary_path
+    return summary
+
+
+def print_summary(summary):
+    print("=" * 84)
+    print(f"TRAINING SUMMARY ({summary['rows']} rows, {summary['workers']} workers, "
+          f"{summary['wall_seconds']:.2f}s wall)")
+    print("=" * 84)
+    print(f"{'model':<15} {'status':<9} {'fit s':>7} {'KiB':>8} {'single us':>10} {'batch us':>9} {'train acc':>10}")
+    for r in summary['models']:
+        if r['status'] == 'failed':
+            print(f"{r['model_type']:<15} {'failed':<9} {r['error']}")
+            continue
+        fit = f"{r['fit_seconds']:7.2f}" if 'fit_seconds' in r else f"{'-':>7}"
+        print(f"{r['model_type']:<15} {r['status']:<9} {fit} {r['model_bytes'] / 1024:8.1f} "
+              f"{r['latency_single_us']:10.1f} {r['latency_batch_us']:9.2f} {r['train_accuracy'] * 100:9.2f}%")
+    print("-" * 84)
+    print(f"Summary written to {summary['summary_path']}")
@@ -0,0 +1,32 @@
+import os
+
+import numpy as np
+
+from ryu_app import ml_detector
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+def test_background_training_swaps_in_model(tmp_path):
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET,
+                                      background_training=True, model_dir=str(tmp_path))
+    assert detector.training_process is not None
+    if not detector.is_trained:
+        # threshold fallback while the worker trains
+        assert detector.classify([60, 0, 1.0]) == ['1']
+        assert detector.classify_batch([[0, 0, 1.0], [0, 31, 1.0]]).tolist() == ['0', '1']
+
+    assert detector.wait_until_ready(timeout=120)
+    assert detector.is_trained and detector.artifact_meta['model_type'] == 'naive_bayes'
+    assert (tmp_path / 'ml_model_naive_bayes.pkl').exists()
+    X = np.array([[1, 0, 1.0], [40, 30, 0.1]])
+    assert detector.classify_batch(X).tolist() == detector.model.predict(X).tolist()
+
+
+def test_grid_requested_before_training_is_built_on_swap(tmp_path):
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET,
+                                      background_training=True, model_dir=str(tmp_path))
+    detector.build_grid(sfe_range=(0, 16), ssip_range=(0, 16), rfip_steps=5)
+    assert detector.wait_until_ready(timeout=120)
+    assert detector.grid is not None and detector.grid.grid.shape == (17, 17, 5)
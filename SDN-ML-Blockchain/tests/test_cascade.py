@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+import pytest
+
+from ryu_app import ml_detector
+from ryu_app.cascade import CascadeClassifier
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+def _rule(X):
+    X = np.asarray(X)
+    return np.where((X[:, 0] > 5) | (X[:, 1] > 5), 1, 0)
+
+
+def test_calibrated_boxes_exclude_the_other_class():
+    X = np.array([[0, 0, 1.0], [2, 1, 1.0], [4, 3, 1.0], [3, 4, 1.0],
+                  [9, 0, 1.0], [10, 8, 0.5], [20, 20, 0.0], [-5, 0, 1.0]])
+    y = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+    cascade = CascadeClassifier.calibrate(_rule, [0, 1], X, y)
+
+    # [-5, 0, 1] is labelled attack although the model says normal, so the benign box stops at 0
+    assert cascade.benign_box == ((0, 4), (0, 4), (1, 1))
+    assert cascade.calibration['benign_coverage'] == pytest.approx(4 / 8)
+    assert cascade.calibration['probe_agreement'] == 1.0
+    assert cascade.decide([2, 2, 1.0]) == 0
+    assert cascade.decide([-5, 0, 1.0]) is None
+    assert cascade.decide([15, 10, 0.2]) == 1
+    assert cascade.decide([100, 100, 1.0]) is None
+
+    with pytest.raises(ValueError):
+        CascadeClassifier.calibrate(_rule, ['a', 'b'], X, y)
+
+
+def _island_rule(X):
+    # Attack region the training rows never touch: only random probes find it
+    X = np.asarray(X)
+    island = (abs(X[:, 0] - 2) < 0.5) & (abs(X[:, 1] - 2) < 0.5)
+    return np.where((X[:, 0] > 5) | (X[:, 1] > 5) | island, 1, 0)
+
+
+def test_boxes_shrink_until_probes_agree_with_the_model():
+    X = np.array([[0, 0, 1.0], [1, 1, 1.0], [3, 3, 1.0], [4, 4, 1.0], [4, 0, 1.0], [0, 4, 1.0],
+                  [9, 9, 0.5], [20, 20, 0.0]])
+    y = _island_rule(X)
+    cascade = CascadeClassifier.calibrate(_island_rule, [0, 1], X, y)
+    info = cascade.calibration
+    assert info['benign_rounds'] > 1 and info['dropped'] == []
+    assert info['probe_agreement'] == 1.0 and info['benign_coverage'] > 0
+    assert cascade.decide([2, 2, 1.0]) is None
+
+    P = np.random.default_rng(1).uniform(-1, 25, (20000, 3))
+    labels, decided = cascade.decide_batch(P)
+    assert np.array_equal(labels[decided], _island_rule(P[decided]))
+
+    # Not refined enough within max_rounds: the box is dropped rather than trusted
+    cascade = CascadeClassifier.calibrate(_island_rule, [0, 1], X, y, max_rounds=1)
+    assert cascade.benign_box is None and cascade.calibration['dropped'] == ['benign']
+    assert cascade.calibration['benign_coverage'] == 0
+    assert cascade.decide([1, 1, 1.0]) is None
+
+
+def test_stats_count_stage_hits():
+    cascade = CascadeClassifier(((0, 4), (0, 4), (1, 1)), ((10, 20), (8, 20), (0, 0.5)), 0, 1)
+    calls = []
+
+    def fallback(features):
+        calls.append(features)
+        return [1]
+
+    assert cascade.classify([1, 1, 1.0], fallback) == [0]
+    assert cascade.classify([12, 9, 0.2], fallback) == [1]
+    assert cascade.classify([6, 6, 1.0], fallback) == [1]
+    assert calls == [[6, 6, 1.0]]
+
+    labels = cascade.classify_batch([[1, 1, 1.0], [2, 2, 1.0], [30, 30, 0.0]], lambda rows: _rule(rows))
+    assert labels.tolist() == [0, 0, 1]
+    stats = cascade.get_stats()
+    assert stats['hits'] == {'benign_rule': 3, 'attack_rule': 1, 'model': 2}
+    assert stats['hit_rate']['benign_rule'] == pytest.approx(0.5)
+    assert set(stats['latency_us']) == {'benign_rule', 'attack_rule', 'model'}
+
+
+def test_detector_cascade_matches_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_detector, 'BASE_DIR', str(tmp_path))
+    detector = ml_detector.MLDetector(model_type='decision_tree', model_path=DATASET)
+    cascade = detector.enable_cascade()
+    assert cascade is detector.cascade
+    assert cascade.calibration['benign_coverage'] > 0.5
+
+    X = ml_detector.load_training_data(DATASET)[0].astype(np.float64)
+    expected = detector.model.predict(X)
+    assert detector.classify_batch(X).tolist() == expected.tolist()
+    assert [detector.classify(row)[0] for row in X[:200].tolist()] == expected[:200].tolist()
+
+    stats = detector.get_cascade_stats()
+    assert sum(stats['hits'].values()) == len(X) + 200
+    assert stats['hits']['benign_rule'] > stats['hits']['model']
+
+    # Reloaded models are calibrated too
+    assert detector.reload_model()
+    assert detector.cascade is not None and detector.cascade is not cascade
+
+
+@pytest.mark.parametrize('model_type', ['svm', 'sgd'])
+def test_cascade_rules_agree_with_smooth_boundaries(tmp_path, model_type):
+    detector = ml_detector.MLDetector(model_type=model_type, model_path=DATASET, model_dir=str(tmp_path))
+    cascade = detector.enable_cascade()
+    assert cascade.calibration['probe_agreement'] == 1.0
+    assert detector.cascade_options == {'min_agreement': 1.0}
+
+    # Fresh vectors inside both boxes (calibration probes used another seed)
+    rng = np.random.default_rng(7)
+    P = np.concatenate([rng.uniform([lo for lo, _ in box], [hi for _, hi in box], (10000, 3))
+                        for box in (cascade.benign_box, cascade.attack_box)])
+    labels, decided = cascade.decide_batch(P)
+    assert decided.all()
+    assert np.array_equal(labels[decided], np.asarray(detector.model.predict(P[decided])).astype(labels.dtype))
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+
+from ryu_app import ml_detector
+from ryu_app.classify_batch import ClassificationBatch
+from ryu_app.poll_scheduler import PollScheduler
+
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv')
+
+
+def test_batch_keeps_arrival_order_and_counts_flushes():
+    batch = ClassificationBatch(max_size=3, deadline=0.05)
+    assert batch.add(1, (10, 2, 0.5), 'a', now=0.0)
+    assert not batch.add(2, (0, 0, 1.0), 'b', now=0.01)
+    assert not batch.expired(now=0.04)
+    assert batch.expired(now=0.06)
+    assert not batch.full()
+
+    generation = batch.generation
+    items, X = batch.drain('deadline')
+    assert [dpid for dpid, _, _ in items] == [1, 2]
+    assert [ctx for _, _, ctx in items] == ['a', 'b']
+    assert X.shape == (2, 3) and X[0].tolist() == [10, 2, 0.5]
+    assert batch.generation == generation + 1
+    assert len(batch) == 0 and batch.drain()[0] == []
+
+    for dpid in range(3):
+        batch.add(dpid, (0, 0, 1.0))
+    assert batch.full()
+    batch.drain('size')
+    stats = batch.get_stats()
+    assert stats['batches'] == 2 and stats['vectors'] == 5 and stats['max_batch'] == 3
+    assert stats['flush_deadline'] == 1 and stats['flush_size'] == 1
+
+
+def test_staggered_switches_share_batches():
+    # Mirror mode: each due switch's vector is computed synchronously in the due() loop
+    scheduler = PollScheduler(base_interval=2.0, adaptive=False)
+    batch = ClassificationBatch(max_size=64, deadline=0.25)
+    for dpid in range(1, 11):
+        scheduler.add(dpid, now=0.0)
+
+    now, sizes, waits = 0.0, [], []
+    while now < 20.0:
+        for dpid in scheduler.due(now):
+            scheduler.record_reply(dpid, now=now)
+            batch.add(dpid, (0, 0, 1.0), now, now=now)
+            reason = batch.flush_reason(scheduler.in_flight(), scheduler.next_due(), now=now)
+            if reason:
+                items, _ = batch.drain(reason)
+                sizes.append(len(items))
+                waits.extend(now - queued for _, _, queued in items)
+        # The deadline timer fires before the next poll if that is later
+        deadline = batch._opened_at + batch.deadline if len(batch) else None
+        now = min(t for t in (scheduler.next_due(), deadline) if t is not None)
+        if deadline is not None and batch.flush_reason(now=now) == 'deadline':
+            items, _ = batch.drain('deadline')
+            sizes.append(len(items))
+            waits.extend(now - queued for _, _, queued in items)
+
+    assert max(sizes) > 1
+    assert sum(sizes) / len(sizes) > 1.5
+    assert max(waits) <= batch.deadline + 1e-9
+    stats = batch.get_stats()
+    # A batch closes as soon as no other poll can land in its window, not at the deadline
+    assert stats['flush_cycle'] == stats['batches']
+
+
+def test_flush_reason_waits_while_more_vectors_can_join():
+    batch = ClassificationBatch(max_size=2, deadline=0.25)
+    assert batch.flush_reason(now=0.0) is None
+    batch.add(1, (0, 0, 1.0), now=0.0)
+    assert batch.flush_reason(in_flight=1, now=0.1) is None
+    assert batch.flush_reason(in_flight=0, next_poll=0.2, now=0.1) is None
+    assert batch.flush_reason(in_flight=0, next_poll=0.3, now=0.1) == 'cycle'
+    assert batch.flush_reason(in_flight=0, next_poll=None, now=0.1) == 'cycle'
+    assert batch.flush_reason(in_flight=3, now=0.25) == 'deadline'
+    batch.add(2, (0, 0, 1.0), now=0.1)
+    assert batch.flush_reason(in_flight=3, now=0.1) == 'size'
+
+
+def test_classify_batch_matches_per_vector_classify(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_detector, 'BASE_DIR', str(tmp_path))
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=os.path.abspath(DATASET))
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(-20, 200, 64), rng.integers(-10, 80, 64), rng.random(64)])
+    batched = detector.classify_batch(X)
+    single = [detector.classify(list(row))[0] for row in X]
+    assert batched.tolist() == single
+
+    detector.is_trained = False
+    fallback = detector.classify_batch([[60, 0, 1.0], [0, 0, 1.0]])
+    assert fallback.tolist() == ['1', '0']
+    assert len(detector.classify_batch(np.empty((0, 3)))) == 0
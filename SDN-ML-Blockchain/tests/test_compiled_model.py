@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier
+
+from ryu_app import dataset, ml_detector
+from ryu_app.compiled_model import CompiledKernelModel, CompiledTreeModel, verification_samples
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+@pytest.fixture(scope='module')
+def training_data():
+    data = np.loadtxt(DATASET, delimiter=',', skiprows=1)
+    return data[:, 0:3], data[:, 3].astype(int)
+
+
+@pytest.mark.parametrize('model', [
+    DecisionTreeClassifier(random_state=0),
+    RandomForestClassifier(n_estimators=25, random_state=42),
+])
+def test_compiled_predictions_are_identical(model, training_data):
+    X, y = training_data
+    model.fit(X, y)
+    compiled = CompiledTreeModel.from_sklearn(model)
+
+    samples = verification_samples(model, X)
+    assert compiled.verify(model, samples) == 0
+    assert compiled.predict_one([1, 0, 1.0]) == model.predict([[1, 0, 1.0]])[0]
+
+
+def test_string_labels_and_unsupported_models(training_data):
+    X, y = training_data
+    # Models trained the original way (on string arrays) predict string labels
+    model = DecisionTreeClassifier(random_state=0).fit(X.astype(str), y.astype(str))
+    compiled = CompiledTreeModel.from_sklearn(model)
+    assert compiled.verify(model, X[:200]) == 0
+    assert compiled.predict_one([1, 0, 1.0]) in ('0', '1')
+
+    with pytest.raises(ValueError):
+        CompiledTreeModel.from_sklearn(GaussianNB().fit(X, y))
+
+
+def test_detector_switches_to_compiled_path(tmp_path, monkeypatch, training_data):
+    X, y = training_data
+    monkeypatch.setattr(ml_detector, 'BASE_DIR', str(tmp_path))
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET)
+    assert detector.compiled is None
+
+    detector.model_type = 'decision_tree'
+    detector.model = DecisionTreeClassifier(random_state=0).fit(X, y)
+    assert detector.compile_model()
+    expected = detector.model.predict(X[:50])
+    assert [detector.classify(list(row))[0] for row in X[:50]] == expected.tolist()
+    assert detector.classify_batch(X[:50]).tolist() == expected.tolist()
+
+
+def test_svm_approx_compiles_to_kernel_model(tmp_path):
+    detector = ml_detector.MLDetector(model_type='svm_approx', model_path=DATASET, model_dir=str(tmp_path))
+    assert isinstance(detector.compiled, CompiledKernelModel)
+    assert detector.compiled.n_components == 256
+
+    X = verification_samples(detector.model, dataset.load_training_data(DATASET)[0])
+    assert detector.compiled.verify(detector.model, X) == 0
+    assert detector.classify_batch(X).tolist() == detector.model.predict(X).tolist()
+    assert (detector.classify_batch(X[:2214]) == dataset.load_training_data(DATASET)[1]).mean() > 0.95
@@ -0,0 +1,47 @@
+import pytest
+
+from ryu_app.csv_writer import GroupCommitCSVWriter
+
+
+def test_rows_are_batched_with_header_once(tmp_path):
+    path = tmp_path / 'data' / 'switch_1_data.csv'
+    writer = GroupCommitCSVWriter(durability='interval', commit_interval=60)
+    header = ['time', 'sfe', 'ssip', 'rfip', 'type']
+    for i in range(50):
+        writer.write_row(str(path), ['t', i, 0, 1.0, 0], header=header)
+    assert writer.flush(timeout=5)
+
+    lines = path.read_text().splitlines()
+    assert lines[0] == 'time,sfe,ssip,rfip,type'
+    assert len(lines) == 51
+    # one group commit for the whole burst, not one fsync per row
+    assert writer.stats['fsyncs'] == 1
+    writer.close()
+
+
+def test_existing_file_keeps_header_and_every_row_syncs(tmp_path):
+    path = tmp_path / 'result.csv'
+    path.write_text('sfe,ssip,rfip,label\n')
+    writer = GroupCommitCSVWriter(durability='every-row')
+    writer.write_row(str(path), [1, 0, 1.0, 0], header=['sfe', 'ssip', 'rfip', 'label'])
+    writer.write_row(str(path), [4, 4, 1.0, 1], header=['sfe', 'ssip', 'rfip', 'label'])
+    writer.close()
+
+    assert path.read_text().splitlines() == ['sfe,ssip,rfip,label', '1,0,1.0,0', '4,4,1.0,1']
+    assert writer.stats['fsyncs'] == 2
+    with pytest.raises(RuntimeError):
+        writer.write_row(str(path), [0, 0, 1.0, 0])
+
+
+def test_no_fsync_in_none_mode(tmp_path):
+    writer = GroupCommitCSVWriter(durability='none')
+    writer.write_row(str(tmp_path / 'a.csv'), ['x'])
+    writer.write_row(str(tmp_path / 'b.csv'), ['y'])
+    writer.close()
+    assert (tmp_path / 'a.csv').read_text() == 'x\n'
+    assert writer.stats['fsyncs'] == 0
+
+
+def test_rejects_unknown_durability():
+    with pytest.raises(ValueError):
+        GroupCommitCSVWriter(durability='sometimes')
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pytest
+
+from ryu_app import dataset, ml_detector
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+def _write(path, rows):
+    path.write_text('sfe,ssip,rfip,label\n' + ''.join(f'{r}\n' for r in rows))
+
+
+def test_typed_arrays_and_cache_keying(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'result.csv'
+    _write(csv_path, ['1,0,1.0,0', '40,30,0.25,1', 'bad,row,here,x', '3,2,0.5,0'])
+
+    X, y = dataset.load_training_data(str(csv_path))
+    assert X.dtype == np.float32 and y.dtype == np.int8
+    assert X.tolist() == [[1, 0, 1.0], [40, 30, 0.25], [3, 2, 0.5]] and y.tolist() == [0, 1, 0]
+    assert os.path.exists(dataset.cache_path(str(csv_path)))
+
+    def no_parse(path):
+        raise AssertionError('CSV re-parsed')
+
+    parse = dataset._parse_csv
+    monkeypatch.setattr(dataset, '_parse_csv', no_parse)
+    assert dataset.load_training_data(str(csv_path))[1].tolist() == [0, 1, 0]
+    # new mtime, same content: hash check reuses the cache
+    os.utime(csv_path, ns=(1, 1))
+    assert dataset.load_training_data(str(csv_path))[1].tolist() == [0, 1, 0]
+
+    monkeypatch.setattr(dataset, '_parse_csv', parse)
+    _write(csv_path, ['1,0,1.0,0', '40,30,0.25,1', '3,2,0.5,1'])
+    assert dataset.load_training_data(str(csv_path))[1].tolist() == [0, 1, 1]
+
+    frame = dataset.load_training_frame(str(csv_path))
+    assert list(frame.columns) == ['sfe', 'ssip', 'rfip', 'label'] and len(frame) == 3
+    with pytest.raises(FileNotFoundError):
+        dataset.load_training_data(str(tmp_path / 'missing.csv'))
+
+
+def test_detector_fits_every_model_type(tmp_path):
+    detector = ml_detector.MLDetector(model_type='decision_tree', model_path=DATASET, model_dir=str(tmp_path))
+    assert hasattr(detector.model, 'tree_') and detector.compiled is not None
+    X, y = dataset.load_training_data(DATASET)
+    assert (detector.classify_batch(X) == y).mean() > 0.95
+
+
+def test_deduplicate_weights_and_equivalent_fit(tmp_path):
+    X = np.array([[1, 0, 1.0], [4, 4, 1.0], [1, 0, 1.0], [1, 0, 1.0], [4, 4, 1.0]], dtype=np.float32)
+    y = np.array([0, 0, 0, 1, 0], dtype=np.int8)
+    X_u, y_u, w = dataset.deduplicate(X, y)
+    assert X_u.tolist() == [[1, 0, 1.0], [4, 4, 1.0], [1, 0, 1.0]]
+    assert y_u.tolist() == [0, 0, 1] and w.tolist() == [2, 2, 1]
+
+    from sklearn import svm
+    X, y = dataset.load_training_data(DATASET)
+    full = svm.SVC(kernel='rbf', gamma='scale').fit(X, y)
+    detector = ml_detector.MLDetector(model_type='svm', model_path=DATASET, model_dir=str(tmp_path))
+    assert len(detector.model.support_vectors_) < len(full.support_vectors_)
+    assert detector.classify_batch(X).tolist() == full.predict(X).tolist()
+
+    # Pipelines: the sgd scaler gets the weights too, so it sees the full-data statistics
+    full = ml_detector.create_model('sgd')
+    ml_detector.fit_model(full, X, y, dedup=False)
+    detector = ml_detector.MLDetector(model_type='sgd', model_path=DATASET, model_dir=str(tmp_path))
+    scaler = detector.model.named_steps['scale']
+    assert np.allclose(scaler.mean_, full.named_steps['scale'].mean_)
+    assert np.allclose(scaler.scale_, full.named_steps['scale'].scale_)
+    assert (detector.classify_batch(X) == full.predict(X)).mean() > 0.99
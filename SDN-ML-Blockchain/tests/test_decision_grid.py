@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+from ryu_app import ml_detector
+from ryu_app.decision_grid import DecisionGrid
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+def _rule(X):
+    X = np.asarray(X)
+    return np.where((X[:, 0] > 5) | (X[:, 2] < 0.5), 1, 0)
+
+
+def test_grid_matches_predict_on_grid_points_and_snaps():
+    grid = DecisionGrid.build(_rule, [0, 1], sfe_range=(-4, 10), ssip_range=(0, 3), rfip_steps=5,
+                              chunk_rows=7)
+    assert grid.grid.shape == (15, 4, 5)
+    assert grid.nbytes == 15 * 4 * 5
+    assert grid.lookup([6, 0, 1.0]) == 1
+    assert grid.lookup([5, 3, 1.0]) == 0
+    assert grid.lookup([5, 3, 0.25]) == 1
+    # rescaled features snap to the nearest grid point
+    assert grid.lookup([5.4, 2.6, 0.9]) == 0
+    assert grid.lookup([5.6, 2.6, 0.9]) == 1
+
+    assert grid.lookup([11, 0, 1.0]) is None
+    assert grid.stats['out_of_range'] == 1
+
+    labels, on_grid = grid.lookup_batch([[6, 0, 1.0], [0, 0, 1.0], [0, 99, 1.0]])
+    assert on_grid.tolist() == [True, True, False]
+    assert labels[:2].tolist() == [1, 0]
+
+
+def test_clamp_policy_and_validation():
+    grid = DecisionGrid.build(_rule, [0, 1], sfe_range=(0, 10), ssip_range=(0, 3), rfip_steps=3,
+                              out_of_range='clamp')
+    assert grid.lookup([500, -20, 1.0]) == 1
+    assert grid.lookup_batch([[500, -20, 1.0]])[1].all()
+    with pytest.raises(ValueError):
+        DecisionGrid.build(_rule, [0, 1], rfip_steps=1)
+    with pytest.raises(ValueError):
+        DecisionGrid(np.array([0, 1]), np.zeros((1, 1, 2), dtype=np.int8), 0, 0, out_of_range='nearest')
+
+
+def test_detector_classifies_through_grid(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_detector, 'BASE_DIR', str(tmp_path))
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET)
+    info = detector.build_grid(sfe_range=(-16, 64), ssip_range=(-16, 64), rfip_steps=17)
+    assert info['bytes'] == 81 * 81 * 17
+    assert info['agreement'] is not None and info['agreement'] > 0.95
+
+    X = np.array([[1, 0, 1.0], [40, 30, 0.1], [3000, 2000, 0.0]])
+    expected = detector.model.predict(X)
+    assert detector.classify_batch(X).tolist() == expected.tolist()
+    assert [detector.classify(list(row))[0] for row in X] == expected.tolist()
+    assert detector.grid.stats['out_of_range'] == 2
@@ -0,0 +1,45 @@
+from ryu_app.event_queue import BlockchainEventQueue
+
+
+def _ev(event_type, switch_id='1'):
+    return {'event_type': event_type, 'switch_id': switch_id, 'timestamp': 0}
+
+
+def test_pop_batch_serves_attack_events_first():
+    q = BlockchainEventQueue(max_size=10, batch_size=3)
+    q.enqueue(_ev('normal_traffic'))
+    q.enqueue(_ev('switch_connected'))
+    q.enqueue(_ev('attack_detected'))
+    q.enqueue(_ev('port_blocked'))
+
+    batch = [event['event_type'] for _, event in q.pop_batch()]
+    assert batch == ['attack_detected', 'port_blocked', 'switch_connected']
+    assert len(q) == 1
+
+
+def test_full_queue_evicts_lower_priority_and_counts_drops():
+    q = BlockchainEventQueue(max_size=2)
+    assert q.enqueue(_ev('normal_traffic'))
+    assert q.enqueue(_ev('normal_traffic'))
+
+    # attack evicts a heartbeat, another heartbeat is dropped
+    assert q.enqueue(_ev('attack_detected'))
+    assert not q.enqueue(_ev('normal_traffic'))
+
+    stats = q.get_stats()
+    assert stats['depth'] == 2
+    assert stats['dropped'] == 2
+    assert stats['dropped_per_lane']['low'] == 2
+    assert stats['depth_per_lane']['high'] == 1
+
+
+def test_record_submit_updates_counters():
+    q = BlockchainEventQueue()
+    q.record_submit(3, 0.010, True)
+    q.record_submit(1, 0.030, False)
+
+    stats = q.get_stats()
+    assert stats['submitted'] == 3
+    assert stats['failed'] == 1
+    assert stats['batches'] == 2
+    assert stats['submit_latency_ms']['max'] == 30.0
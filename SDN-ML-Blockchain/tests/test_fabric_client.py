@@ -93,3 +93,35 @@ def test_record_event_invokes_subprocess(monkeypatch):
             except Exception:
                 continue
         assert found
+
+
+def test_record_events_submits_single_batch_transaction(monkeypatch):
+    monkeypatch.setattr(fc.shutil, 'which', lambda name: '/usr/bin/' + name)
+    client = fc.BlockchainClient(network_path='fabric-samples/test-network', use_gateway=False)
+
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        class R:
+            returncode = 0
+            stdout = ''
+            stderr = ''
+        return R()
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+
+    events = [
+        {'EventType': 'attack_detected', 'SwitchID': '1', 'Timestamp': 1620000002},
+        {'event_type': 'port_blocked', 'switch_id': '2', 'timestamp': 1620000003},
+    ]
+    assert client.record_events(events) is True
+
+    # one invoke for the whole batch
+    assert len(calls) == 1
+    cmd = calls[0]
+    parsed = json.loads(cmd[cmd.index('-c') + 1])
+    assert parsed['Args'][0] == 'RecordEvents'
+    batch = json.loads(parsed['Args'][1])
+    assert [e['event_type'] for e in batch] == ['attack_detected', 'port_blocked']
+    assert [e['switch_id'] for e in batch] == ['1', '2']
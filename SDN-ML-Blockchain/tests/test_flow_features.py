@@ -0,0 +1,90 @@
+import time
+
+from ryu_app.flow_features import FlowFeatureState
+from tools.flow_feature_benchmark import FakeFlow, legacy_features, make_flows
+
+
+def test_matches_legacy_extraction_across_intervals():
+    state = FlowFeatureState()
+    prev_flow_count = old_ssip_len = 0
+
+    for size, sources in [(50, 50), (300, 40), (10, 10), (0, None)]:
+        flows = make_flows(size, num_sources=sources, reverse_ratio=0.3, seed=size)
+        expected = legacy_features(flows, prev_flow_count, old_ssip_len)
+        assert state.compute(flows) == expected
+        prev_flow_count = len(flows)
+        old_ssip_len = len({v for f in flows for k, v in f.match.items() if k == 'ipv4_src'})
+
+
+def test_rfip_counts_each_bidirectional_pair_once():
+    flows = [
+        FakeFlow([]),
+        FakeFlow([('ipv4_src', 'a'), ('ipv4_dst', 'b')]),
+        FakeFlow([('ipv4_src', 'b'), ('ipv4_dst', 'a')]),
+        FakeFlow([('ipv4_src', 'b'), ('ipv4_dst', 'a')]),
+        FakeFlow([('ipv4_src', 'c'), ('ipv4_dst', 'a')]),
+    ]
+    sfe, ssip, rfip = FlowFeatureState().compute(flows)
+    assert (sfe, ssip) == (5, 3)
+    assert rfip == 2 / 4
+    assert legacy_features(flows) == (sfe, ssip, rfip)
+
+
+def test_streamed_segments_equal_full_dump():
+    flows = make_flows(1000, num_sources=200)
+    streamed = FlowFeatureState()
+    streamed.begin()
+    for i in range(0, len(flows), 128):
+        streamed.add_flows(flows[i:i + 128])
+    assert streamed.finish() == FlowFeatureState().compute(flows)
+
+
+def test_scales_linearly_with_flow_count():
+    small, large = make_flows(10000), make_flows(100000)
+
+    def best_time(flows):
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            FlowFeatureState().compute(flows)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    # 10x the flows must stay well below the ~100x a quadratic extraction would cost
+    assert best_time(large) < 30 * best_time(small)
+
+
+def test_interleaved_requests_are_reassembled_per_xid():
+    first, second = make_flows(200, num_sources=50, seed=1), make_flows(80, num_sources=80, seed=2)
+    state = FlowFeatureState()
+    state.begin(xid=10)
+    state.add_flows(first[:100], xid=10)
+    state.begin(xid=11)
+    state.add_flows(second[:40], xid=11)
+    state.add_flows(first[100:], xid=10)
+    state.add_flows(second[40:], xid=11)
+
+    reference = FlowFeatureState()
+    assert state.finish(xid=10) == reference.compute(first)
+    assert state.finish(xid=11) == reference.compute(second)
+    assert not state.is_pending(10) and not state.is_pending(11)
+
+
+def test_unfinished_intervals_are_bounded():
+    state = FlowFeatureState()
+    for xid in range(5):
+        state.begin(xid)
+        state.add_flows(make_flows(10), xid)
+    assert not state.is_pending(0)
+    assert state.is_pending(4)
+    assert state.discarded_intervals == 3
+
+
+def test_repeat_reports_unchanged_table():
+    state = FlowFeatureState()
+    flows = make_flows(100, num_sources=30, reverse_ratio=0.5)
+    _, _, rfip = state.compute(flows)
+    assert state.repeat() == (0, 0, rfip)
+    # history is untouched: the next real dump of the same table is also a no-op
+    assert state.compute(flows) == (0, 0, rfip)
@@ -0,0 +1,94 @@
+from ryu_app.flow_features import FlowFeatureState
+from ryu_app.flow_mirror import FlowTableMirror
+
+
+class _Match:
+    def __init__(self, fields):
+        self._fields2 = fields
+
+    def items(self):
+        return self._fields2
+
+
+class _Stats:
+    def __init__(self, cookie, priority, fields):
+        self.cookie = cookie
+        self.priority = priority
+        self.match = _Match(fields)
+
+
+def _l3(src, dst):
+    return [('eth_type', 2048), ('ipv4_src', src), ('ipv4_dst', dst)]
+
+
+def _mirror_features(mirror, state):
+    state.begin('mirror')
+    mirror.feed(state, 'mirror')
+    return state.finish('mirror')
+
+
+def test_mirror_features_match_full_dump():
+    mirror = FlowTableMirror()
+    dump = [_Stats(1, 0, [])]
+    mirror.install(1, 0, [])
+    for cookie, (src, dst) in enumerate([('a', 'b'), ('b', 'a'), ('c', 'b')], start=2):
+        mirror.install(cookie, 1, _l3(src, dst))
+        dump.append(_Stats(cookie, 1, _l3(src, dst)))
+
+    # re-adding the same priority+match replaces the entry instead of duplicating it
+    mirror.install(9, 1, list(reversed(_l3('a', 'b'))))
+    assert len(mirror) == 4
+
+    assert _mirror_features(mirror, FlowFeatureState()) == FlowFeatureState().compute(dump)
+
+    mirror.remove(1, _l3('c', 'b'))
+    assert len(mirror) == 3
+
+
+def test_hard_timeout_entries_expire():
+    mirror = FlowTableMirror()
+    mirror.install(1, 100, [('in_port', 3)], hard_timeout=60, now=1000)
+    assert mirror.expire(now=1059) == 0
+    assert mirror.expire(now=1060) == 1
+    assert len(mirror) == 0
+
+
+def test_reconcile_replaces_drift_but_keeps_newer_changes():
+    mirror = FlowTableMirror()
+    mirror.install(1, 1, _l3('a', 'b'), now=100)
+    mirror.install(2, 1, _l3('stale', 'b'), now=100)
+    mirror.install(3, 1, _l3('gone', 'b'), now=100)
+
+    mirror.begin_reconcile(xid=7, request_time=200)
+    mirror.install(4, 1, _l3('new', 'b'), now=201)      # after request: may be missing from dump
+    mirror.remove(1, _l3('gone', 'b'), now=202)         # after request: may still be in dump
+    mirror.add_dump_segment(7, [_Stats(1, 1, _l3('a', 'b')), _Stats(3, 1, _l3('gone', 'b'))])
+    mirror.add_dump_segment(7, [_Stats(5, 1, _l3('unknown', 'b'))])
+
+    added, removed = mirror.finish_reconcile(7)
+    sources = sorted(entry[1] for entry in mirror.entries.values())
+    assert sources == ['a', 'new', 'unknown']
+    assert (added, removed) == (1, 1)
+    assert not mirror.is_reconciling(7)
+
+
+def test_lost_reconcile_reply_does_not_pin_tombstones():
+    mirror = FlowTableMirror()
+    mirror.begin_reconcile(xid=1, request_time=0, max_age=30)      # reply never arrives
+    for cycle in range(1, 6):
+        now = cycle * 30.5
+        mirror.begin_reconcile(xid=cycle + 1, request_time=now, max_age=30)
+        assert not mirror.is_reconciling(1)
+        for n in range(1000):
+            mirror.install(n, 1, _l3(f'h{n}', 'b'), now=now)
+            mirror.remove(1, _l3(f'h{n}', 'b'), now=now + 1)
+        mirror.finish_reconcile(cycle + 1)
+        assert not mirror._tombstones
+
+    # Removals that pending dumps may still contain are kept, older ones are pruned
+    mirror.begin_reconcile(xid=10, request_time=200)
+    mirror.remove(1, _l3('x', 'b'), now=201)
+    mirror.begin_reconcile(xid=11, request_time=220)
+    mirror.remove(1, _l3('y', 'b'), now=221)
+    mirror.abort_reconcile(10)
+    assert list(mirror._tombstones) == [(1, tuple(sorted(_l3('y', 'b'))))]
@@ -0,0 +1,50 @@
+import os
+import time
+
+import numpy as np
+from sklearn.naive_bayes import GaussianNB
+
+from ryu_app import ml_detector
+from ryu_app.model_artifact import save_artifact
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+def _other_model():
+    # Always predicts 1 below sfe 1000
+    X = np.array([[0, 0, 1.0], [1, 0, 1.0], [5000, 0, 1.0], [5001, 0, 1.0]])
+    return GaussianNB().fit(X, np.array([1, 1, 0, 0]))
+
+
+def test_reload_rollback_and_reject(tmp_path):
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET, model_dir=str(tmp_path))
+    original = detector.model
+    save_artifact(_other_model(), detector.model_file, 'naive_bayes')
+
+    assert detector.reload_model()
+    assert detector.swap_count == 1 and detector.model is not original
+    assert detector.classify([0, 0, 1.0])[0] == 1
+
+    assert detector.rollback()
+    assert detector.model is original and detector.swap_count == 2
+
+    with open(detector.model_file, 'ab') as fh:
+        fh.write(b'corrupt')
+    assert not detector.reload_model()
+    assert detector.model is original and detector.swap_count == 2
+
+
+def test_watcher_picks_up_new_artifact(tmp_path):
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET, model_dir=str(tmp_path))
+    detector.start_watcher(interval=0.05)
+    try:
+        time.sleep(0.2)
+        assert detector.swap_count == 0
+        save_artifact(_other_model(), detector.model_file, 'naive_bayes')
+        deadline = time.time() + 5
+        while detector.swap_count == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        assert detector.swap_count == 1
+    finally:
+        detector.stop_watcher()
@@ -0,0 +1,49 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from blockchain.http_session import PooledHTTPSession
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    client_ports = set()
+
+    def do_POST(self):
+        _Handler.client_ports.add(self.client_address[1])
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        status = 500 if self.path == '/fail' else 200
+        body = json.dumps({'success': status == 200}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_session_reuses_connection_and_records_stats():
+    server = HTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        http = PooledHTTPSession(f"http://127.0.0.1:{server.server_port}", pool_size=1)
+        for _ in range(5):
+            assert http.post('/api/v1/events', json={'event_type': 'unit_test'}).status_code == 200
+        assert http.post('/fail', json={}).status_code == 500
+
+        # keep-alive: every request went over the same client socket
+        assert len(_Handler.client_ports) == 1
+
+        stats = http.get_stats()
+        assert stats['/api/v1/events']['count'] == 5
+        assert stats['/api/v1/events']['errors'] == 0
+        assert stats['/fail']['errors'] == 1
+        assert stats['/api/v1/events']['latency_ms']['max'] >= stats['/api/v1/events']['latency_ms']['avg']
+        http.close()
+    finally:
+        server.shutdown()
+        server.server_close()
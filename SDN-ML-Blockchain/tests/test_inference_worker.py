@@ -0,0 +1,108 @@
+import os
+import time
+
+import numpy as np
+import pytest
+from multiprocessing import shared_memory
+
+from ryu_app import ml_detector
+from ryu_app.inference_worker import InferenceWorker, _Rings
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+X = np.array([[1, 0, 1.0], [40, 30, 0.1], [3000, 2000, 0.0], [2, 1, 1.0], [120, 80, 0.01], [0, 0, 1.0]])
+
+
+def test_rings_wrap_around():
+    shm = shared_memory.SharedMemory(create=True, size=_Rings.nbytes(4))
+    try:
+        rings = _Rings(shm.buf, 4)
+        rings.header[:] = 0
+        for start in range(0, 9, 3):
+            ids = np.arange(start, start + 3)
+            assert rings.free_requests() == 4
+            rings.put_requests(ids, X[:3] + start)
+            assert rings.free_requests() == 1
+            taken, features = rings.take_requests()
+            assert taken.tolist() == ids.tolist()
+            assert np.array_equal(features, X[:3] + start)
+            rings.put_responses(taken, taken % 2)
+            assert rings.take_responses()[1].tolist() == (ids % 2).tolist()
+        rings.release()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_not_started_worker_classifies_inline(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_detector, 'BASE_DIR', str(tmp_path))
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET)
+    worker = InferenceWorker(detector, {})
+    resolved = worker.submit(list(range(len(X))), X)
+    assert [label for _, label in resolved] == detector.model.predict(X).tolist()
+    assert worker.get_stats()['inline_not_ready'] == len(X)
+    with pytest.raises(ValueError):
+        InferenceWorker(detector, {}, overflow='block')
+
+
+@pytest.mark.parametrize('overflow', ['inline', 'drop'])
+def test_worker_process_verdicts_and_overflow(tmp_path, monkeypatch, overflow):
+    monkeypatch.setattr(ml_detector, 'BASE_DIR', str(tmp_path))
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET)
+    expected = detector.model.predict(X).tolist()
+    worker = InferenceWorker(detector, {'model_type': 'naive_bayes', 'model_path': DATASET,
+                                        'model_dir': str(tmp_path)},
+                             capacity=4, deadline=30, overflow=overflow)
+    worker.start()
+    try:
+        assert worker.wait_until_ready(timeout=60)
+        # Ring of 4: the last two vectors overflow
+        resolved = dict(worker.submit(list(range(len(X))), X))
+        if overflow == 'drop':
+            assert resolved == {4: None, 5: None}
+        else:
+            assert resolved == {4: expected[4], 5: expected[5]}
+
+        end = time.monotonic() + 30
+        while worker.pending and time.monotonic() < end:
+            resolved.update(worker.poll())
+            time.sleep(0.01)
+        assert [resolved[i] for i in range(4)] == expected[:4]
+        stats = worker.get_stats()
+        assert stats['completed'] == 4 and stats['worker_vectors'] == 4
+        assert stats['dropped' if overflow == 'drop' else 'inline_overflow'] == 2
+
+        # Past the deadline the controller stops waiting and classifies inline
+        worker.deadline = 0.0
+        resolved = dict(worker.submit([10, 11], X[:2]))
+        resolved.update(worker.poll(now=time.time() + 1))
+        assert resolved == {10: expected[0], 11: expected[1]}
+        assert worker.get_stats()['completed'] + worker.get_stats()['inline_lagging'] == 6
+    finally:
+        worker.stop()
+    assert not worker.ready()
+
+
+def test_worker_waits_for_the_artifact_instead_of_training(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_detector, 'BASE_DIR', str(tmp_path))
+    options = {'model_type': 'naive_bayes', 'model_path': DATASET, 'model_dir': str(tmp_path)}
+    worker = InferenceWorker(None, options, deadline=30)
+    assert worker.detector_options['retrain_on_load_failure'] is False
+    worker.start()
+    try:
+        assert not worker.wait_until_ready(timeout=3)
+        assert worker.process.is_alive()
+        assert not os.listdir(tmp_path)
+
+        # The controller's detector trains and saves it; the worker only loads it
+        detector = ml_detector.MLDetector(**options)
+        worker.detector = detector
+        assert worker.wait_until_ready(timeout=60)
+        resolved = dict(worker.submit(list(range(len(X))), X))
+        end = time.monotonic() + 30
+        while worker.pending and time.monotonic() < end:
+            resolved.update(worker.poll())
+            time.sleep(0.01)
+        assert [resolved[i] for i in range(len(X))] == detector.model.predict(X).tolist()
+    finally:
+        worker.stop()
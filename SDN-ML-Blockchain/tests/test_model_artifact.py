@@ -0,0 +1,71 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from sklearn import svm
+
+from ryu_app import ml_detector
+from ryu_app.model_artifact import ArtifactError, load_artifact, meta_path, save_artifact, schema_hash
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+@pytest.fixture(scope='module')
+def svc():
+    data = np.loadtxt(DATASET, delimiter=',', skiprows=1)
+    return svm.SVC(kernel='rbf', gamma='scale').fit(data[::7, 0:3], data[::7, 3].astype(int))
+
+
+def test_round_trip_with_metadata_and_mmap(tmp_path, svc):
+    path = str(tmp_path / 'ml_model_svm.pkl')
+    meta = save_artifact(svc, path, 'svm', data_path=DATASET)
+    assert meta['schema_hash'] == schema_hash()
+    assert meta['data_sha256'] and meta['sha256'] and meta['created_at']
+    assert json.loads(open(meta_path(path)).read()) == meta
+
+    model, loaded_meta, seconds = load_artifact(path, model_type='svm')
+    assert loaded_meta == meta and seconds > 0
+    assert isinstance(model.support_vectors_, np.memmap)
+    assert model.predict([[1, 0, 1.0]]).tolist() == svc.predict([[1, 0, 1.0]]).tolist()
+
+
+def test_rejects_corrupt_or_incompatible_artifacts(tmp_path, svc):
+    path = str(tmp_path / 'ml_model_svm.pkl')
+    save_artifact(svc, path, 'svm')
+    with pytest.raises(ArtifactError):
+        load_artifact(path, model_type='random_forest')
+
+    with open(path, 'ab') as fh:
+        fh.write(b'garbage')
+    with pytest.raises(ArtifactError):
+        load_artifact(path)
+
+    save_artifact(svc, path, 'svm')
+    meta = json.loads(open(meta_path(path)).read())
+    meta['schema_hash'] = 'other'
+    open(meta_path(path), 'w').write(json.dumps(meta))
+    with pytest.raises(ArtifactError):
+        load_artifact(path)
+
+    # legacy .pkl without a sidecar still loads
+    os.remove(meta_path(path))
+    model, meta, _ = load_artifact(path, mmap=False)
+    assert meta is None and hasattr(model, 'support_vectors_')
+
+
+def test_detector_retrains_or_refuses_on_bad_artifact(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_detector, 'BASE_DIR', str(tmp_path))
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET)
+    assert detector.artifact_meta['model_type'] == 'naive_bayes'
+    model_file = tmp_path / 'ml_model_naive_bayes.pkl'
+
+    reloaded = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET)
+    assert reloaded.load_seconds is not None
+
+    model_file.write_bytes(model_file.read_bytes() + b'x')
+    with pytest.raises(ArtifactError):
+        ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET, retrain_on_load_failure=False)
+    retrained = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET)
+    assert retrained.is_trained and retrained.load_seconds is None
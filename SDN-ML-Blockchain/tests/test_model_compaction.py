@@ -0,0 +1,32 @@
+import os
+
+from ryu_app import model_compaction
+from ryu_app.model_artifact import load_artifact
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+def test_pareto_front_and_selection():
+    results = [
+        {'name': 'big', 'accuracy': 0.99, 'bytes': 100, 'compiled_us': 5.0, 'nodes': 50},
+        {'name': 'small', 'accuracy': 0.98, 'bytes': 10, 'compiled_us': 1.0, 'nodes': 5},
+        {'name': 'dominated', 'accuracy': 0.97, 'bytes': 20, 'compiled_us': 2.0, 'nodes': 9},
+    ]
+    assert [r['name'] for r in model_compaction.pareto_front(results)] == ['big', 'small']
+    assert model_compaction.select(results, 0.99, 0.005)['name'] == 'big'
+    assert model_compaction.select(results, 0.99, 0.02)['name'] == 'small'
+    assert model_compaction.select(results, 1.5, 0.0) is None
+
+
+def test_sweep_saves_selected_model(tmp_path, monkeypatch):
+    monkeypatch.setitem(model_compaction.SWEEP, 'random_forest',
+                        {'n_estimators': [5, 100], 'max_depth': [None], 'min_samples_leaf': [1]})
+    output = str(tmp_path / 'ml_model_random_forest.pkl')
+    outcome = model_compaction.run_sweep('random_forest', DATASET, tolerance=0.01, output=output)
+    assert len(outcome['results']) == 2
+    assert outcome['reference']['params']['n_estimators'] == 100
+    assert outcome['selected']['bytes'] <= outcome['reference']['bytes']
+    model, meta, _ = load_artifact(output, model_type='random_forest')
+    assert meta['model_type'] == 'random_forest'
+    assert model.n_estimators == outcome['selected']['params']['n_estimators']
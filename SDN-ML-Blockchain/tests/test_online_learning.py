@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.naive_bayes import GaussianNB
+
+from ryu_app import ml_detector
+from ryu_app.online_learning import OnlineLearner
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+DRIFT = [40.0, 30.0, 0.5]
+
+
+def test_naive_bayes_partial_fit_matches_full_fit():
+    rng = np.random.default_rng(0)
+    X1, X2 = rng.normal(size=(200, 3)), rng.normal(2, 3, size=(50, 3))
+    y1, y2 = (X1[:, 0] > 0).astype(int), (X2[:, 0] > 2).astype(int)
+    model = GaussianNB().fit(X1, y1)
+    epsilon = model.epsilon_
+    ml_detector.partial_fit_model(model, X2, y2)
+    ml_detector.partial_fit_model(model, np.ones((4, 3)), [1, 1, 1, 1])
+
+    full = GaussianNB().fit(np.vstack([X1, X2, np.ones((4, 3))]), np.concatenate([y1, y2, [1, 1, 1, 1]]))
+    assert model.epsilon_ == pytest.approx(epsilon)
+    assert np.allclose(model.theta_, full.theta_)
+    assert np.allclose(model.var_ - model.epsilon_, full.var_ - full.epsilon_)
+
+
+@pytest.mark.parametrize('model_type', ['naive_bayes', 'sgd'])
+def test_detector_absorbs_drift_without_touching_active_model(tmp_path, model_type):
+    detector = ml_detector.MLDetector(model_type=model_type, model_path=DATASET, model_dir=str(tmp_path))
+    assert int(detector.classify(DRIFT)[0]) == 1
+    before = detector.model
+
+    # The operator confirms the vector as normal traffic
+    assert detector.partial_fit([DRIFT] * 1000, [0] * 1000, batch_size=32)
+    assert detector.model is not before
+    assert int(before.predict([DRIFT])[0]) == 1
+    assert int(detector.classify(DRIFT)[0]) == 0
+    assert int(detector.classify([3000, 2000, 0.0])[0]) == 1
+    assert detector.update_rows == 1000
+
+    assert detector.rollback()
+    assert detector.model is before
+
+
+def test_learner_reads_feedback_and_checkpoints(tmp_path):
+    detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET, model_dir=str(tmp_path))
+    feedback = tmp_path / 'feedback.csv'
+    feedback.write_text('sfe,ssip,rfip,label\n' + '40,30,0.5,0\n' * 300 + '1,2,0.5,7\n40,30')
+    learner = OnlineLearner(detector, feedback_path=str(feedback), batch_size=64)
+
+    assert learner.step() == 300
+    stats = learner.get_stats()
+    assert stats['bad_lines'] == 2 and stats['updates'] == 1
+    assert int(detector.classify(DRIFT)[0]) == 0
+
+    # The partial last line is read once it is complete
+    with open(feedback, 'a') as fh:
+        fh.write(',0.5,0\n')
+    assert learner.step() == 1
+
+    learner.stop()
+    assert learner.get_stats()['checkpoints'] == 1
+    assert detector._loaded_signature == detector._artifact_signature()
+    reloaded = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET, model_dir=str(tmp_path))
+    assert np.array_equal(reloaded.model.theta_, detector.model.theta_)
+
+    tree_detector = ml_detector.MLDetector(model_type='decision_tree', model_path=DATASET, model_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        OnlineLearner(tree_detector)
+    with pytest.raises(ValueError):
+        tree_detector.partial_fit([DRIFT], [1])
+
+
+def test_restart_resumes_after_checkpointed_feedback(tmp_path):
+    feedback = tmp_path / 'feedback.csv'
+    feedback.write_text('40,30,0.5,0\n' * 64)
+
+    def restart():
+        detector = ml_detector.MLDetector(model_type='naive_bayes', model_path=DATASET, model_dir=str(tmp_path))
+        return detector, OnlineLearner(detector, feedback_path=str(feedback), batch_size=64)
+
+    detector, learner = restart()
+    trained = detector.model.class_count_[0]
+    assert learner.step() == 64
+    learner.stop()
+    assert detector.artifact_meta['feedback']['offset'] == feedback.stat().st_size
+
+    # Restarts do not apply the checkpointed rows again
+    for _ in range(2):
+        detector, learner = restart()
+        assert detector.model.class_count_[0] == trained + 64
+        assert learner.step() == 0
+        learner.stop()
+    with open(feedback, 'a') as fh:
+        fh.write('40,30,0.5,0\n' * 8)
+    detector, learner = restart()
+    assert learner.step() == 8
+    learner.stop()
+    assert detector.model.class_count_[0] == trained + 72
+
+    # A replaced file (new inode) is read from the start
+    replacement = tmp_path / 'feedback.new'
+    replacement.write_text('40,30,0.5,0\n' * 100)
+    os.replace(replacement, feedback)
+    detector, learner = restart()
+    assert learner.step() == 100
@@ -0,0 +1,81 @@
+from ryu_app.poll_scheduler import PollScheduler
+
+
+def test_first_polls_are_staggered_across_the_interval():
+    sched = PollScheduler(base_interval=2.0)
+    for dpid in range(1, 5):
+        sched.add(dpid, now=0.0)
+    due_times = sorted(s.next_due for s in sched.switches.values())
+    assert all(0.0 <= t < 2.0 for t in due_times)
+    assert len(set(round(t, 3) for t in due_times)) == 4
+    assert sched.due(now=0.0) == []
+
+
+def test_in_flight_budget_and_reply_timeout():
+    sched = PollScheduler(base_interval=2.0, max_in_flight=2, reply_timeout=5.0)
+    for dpid in range(1, 5):
+        sched.add(dpid, now=0.0)
+
+    assert len(sched.due(now=2.0)) == 2
+    assert sched.due(now=2.1) == []          # budget exhausted until replies arrive
+    assert sched.budget_deferrals == 4
+
+    assert len(sched.due(now=7.5)) == 2      # unanswered requests timed out
+    assert sum(s['timeouts'] for s in sched.get_stats().values()) == 2
+
+
+def test_idle_switch_backs_off_and_attack_tightens():
+    sched = PollScheduler(base_interval=2.0, min_interval=0.5, max_interval=6.0)
+    sched.add(1, now=0.0)
+
+    now = 2.0
+    for _ in range(5):
+        assert sched.due(now=now) == [1]
+        sched.record_reply(1, now=now + 0.01)
+        sched.adapt(1, sfe=0, ssip=0)
+        now = sched.switches[1].next_due
+    assert sched.switches[1].interval == 6.0
+
+    sched.due(now=now)
+    sched.record_reply(1, now=now)
+    sched.adapt(1, sfe=40, ssip=25, attack=True)
+    assert sched.switches[1].interval == 3.0
+    assert sched.switches[1].next_due == now + 3.0
+
+    stats = sched.get_stats()[1]
+    assert abs(stats['reply_latency_ms'] - 10.0) < 5.0
+    assert stats['effective_period'] > 2.0
+
+
+def test_non_adaptive_keeps_base_interval():
+    sched = PollScheduler(base_interval=2.0, adaptive=False)
+    sched.add(1, now=0.0)
+    sched.due(now=2.0)
+    sched.record_reply(1, now=2.0)
+    sched.adapt(1, sfe=0, ssip=0)
+    assert sched.switches[1].interval == 2.0
+
+
+def test_trend_compares_polls_of_different_length_as_rates():
+    sched = PollScheduler(base_interval=2.0, min_interval=0.5, max_interval=6.0)
+    sched.add(1, now=0.0)
+    sched.record_reply(1, now=0.0)
+
+    # 8 new flows in 2 s, then 4 in the next 0.5 s: the rate doubled
+    sched.record_reply(1, now=2.0)
+    sched.adapt(1, sfe=8, ssip=0)
+    assert sched.switches[1].interval == 1.0
+    sched.record_reply(1, now=2.5)
+    sched.adapt(1, sfe=4, ssip=0)
+    assert sched.switches[1].interval == 0.5
+    assert sched.switches[1].prev_sfe == 16
+
+    # Same rate on a short poll is not a rise (the raw delta 4 is half the previous 8)
+    sched.record_reply(1, now=3.0)
+    sched.adapt(1, sfe=4, ssip=0)
+    assert sched.switches[1].interval == 2.0
+
+    # A reply right after the previous one is scaled as a min_interval poll, not by 100
+    sched.record_reply(1, now=3.02)
+    sched.adapt(1, sfe=1, ssip=0)
+    assert sched.switches[1].prev_sfe == 4
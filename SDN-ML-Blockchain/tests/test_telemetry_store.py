@@ -0,0 +1,119 @@
+import json
+
+import numpy as np
+import pytest
+
+from ryu_app.telemetry_store import TelemetryReader, TelemetryWriter, ROW_BYTES, SCHEMA
+
+
+def test_round_trip_only_exposes_committed_rows(tmp_path):
+    writer = TelemetryWriter(str(tmp_path), chunk_rows=4)
+    for i in range(10):
+        writer.append(dpid=1 + i % 2, sfe=i, ssip=i / 2, rfip=1.0, flow_count=i + 1,
+                      label=i % 2, mode=1, ts=1000.0 + i)
+
+    # 8 rows flushed in two chunks, 2 still buffered
+    reader = TelemetryReader(str(tmp_path))
+    assert len(reader.load()['ts']) == 8
+
+    writer.close()
+    cols = reader.load()
+    assert cols['ts'].dtype == np.float64 and cols['sfe'].dtype == np.float32
+    assert cols['sfe'].tolist() == list(range(10))
+    assert cols['flow_count'][-1] == 10
+
+    seg_dir, meta = reader.segments()[0]
+    mapped = reader.read_segment(seg_dir, meta, ['dpid'])
+    assert isinstance(mapped['dpid'], np.memmap)
+    assert meta['sealed'] and meta['first_ts'] == 1000.0 and meta['last_ts'] == 1009.0
+
+
+def test_filters_by_dpid_and_time(tmp_path):
+    writer = TelemetryWriter(str(tmp_path), chunk_rows=3)
+    for i in range(9):
+        writer.append(dpid=i % 3, sfe=i, ssip=0, rfip=1.0, flow_count=1, label=0, mode=1, ts=float(i))
+    writer.close()
+
+    cols = TelemetryReader(str(tmp_path)).load(columns=['sfe'], dpid=1, start=2.0, end=8.0)
+    assert list(cols) == ['sfe']
+    assert cols['sfe'].tolist() == [4.0, 7.0]
+
+
+def test_segments_rotate_by_size_and_time(tmp_path):
+    writer = TelemetryWriter(str(tmp_path), chunk_rows=2, segment_bytes=6 * ROW_BYTES,
+                             segment_seconds=100)
+    for i in range(8):
+        writer.append(dpid=1, sfe=i, ssip=0, rfip=1.0, flow_count=1, label=0, mode=0, ts=float(i))
+    # Same size budget but far later in time: starts another segment
+    writer.append(dpid=1, sfe=8, ssip=0, rfip=1.0, flow_count=1, label=0, mode=0, ts=500.0)
+    writer.close()
+
+    reader = TelemetryReader(str(tmp_path))
+    assert [meta['rows'] for _, meta in reader.segments()] == [6, 2, 1]
+    assert reader.load()['sfe'].tolist() == list(range(9))
+
+    # A new writer never appends to existing segments
+    writer = TelemetryWriter(str(tmp_path))
+    writer.append(dpid=2, sfe=9, ssip=0, rfip=1.0, flow_count=1, label=1, mode=0, ts=600.0)
+    writer.close()
+    assert len(reader.segments()) == 4
+    with pytest.raises(RuntimeError):
+        writer.append(dpid=2, sfe=0, ssip=0, rfip=1.0, flow_count=1, label=0, mode=0)
+
+
+def test_dataframe_has_datetime_column(tmp_path):
+    writer = TelemetryWriter(str(tmp_path))
+    writer.append(dpid=1, sfe=5, ssip=2, rfip=0.5, flow_count=3, label=1, mode=1, ts=0.0)
+    writer.close()
+    df = TelemetryReader(str(tmp_path)).to_dataframe()
+    assert str(df['time'][0]) == '1970-01-01 00:00:00'
+    assert json.loads((tmp_path / 'seg-000001' / 'meta.json').read_text())['rows'] == 1
+
+
+def test_failed_chunk_rolls_back_every_column(tmp_path, monkeypatch):
+    writer = TelemetryWriter(str(tmp_path), chunk_rows=2)
+    for i in range(2):
+        writer.append(dpid=1, sfe=i, ssip=0, rfip=1.0, flow_count=1, label=0, mode=0, ts=float(i))
+
+    # The disk fills up after the first columns of the second chunk
+    real_open, writes = open, []
+
+    def failing_open(path, mode='r', *args, **kwargs):
+        if mode == 'ab':
+            writes.append(path)
+            if len(writes) == 4:
+                raise OSError('No space left on device')
+        return real_open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', failing_open)
+    for i in range(2, 4):
+        writer.append(dpid=1, sfe=i, ssip=0, rfip=1.0, flow_count=1, label=0, mode=0, ts=float(i))
+    monkeypatch.setattr('builtins.open', real_open)
+    assert writer.stats['errors'] == 1 and writer.stats['rollbacks'] == 1
+
+    for i in range(4, 6):
+        writer.append(dpid=1, sfe=i, ssip=0, rfip=1.0, flow_count=1, label=0, mode=0, ts=float(i))
+    writer.close()
+
+    seg_dir = tmp_path / 'seg-000001'
+    for name, dtype in SCHEMA:
+        assert (seg_dir / (name + '.bin')).stat().st_size == 4 * np.dtype(dtype).itemsize
+    cols = TelemetryReader(str(tmp_path)).load()
+    assert cols['sfe'].tolist() == [0, 1, 4, 5]
+    assert cols['ts'].tolist() == [0.0, 1.0, 4.0, 5.0]
+
+
+def test_background_writer_commits_off_the_caller(tmp_path):
+    writer = TelemetryWriter(str(tmp_path), chunk_rows=4, background=True)
+    for i in range(10):
+        writer.append(dpid=1, sfe=i, ssip=0, rfip=1.0, flow_count=1, label=0, mode=0, ts=float(i))
+    writer.flush()
+    assert writer.wait(timeout=5)
+    assert writer._thread.name == 'telemetry-writer'
+    reader = TelemetryReader(str(tmp_path))
+    assert reader.load()['sfe'].tolist() == list(range(10))
+
+    writer.append(dpid=1, sfe=10, ssip=0, rfip=1.0, flow_count=1, label=0, mode=0, ts=10.0)
+    writer.close()
+    assert writer.stats['chunks'] == 4
+    assert reader.segments()[0][1]['sealed'] and reader.segments()[0][1]['rows'] == 11
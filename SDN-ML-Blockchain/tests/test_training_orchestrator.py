@@ -0,0 +1,40 @@
+import json
+import os
+
+import numpy as np
+
+from ryu_app import dataset
+from ryu_app.model_artifact import load_artifact
+from ryu_app.training_orchestrator import _attach, _share, train_all
+
+
+DATASET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv'))
+
+
+def test_shared_memory_round_trip():
+    X, y = dataset.load_training_data(DATASET)
+    shm, spec = _share(X, y)
+    try:
+        other, X2, y2 = _attach(spec)
+        assert np.array_equal(X, X2) and np.array_equal(y, y2) and not X2.flags.writeable
+        del X2, y2
+        other.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_train_all_writes_models_and_summary(tmp_path):
+    summary = train_all(DATASET, model_types=['naive_bayes', 'decision_tree'], model_dir=str(tmp_path),
+                        workers=2)
+    assert [r['model_type'] for r in summary['models']] == ['decision_tree', 'naive_bayes']
+    for result in summary['models']:
+        assert result['status'] == 'trained', result
+        assert result['fit_rows'] < result['rows'] == 2214
+        assert result['model_bytes'] > 0 and result['latency_single_us'] > 0
+        assert load_artifact(result['path'])[0].predict([[1, 0, 1.0]]).tolist() == [0]
+    on_disk = json.loads((tmp_path / 'training_summary.json').read_text())
+    assert on_disk['rows'] == 2214 and len(on_disk['models']) == 2
+
+    again = train_all(DATASET, model_types=['naive_bayes'], model_dir=str(tmp_path), workers=1)
+    assert again['models'][0]['status'] == 'existing'
@@ -0,0 +1,85 @@
+"""
+Dedup Benchmark
+Fit time of every detector model type on the full training set vs on its
+deduplicated form (unique rows + sample_weight counts), with the compression
+ratio and a prediction equivalence check on the training rows and on random
+feature vectors.
+"""
+import time
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ryu_app.dataset import load_training_data, deduplicate
+from ryu_app.ml_detector import SUPPORTED_MODELS, create_model, fit_model
+
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv')
+
+
+def _make_model(model_type):
+    """create_model(model_type), with the seeds it leaves unset fixed so both fits are comparable"""
+    model = create_model(model_type)
+    model.set_params(**{name: 0 for name, value in model.get_params().items()
+                        if name.endswith('random_state') and value is None})
+    return model
+
+
+def _fit_seconds(model_type, X, y, dedup, repeat=1):
+    """Best-of-repeat fit_model time (dedup included when on); returns (fitted model, seconds)"""
+    best = None
+    for _ in range(repeat):
+        model = _make_model(model_type)
+        seconds = fit_model(model, X, y, dedup=dedup)['fit_seconds']
+        best = seconds if best is None else min(best, seconds)
+    return model, best
+
+
+def run_dedup_benchmark(data_path=DEFAULT_DATA, repeat=3, random_vectors=5000):
+    X, y = load_training_data(data_path)
+    start = time.perf_counter()
+    X_unique = deduplicate(X, y)[0]
+    dedup_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    low, high = X.min(axis=0), X.max(axis=0)
+    probe = rng.uniform(low, high, size=(random_vectors, X.shape[1])).astype(X.dtype)
+
+    print("=" * 84)
+    print(f"DEDUP BENCHMARK ({len(X)} rows -> {len(X_unique)} unique, "
+          f"{len(X) / len(X_unique):.1f}x compression, dedup {dedup_seconds * 1000:.1f} ms)")
+    print("=" * 84)
+    print(f"{'model':<15} {'full fit s':>11} {'dedup fit s':>12} {'speedup':>8} "
+          f"{'agree train':>12} {'agree random':>13}")
+
+    results = []
+    for name in SUPPORTED_MODELS:
+        full, full_s = _fit_seconds(name, X, y, dedup=False, repeat=repeat)
+        compact, compact_s = _fit_seconds(name, X, y, dedup=True, repeat=repeat)
+        agree_train = float(np.mean(full.predict(X) == compact.predict(X)))
+        agree_random = float(np.mean(full.predict(probe) == compact.predict(probe)))
+        results.append({'model': name, 'full_seconds': full_s, 'dedup_seconds': compact_s,
+                        'agreement_train': agree_train, 'agreement_random': agree_random})
+        print(f"{name:<15} {full_s:11.3f} {compact_s:12.3f} {full_s / compact_s:7.1f}x "
+              f"{agree_train * 100:11.2f}% {agree_random * 100:12.2f}%")
+    print("-" * 84)
+    print("dedup fit includes deduplication; agree = identical predictions of the two fits "
+          "(random forests bootstrap and sgd iterates over unique rows, so small differences are expected there)")
+    return {'rows': len(X), 'unique_rows': len(X_unique), 'compression': len(X) / len(X_unique),
+            'models': results}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Weighted dedup training benchmark')
+    parser.add_argument('--data', default=DEFAULT_DATA, help='Training CSV (sfe,ssip,rfip,label)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions (best time kept)')
+    parser.add_argument('--random-vectors', type=int, default=5000,
+                        help='Random feature vectors for the equivalence check')
+    args = parser.parse_args()
+
+    run_dedup_benchmark(args.data, repeat=args.repeat, random_vectors=args.random_vectors)
@@ -0,0 +1,155 @@
+"""
+Flow Feature Extraction Benchmark
+Compares the single-pass FlowFeatureState engine against the original
+list/string based SFE/SSIP/RFIP extraction on synthetic flow tables.
+"""
+import random
+import time
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ryu_app.flow_features import FlowFeatureState
+
+
+class FakeMatch:
+    """Minimal stand-in for OFPMatch (items() returns the field list)"""
+
+    def __init__(self, fields):
+        self._fields2 = fields
+
+    def items(self):
+        return self._fields2
+
+
+class FakeFlow:
+    def __init__(self, fields):
+        self.match = FakeMatch(fields)
+
+
+def make_flows(num_flows, num_sources=None, reverse_ratio=0.2, seed=42):
+    """
+    Build a synthetic flow table: one table-miss entry plus num_flows L3 flows.
+
+    Args:
+        num_flows: Number of ipv4_src/ipv4_dst flows
+        num_sources: Distinct source IPs (default: one per flow, i.e. spoofed flood)
+        reverse_ratio: Fraction of flows that also get a reverse-direction flow
+    """
+    rng = random.Random(seed)
+    if num_sources is None:
+        num_sources = num_flows
+
+    flows = [FakeFlow([])]  # table-miss
+    pairs = 0
+    while len(flows) - 1 < num_flows:
+        src = f"10.{(pairs % num_sources) >> 16 & 255}.{(pairs % num_sources) >> 8 & 255}.{pairs % num_sources & 255}"
+        dst = f"192.168.0.{rng.randint(1, 12)}"
+        flows.append(FakeFlow([('eth_type', 2048), ('ipv4_src', src), ('ipv4_dst', dst)]))
+        if rng.random() < reverse_ratio and len(flows) - 1 < num_flows:
+            flows.append(FakeFlow([('eth_type', 2048), ('ipv4_src', dst), ('ipv4_dst', src)]))
+        pairs += 1
+    return flows
+
+
+def legacy_features(flows, prev_flow_count=0, old_ssip_len=0):
+    """Original controller implementation (kept as reference for equivalence/benchmarks)"""
+    # _speed_of_flow_entries
+    sfe = len(flows) - prev_flow_count
+
+    # _speed_of_source_ip
+    ssip = []
+    for flow in flows:
+        for i in flow.match.items():
+            key = list(i)[0]
+            val = list(i)[1]
+            if key == "ipv4_src":
+                if val not in ssip:
+                    ssip.append(val)
+    ssip_result = len(ssip) - old_ssip_len
+
+    # _ratio_of_flowpair
+    flow_count = len(flows) - 1
+    if flow_count <= 0:
+        return sfe, ssip_result, 1.0
+    collaborative_flows = {}
+    for flow in flows:
+        srcip = dstip = None
+        for i in flow.match.items():
+            key = list(i)[0]
+            val = list(i)[1]
+            if key == "ipv4_src":
+                srcip = val
+            if key == "ipv4_dst":
+                dstip = val
+        if srcip and dstip:
+            fwdflowhash = srcip + "_" + dstip
+            revflowhash = dstip + "_" + srcip
+            if not fwdflowhash in collaborative_flows:
+                if not revflowhash in collaborative_flows:
+                    collaborative_flows[fwdflowhash] = {}
+                else:
+                    collaborative_flows[revflowhash][fwdflowhash] = 1
+    iflow = 0
+    for key in collaborative_flows:
+        if collaborative_flows[key] != {}:
+            iflow += 2
+    return sfe, ssip_result, float(iflow) / flow_count
+
+
+def _time_call(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(sizes, legacy_limit=20000, repeat=3):
+    """Print per-size timings; legacy extraction is only run up to legacy_limit flows"""
+    print("=" * 72)
+    print("FLOW FEATURE EXTRACTION BENCHMARK (spoofed-source flood tables)")
+    print("=" * 72)
+    print(f"{'flows':>10} {'engine (ms)':>12} {'ns/flow':>10} {'legacy (ms)':>12} {'speedup':>9}")
+
+    results = []
+    for size in sizes:
+        flows = make_flows(size)
+        state = FlowFeatureState()
+        engine_s = _time_call(lambda: state.compute(flows), repeat)
+
+        legacy_s = None
+        if size <= legacy_limit:
+            legacy_s = _time_call(lambda: legacy_features(flows), 1)
+            assert legacy_features(flows) == FlowFeatureState().compute(flows)
+
+        results.append({'flows': size, 'engine_s': engine_s, 'legacy_s': legacy_s})
+        legacy_txt = f"{legacy_s * 1000:12.1f}" if legacy_s is not None else f"{'skipped':>12}"
+        speedup_txt = f"{legacy_s / engine_s:8.1f}x" if legacy_s is not None else f"{'-':>9}"
+        print(f"{size:>10} {engine_s * 1000:12.2f} {engine_s / size * 1e9:10.0f} {legacy_txt} {speedup_txt}")
+
+    # Linear scaling: per-flow cost of the largest table vs the smallest
+    first, last = results[0], results[-1]
+    per_flow_ratio = (last['engine_s'] / last['flows']) / (first['engine_s'] / first['flows'])
+    print("-" * 72)
+    print(f"Engine per-flow cost ratio ({last['flows']} vs {first['flows']} flows): {per_flow_ratio:.2f} "
+          f"(~1.0 means linear scaling)")
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Flow feature extraction benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 5000, 10000, 20000, 50000, 100000, 200000],
+                        help='Flow table sizes to benchmark')
+    parser.add_argument('--legacy-limit', type=int, default=20000,
+                        help='Largest table size to run the quadratic legacy extraction on')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per size (best time kept)')
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, legacy_limit=args.legacy_limit, repeat=args.repeat)
@@ -0,0 +1,137 @@
+"""
+Inference Benchmark
+Per-call latency (microseconds) of sklearn predict vs the compiled flat-array
+evaluator for decision_tree / random_forest models trained on dataset/result.csv,
+plus a bit-identical prediction check.
+
+With --grid, also builds a DecisionGrid for every model type and reports build
+time, memory footprint, agreement with the model and lookup latency.
+"""
+import time
+import sys
+import os
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn import svm
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ryu_app.compiled_model import CompiledTreeModel, verification_samples
+from ryu_app.decision_grid import DecisionGrid
+from ryu_app.dataset import load_training_data
+
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), '..', 'dataset', 'result.csv')
+
+
+def _per_call_us(fn, rows, repeat):
+    """Best-of-repeat average microseconds per call of fn(row)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            fn(row)
+        elapsed = (time.perf_counter() - start) / len(rows)
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6
+
+
+def run_benchmark(data_path=DEFAULT_DATA, calls=200, repeat=3, batch_size=64):
+    X, y = load_training_data(data_path)
+    models = {
+        'decision_tree': DecisionTreeClassifier(random_state=0),
+        'random_forest': RandomForestClassifier(n_estimators=100, random_state=42),
+    }
+
+    print("=" * 84)
+    print(f"INFERENCE BENCHMARK ({len(X)} training rows, {calls} single calls, batch of {batch_size})")
+    print("=" * 84)
+    print(f"{'model':<15} {'nodes':>7} {'verified':>10} {'sklearn us':>11} {'compiled us':>12} "
+          f"{'speedup':>8} {'batch sk us':>12} {'batch cp us':>12}")
+
+    rows = X[np.random.default_rng(0).integers(0, len(X), calls)]
+    single_rows = rows.tolist()
+    batch = rows[:batch_size]
+    results = []
+    for name, model in models.items():
+        model.fit(X, y)
+        compiled = CompiledTreeModel.from_sklearn(model)
+        samples = verification_samples(model, X)
+        mismatches = compiled.verify(model, samples)
+
+        sk_us = _per_call_us(lambda r: model.predict(np.array([r])), single_rows, repeat)
+        cp_us = _per_call_us(compiled.predict_one, single_rows, repeat)
+        sk_batch_us = _per_call_us(model.predict, [batch], repeat * 3)
+        cp_batch_us = _per_call_us(compiled.predict, [batch], repeat * 3)
+
+        results.append({'model': name, 'sklearn_us': sk_us, 'compiled_us': cp_us,
+                        'mismatches': mismatches, 'samples': len(samples)})
+        verified = 'yes' if mismatches == 0 else f'{mismatches} diff'
+        print(f"{name:<15} {compiled.n_nodes:>7} {verified:>10} {sk_us:11.1f} {cp_us:12.2f} "
+              f"{sk_us / cp_us:7.0f}x {sk_batch_us:12.1f} {cp_batch_us:12.1f}")
+    print("-" * 84)
+    print("verified = predictions identical to sklearn on training rows, split thresholds "
+          "(+/- one float32 step) and random vectors")
+    return results
+
+
+def run_grid_benchmark(data_path=DEFAULT_DATA, grid_range=(-32, 127), rfip_steps=33,
+                       calls=200, repeat=3):
+    X, y = load_training_data(data_path)
+    models = {
+        'decision_tree': DecisionTreeClassifier(random_state=0),
+        'random_forest': RandomForestClassifier(n_estimators=100, random_state=42),
+        'svm': svm.SVC(kernel='rbf', gamma='scale'),
+        'naive_bayes': GaussianNB(),
+    }
+
+    print("=" * 84)
+    print(f"DECISION GRID (sfe/ssip {grid_range[0]}..{grid_range[1]}, {rfip_steps} rfip steps)")
+    print("=" * 84)
+    print(f"{'model':<15} {'cells':>9} {'KiB':>7} {'build s':>8} {'on grid':>8} {'agree':>8} "
+          f"{'predict us':>11} {'lookup us':>10}")
+
+    rows = X[np.random.default_rng(0).integers(0, len(X), calls)].tolist()
+    results = []
+    for name, model in models.items():
+        model.fit(X, y)
+        predict = model.predict
+        if name in ('decision_tree', 'random_forest'):
+            predict = CompiledTreeModel.from_sklearn(model).predict
+        grid = DecisionGrid.build(predict, model.classes_, sfe_range=grid_range,
+                                  ssip_range=grid_range, rfip_steps=rfip_steps)
+        labels, on_grid = grid.lookup_batch(X)
+        agreement = float(np.mean(labels[on_grid] == model.predict(X[on_grid]))) if on_grid.any() else float('nan')
+
+        predict_us = _per_call_us(lambda r: model.predict(np.array([r])), rows, repeat)
+        lookup_us = _per_call_us(grid.lookup, rows, repeat)
+        info = grid.describe()
+        results.append(dict(info, model=name, agreement=agreement, on_grid=float(on_grid.mean())))
+        print(f"{name:<15} {info['cells']:>9} {info['bytes'] / 1024:7.0f} {info['build_seconds']:8.2f} "
+              f"{on_grid.mean() * 100:7.1f}% {agreement * 100:7.2f}% {predict_us:11.1f} {lookup_us:10.2f}")
+    print("-" * 84)
+    print("on grid = training rows inside the SFE/SSIP range; agree = grid vs model on those rows "
+          "(lookup us counts out-of-range rows as a returned None)")
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compiled tree inference benchmark')
+    parser.add_argument('--data', default=DEFAULT_DATA, help='Training CSV (sfe,ssip,rfip,label)')
+    parser.add_argument('--calls', type=int, default=200, help='Single-vector calls per measurement')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions (best time kept)')
+    parser.add_argument('--batch-size', type=int, default=64, help='Rows per batched call')
+    parser.add_argument('--grid', action='store_true', help='Also benchmark decision grids for all model types')
+    parser.add_argument('--grid-range', type=int, nargs=2, default=[-32, 127], help='Inclusive SFE/SSIP grid range')
+    parser.add_argument('--rfip-steps', type=int, default=33, help='RFIP grid points in [0, 1]')
+    args = parser.parse_args()
+
+    run_benchmark(args.data, calls=args.calls, repeat=args.repeat, batch_size=args.batch_size)
+    if args.grid:
+        run_grid_benchmark(args.data, grid_range=tuple(args.grid_range), rfip_steps=args.rfip_steps,
+                           calls=args.calls, repeat=args.repeat)
@@ -1,15 +1,24 @@
 #!/usr/bin/env python3
 """
 Phân tích chi tiết False Positives - Normal bị phân loại thành Attack
+
+Mặc định đọc dataset/result.csv. Với --telemetry, đọc các tick đã gán nhãn
+của collection mode từ data/telemetry (columnar store, không parse CSV).
 """
 
 import os
+import sys
+import argparse
 import pandas as pd
 import numpy as np
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import confusion_matrix, classification_report
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ryu_app.telemetry_store import TelemetryReader
+from ryu_app.dataset import load_training_data
+
 def analyze_model(model_name, model_path, X_test, y_test):
     """Phân tích chi tiết một model"""
     if not os.path.exists(model_path):
@@ -117,25 +126,45 @@ def analyze_model(model_name, model_path, X_test, y_test):
     }
 
 
-def main():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+def load_dataset(base_dir, use_telemetry=False):
+    """
+    Load (X, y) từ dataset/result.csv, hoặc từ telemetry store khi use_telemetry=True
+    (chỉ tick của collection mode có traffic, giống các dòng controller ghi vào dataset/result.csv)
+    """
+    if use_telemetry:
+        reader = TelemetryReader(os.path.abspath(os.path.join(base_dir, "..", "data", "telemetry")))
+        if not reader.exists():
+            print(f"❌ Telemetry store not found: {reader.root}")
+            return None, None
+        cols = reader.load(columns=['sfe', 'ssip', 'rfip', 'label', 'mode'])
+        keep = (cols['mode'] == 0) & ((cols['sfe'] != 0) | (cols['ssip'] != 0))
+        X = np.column_stack([cols['sfe'][keep], cols['ssip'][keep], cols['rfip'][keep]])
+        return X, cols['label'][keep].astype(int)
+
     data_path = os.path.abspath(os.path.join(base_dir, "..", "dataset", "result.csv"))
-    
     if not os.path.exists(data_path):
         print(f"❌ Dataset not found: {data_path}")
+        return None, None
+    return load_training_data(data_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze false positives / negatives of the trained models")
+    parser.add_argument('--telemetry', action='store_true',
+                        help='Use collection-mode ticks from data/telemetry instead of dataset/result.csv')
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    X, y = load_dataset(base_dir, use_telemetry=args.telemetry)
+    if X is None:
         return
     
     print("=" * 70)
     print("PHÂN TÍCH FALSE POSITIVES - NORMAL BỊ PHÂN LOẠI THÀNH ATTACK")
     print("=" * 70)
     
-    # Load data
-    df = pd.read_csv(data_path, on_bad_lines='skip')
-    X = df[['sfe', 'ssip', 'rfip']].values
-    y = df['label'].values
-    
     print(f"\n📊 Dataset:")
-    print(f"   Tổng samples: {len(df)}")
+    print(f"   Tổng samples: {len(y)}")
     print(f"   Normal (0): {(y == 0).sum()} ({(y == 0).sum()/len(y)*100:.1f}%)")
     print(f"   Attack (1): {(y == 1).sum()} ({(y == 1).sum()/len(y)*100:.1f}%)")
     
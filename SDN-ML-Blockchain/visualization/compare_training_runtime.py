@@ -4,10 +4,14 @@ So sánh Training Data vs Runtime Data để tìm nguyên nhân False Positives
 """
 
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ryu_app.dataset import load_training_frame
+
 def _get_output_dir():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     output_dir = os.path.join(base_dir, "output")
@@ -26,7 +30,7 @@ def main():
     print("=" * 70)
     
     # Load data
-    train_df = pd.read_csv(train_path, on_bad_lines='skip')
+    train_df = load_training_frame(train_path)
     runtime_df = pd.read_csv(runtime_path, on_bad_lines='skip')
     
     # Chỉ lấy ML predictions từ runtime
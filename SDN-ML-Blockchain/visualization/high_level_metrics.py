@@ -4,7 +4,8 @@ Vẽ các biểu đồ "tổng quan" dựa trên CHÍNH dữ liệu của bạn.
 
 Nguồn:
 - dataset/result.csv: tập train (sfe, ssip, rfip, label)
-- data/result.csv: log runtime (time,sfe,ssip,rfip,label,reason,confidence,dpid)
+- data/telemetry/: columnar store runtime của controller (ưu tiên, đọc bằng memmap)
+- data/result.csv: log runtime dạng CSV (dùng khi chưa có telemetry store)
 
 Biểu đồ:
 - detection_rate_bar.png: Detection Rate & False Alarm Rate của SVM trên dataset/result.csv
@@ -13,6 +14,7 @@ Biểu đồ:
 """
 
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn import svm
@@ -21,6 +23,10 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.naive_bayes import GaussianNB
 from sklearn.model_selection import train_test_split
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ryu_app.telemetry_store import TelemetryReader
+from ryu_app.dataset import load_training_data
+
 
 def _path_from_root(*parts):
     base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -35,6 +41,24 @@ def _get_output_dir():
     return output_dir
 
 
+def _load_runtime():
+    """
+    Runtime ticks của detection mode: từ telemetry store nếu có, nếu không thì data/result.csv.
+
+    Returns:
+        (DataFrame, tên nguồn) hoặc (None, tên nguồn) khi không có dữ liệu
+    """
+    reader = TelemetryReader(_path_from_root("data", "telemetry"))
+    if reader.exists():
+        df = reader.to_dataframe(columns=["ts", "dpid", "sfe", "ssip", "rfip", "label", "mode"])
+        return df[df["mode"] == 1], "data/telemetry"
+
+    data_path = _path_from_root("data", "result.csv")
+    if not os.path.exists(data_path):
+        return None, data_path
+    return pd.read_csv(data_path, on_bad_lines='skip'), "data/result.csv"
+
+
 def plot_detection_rate_from_dataset():
     """Tính DR/FAR từ dataset/result.csv cho 4 thuật toán và vẽ bar chart."""
     data_path = _path_from_root("dataset", "result.csv")
@@ -42,9 +66,7 @@ def plot_detection_rate_from_dataset():
         print(f"Bỏ qua detection_rate_bar: không tìm thấy {data_path}")
         return
 
-    df = pd.read_csv(data_path, on_bad_lines='skip')
-    X = df[['sfe', 'ssip', 'rfip']].values
-    y = df['label'].values
+    X, y = load_training_data(data_path)
     x_train, x_test, y_train, y_test = train_test_split(
         X, y, test_size=0.3, random_state=42, stratify=y
     )
@@ -118,18 +140,17 @@ def plot_detection_rate_from_dataset():
 
 
 def plot_network_traffic_from_runtime():
-    """So sánh SFE trung bình giữa normal (label=0) và attack (label=1) từ data/result.csv."""
-    data_path = _path_from_root("data", "result.csv")
-    if not os.path.exists(data_path):
-        print(f"Bỏ qua network_traffic_normal_vs_attack: không tìm thấy {data_path}")
+    """So sánh SFE trung bình giữa normal (label=0) và attack (label=1) từ runtime log."""
+    df, source = _load_runtime()
+    if df is None:
+        print(f"Bỏ qua network_traffic_normal_vs_attack: không tìm thấy {source}")
         return
 
-    df = pd.read_csv(data_path, on_bad_lines='skip')
     # dùng label làm ground truth: 0 = normal, 1 = attack trong các lần collect
     normal = df[df["label"] == 0]
     attack = df[df["label"] == 1]
     if normal.empty or attack.empty:
-        print("Không đủ cả normal và attack trong data/result.csv để vẽ network_traffic_normal_vs_attack.")
+        print(f"Không đủ cả normal và attack trong {source} để vẽ network_traffic_normal_vs_attack.")
         return
 
     # Sử dụng absolute value cho SFE
@@ -166,20 +187,19 @@ def plot_network_traffic_from_runtime():
 
 def plot_attack_frequency_over_time():
     """Đếm số dòng label=1 theo thời gian (theo phút) để thấy tần suất DDoS."""
-    data_path = _path_from_root("data", "result.csv")
-    if not os.path.exists(data_path):
-        print(f"Bỏ qua ddos_attack_frequency_over_time: không tìm thấy {data_path}")
+    df, source = _load_runtime()
+    if df is None:
+        print(f"Bỏ qua ddos_attack_frequency_over_time: không tìm thấy {source}")
         return
 
-    df = pd.read_csv(data_path, on_bad_lines='skip')
     if "time" not in df.columns:
-        print("Không có cột 'time' trong data/result.csv, bỏ qua ddos_attack_frequency_over_time.")
+        print(f"Không có cột 'time' trong {source}, bỏ qua ddos_attack_frequency_over_time.")
         return
 
     # Chỉ lấy những dòng label=1 (attack)
     df_attack = df[df["label"] == 1].copy()
     if df_attack.empty:
-        print("Không có dòng label=1 trong data/result.csv, bỏ qua ddos_attack_frequency_over_time.")
+        print(f"Không có dòng label=1 trong {source}, bỏ qua ddos_attack_frequency_over_time.")
         return
 
     # Chuẩn hoá time về dạng datetime và group theo phút
@@ -198,7 +218,7 @@ def plot_attack_frequency_over_time():
     plt.plot(counts["minute"], counts["count"], marker="o")
     plt.xlabel("Time (per minute)")
     plt.ylabel("Number of attack rows (label=1)")
-    plt.title("DDoS Attack Frequency Over Time\n(from data/result.csv)")
+    plt.title(f"DDoS Attack Frequency Over Time\n(from {source})")
     plt.xticks(rotation=45, ha="right")
     plt.tight_layout()
     out = os.path.join(output_dir, "ddos_attack_frequency_over_time.png")
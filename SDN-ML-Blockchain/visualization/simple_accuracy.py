@@ -6,7 +6,7 @@ Input: dataset/result.csv với 4 cột: sfe, ssip, rfip, label
 """
 
 import os
-import pandas as pd
+import sys
 from sklearn import svm
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
@@ -14,11 +14,14 @@ from sklearn.naive_bayes import GaussianNB
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import accuracy_score
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ryu_app.dataset import load_training_frame
+
 
 def main():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     data_path = os.path.abspath(os.path.join(base_dir, "..", "dataset", "result.csv"))
-    df = pd.read_csv(data_path, on_bad_lines='skip')
+    df = load_training_frame(data_path)
     # Đồng bộ với analyze_models.py: dùng đúng cột features và label
     X = df[['sfe', 'ssip', 'rfip']].values
     y = df['label'].values
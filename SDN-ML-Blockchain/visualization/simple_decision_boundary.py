@@ -8,7 +8,7 @@ Outputs: svm_graph1.png, svm_graph2.png
 """
 
 import os
-import pandas as pd
+import sys
 import matplotlib.pyplot as plt
 from sklearn import svm
 from sklearn.tree import DecisionTreeClassifier
@@ -18,6 +18,9 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from mlxtend.plotting import plot_decision_regions
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ryu_app.dataset import load_training_frame
+
 
 def get_model(name: str):
     if name == "decision_tree":
@@ -81,10 +84,8 @@ def main():
     data_path = os.path.abspath(os.path.join(base_dir, "..", "dataset", "result.csv"))
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"Dataset not found: {data_path}. Please run: python3 ryu_app/build_dataset.py")
-    df = pd.read_csv(data_path, on_bad_lines='skip')
-    # Giữ đúng cột và kiểu dữ liệu
-    df = df.rename(columns={df.columns[0]: "sfe", df.columns[1]: "ssip", df.columns[2]: "rfip", df.columns[3]: "label"})
-    df = df[['sfe', 'ssip', 'rfip', 'label']]
+    # Đúng cột và kiểu dữ liệu (float32 features, int8 label) từ loader dùng chung
+    df = load_training_frame(data_path)
     models = ["decision_tree", "random_forest", "svm", "naive_bayes"]
 
     for m in models:
@@ -1,18 +1,19 @@
 import os
-import pandas as pd
+import sys
 from sklearn import svm
 from sklearn.model_selection import cross_val_score, StratifiedKFold
 from sklearn.metrics import classification_report, confusion_matrix
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ryu_app.dataset import load_training_frame
+
 # Load data
 base_dir = os.path.dirname(os.path.abspath(__file__))
 # Sử dụng dataset/result.csv (không còn result_filtered.csv)
 data_path = os.path.abspath(os.path.join(base_dir, "..", "dataset", "result.csv"))
 if not os.path.exists(data_path):
     raise FileNotFoundError(f"Dataset not found: {data_path}. Please run: python3 ryu_app/build_dataset.py")
-df = pd.read_csv(data_path, on_bad_lines='skip')
-df = df.rename(columns={df.columns[0]: "sfe", df.columns[1]: "ssip", df.columns[2]: "rfip", df.columns[3]: "label"})
-df = df[['sfe', 'ssip', 'rfip', 'label']]
+df = load_training_frame(data_path)
 
 # Chọn 2 cặp đặc trưng như hình vẽ
 feature_pairs = [
@@ -1,19 +1,24 @@
 #!/usr/bin/env python3
 """
 Vẽ các biểu đồ thời gian đơn giản cho SFE, SSIP, RFIP, Flowcount
-giống phần case study của tác giả, nhưng đọc trực tiếp từ CSV.
+giống phần case study của tác giả.
 
-Nguồn dữ liệu đề xuất:
-- data/result.csv  (runtime log của controller)
-  các cột: time,sfe,ssip,rfip,label,reason,confidence,dpid
+Nguồn dữ liệu:
+- data/telemetry/  (columnar store của controller, đọc bằng memmap - ưu tiên)
+  các cột: ts,dpid,sfe,ssip,rfip,flow_count,label,mode
+- data/result.csv  (runtime log dạng CSV, dùng khi chưa có telemetry store)
 
 Script này cố tình viết đơn giản, dễ sửa số liệu / file nguồn.
 """
 
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ryu_app.telemetry_store import TelemetryReader
+
 
 def _get_output_dir():
     """Get output directory for visualization files"""
@@ -25,7 +30,13 @@ def _get_output_dir():
 
 def load_data():
     base_dir = os.path.dirname(os.path.abspath(__file__))
-    # mặc định đọc từ data/result.csv (runtime)
+    # Ưu tiên telemetry store (không cần parse CSV): chỉ lấy tick của detection mode
+    reader = TelemetryReader(os.path.abspath(os.path.join(base_dir, "..", "data", "telemetry")))
+    if reader.exists():
+        df = reader.to_dataframe()
+        return df[df["mode"] == 1].reset_index(drop=True)
+
+    # Không có store: đọc từ data/result.csv (runtime)
     data_path = os.path.abspath(os.path.join(base_dir, "..", "data", "result.csv"))
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"Không tìm thấy file dữ liệu: {data_path}")
@@ -77,13 +88,16 @@ def plot_sfe_ssip_rfip(df):
 
 def plot_flowcount(df):
     """
-    Flowcount đơn giản: dùng cột 'sfe' làm proxy số flow entries,
-    hoặc nếu sau này bạn có cột flowcount riêng thì sửa lại ở đây.
+    Flowcount: dùng cột 'flow_count' của telemetry store nếu có,
+    nếu không thì dùng cột 'sfe' (cộng dồn) làm proxy số flow entries.
     """
     output_dir = _get_output_dir()
     
     x = range(len(df))
-    flowcount = df["sfe"].cumsum()
+    if "flow_count" in df.columns:
+        flowcount = df["flow_count"]
+    else:
+        flowcount = df["sfe"].cumsum()
 
     plt.figure(figsize=(6, 4))
     plt.plot(x, flowcount, linewidth=1.5)
@@ -4,12 +4,16 @@ Visualize vấn đề False Positives: Normal bị phân loại thành Attack
 """
 
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import joblib
 from sklearn.model_selection import train_test_split
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ryu_app.dataset import load_training_frame
+
 def _get_output_dir():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     output_dir = os.path.join(base_dir, "output")
@@ -28,7 +32,7 @@ def main():
     print("VISUALIZE FALSE POSITIVE ISSUE")
     print("=" * 70)
     
-    train_df = pd.read_csv(train_path, on_bad_lines='skip')
+    train_df = load_training_frame(train_path)
     runtime_df = pd.read_csv(runtime_path, on_bad_lines='skip')
     runtime_ml = runtime_df[runtime_df['reason'] == 'ml'].copy() if 'reason' in runtime_df.columns else runtime_df.copy()
     